@@ -0,0 +1,105 @@
+import json
+import os
+from datetime import date
+
+from ociosidade import LockMedido
+
+# Intervalo padrão (dias) da varredura completa, para pegar novas ONUs offline
+DIAS_VARREDURA_COMPLETA = 7
+
+# Visitas concluídas na execução atual: host -> data em que a próxima ONU atinge qtd_dias (ou None)
+visitas = {}
+
+# Lock para o dicionário de visitas (thread-safe)
+agenda_lock = LockMedido()
+
+def registrar_visita(host, proxima_data):
+    """
+    Registra que a descoberta da OLT foi concluída, guardando a data mais próxima
+    em que alguma ONU offline conhecida atinge o limite de dias
+    """
+    with agenda_lock:
+        visitas[host] = proxima_data
+
+def manter_devida(host):
+    """
+    ONUs já vencidas ficaram sem deleção (prazo, falha no envio ou na verificação, não
+    verificadas): a OLT continua devida na próxima execução
+    """
+    registrar_visita(host, date.today())
+
+def conferir_delecoes(host, candidatas, deletadas):
+    """
+    Chamada ao fim da deleção da OLT: com menos deleções confirmadas que candidatas,
+    a OLT continua devida (a próxima data da descoberta só vale para as ainda não vencidas)
+    """
+    if deletadas < candidatas:
+        manter_devida(host)
+
+def carregar_agenda(path):
+    """
+    Lê a agenda salva (host -> {'proxima': 'YYYY-MM-DD' | None, 'ultima_varredura': 'YYYY-MM-DD'})
+    """
+    if not os.path.exists(path):
+        return {}
+    
+    try:
+        with open(path, "r", encoding="utf-8") as arquivo:
+            return json.load(arquivo)
+    except (OSError, ValueError):
+        return {}
+
+def salvar_agenda(path, agenda):
+    """
+    Grava a agenda de forma atômica (arquivo temporário + rename)
+    """
+    path_tmp = f"{path}.tmp"
+    with open(path_tmp, "w", encoding="utf-8") as arquivo:
+        json.dump(agenda, arquivo, indent=2, sort_keys=True)
+    os.replace(path_tmp, path)
+
+def hosts_devidos(agenda, hosts, hoje=None, dias_varredura=DIAS_VARREDURA_COMPLETA):
+    """
+    Filtra os hosts que precisam ser visitados hoje:
+    - OLTs sem histórico na agenda
+    - OLTs com alguma ONU que já atingiu (ou atinge hoje) o limite de dias
+    - OLTs cuja última varredura completa tem dias_varredura dias ou mais
+    """
+    hoje = hoje or date.today()
+    devidos = []
+    
+    for host in hosts:
+        entrada = agenda.get(host)
+        if not entrada:
+            devidos.append(host)
+            continue
+        
+        ultima_varredura = date.fromisoformat(entrada["ultima_varredura"])
+        if (hoje - ultima_varredura).days >= dias_varredura:
+            devidos.append(host)
+            continue
+        
+        proxima = entrada.get("proxima")
+        if proxima and date.fromisoformat(proxima) <= hoje:
+            devidos.append(host)
+    
+    return devidos
+
+def atualizar_agenda(path, hoje=None):
+    """
+    Mescla as visitas da execução atual na agenda salva. OLTs que falharam antes de
+    concluir a descoberta não são registradas e continuam devidas na próxima execução
+    """
+    hoje = hoje or date.today()
+    agenda = carregar_agenda(path)
+    
+    with agenda_lock:
+        for host, proxima in visitas.items():
+            agenda[host] = {
+                "proxima": proxima.isoformat() if proxima else None,
+                "ultima_varredura": hoje.isoformat(),
+            }
+        total = len(visitas)
+    
+    salvar_agenda(path, agenda)
+    return total
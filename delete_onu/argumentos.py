@@ -0,0 +1,169 @@
+import argparse
+
+from agendador import DIAS_VARREDURA_COMPLETA
+from daemon import INTERVALO_VARREDURA, TEMPO_OCIOSO
+from fila import LEASE
+from particao import ler_particao
+
+# Modos de execução disponíveis para os scripts de todos os fabricantes
+MODOS = ["delete", "census", "daemon", "merge", "queue", "worker"]
+
+# Backends de descoberta/deleção por fabricante (tl1 só existe para Huawei)
+BACKENDS = {"huawei": ["cli", "snmp", "tl1"]}
+BACKENDS_PADRAO = ["cli", "snmp"]
+
+def criar_parser(fabricante):
+    """
+    Cria o parser de linha de comando comum aos scripts de deleção
+    """
+    parser = argparse.ArgumentParser(description=f"Rotina de limpeza de ONUs offline - {fabricante}")
+    parser.add_argument(
+        "modo",
+        nargs="?",
+        default="delete",
+        choices=MODOS,
+        help="delete: rotina completa de deleção (padrão); census: apenas contagem de ONUs offline por OLT/PON, sem deleções; "
+             "daemon: varreduras de deleção contínuas reaproveitando sessões abertas; "
+             "merge: soma os resultados das partições (--shard) nos totais do log; queue: coordenador da fila de OLTs "
+             "(SQLite) puxada pelos workers; worker: processa OLTs da fila até ela terminar",
+    )
+    parser.add_argument(
+        "--agendado",
+        action="store_true",
+        help="visita apenas as OLTs devidas pela agenda (alguma ONU atinge o limite de dias ou varredura completa vencida)",
+    )
+    parser.add_argument(
+        "--varredura-completa",
+        type=int,
+        default=DIAS_VARREDURA_COMPLETA,
+        metavar="DIAS",
+        help=f"intervalo em dias da varredura completa no modo agendado (padrão: {DIAS_VARREDURA_COMPLETA})",
+    )
+    parser.add_argument(
+        "--backend",
+        default="cli",
+        choices=BACKENDS.get(fabricante, BACKENDS_PADRAO),
+        help="descoberta das ONUs offline: cli (telas da CLI, padrão), snmp (GETBULK nos MIBs do fabricante; SSH só para deleção e save) "
+             "ou tl1 (Huawei: listagem, deleção e save em lote pelo NBI TL1 do U2000, sem SSH)",
+    )
+    parser.add_argument(
+        "--intervalo",
+        type=int,
+        default=INTERVALO_VARREDURA,
+        metavar="SEGUNDOS",
+        help=f"modo daemon: pausa entre varreduras (padrão: {INTERVALO_VARREDURA})",
+    )
+    parser.add_argument(
+        "--max-sessoes",
+        type=int,
+        default=None,
+        metavar="N",
+        help="modo daemon: máximo de sessões abertas simultaneamente (padrão: MAX_THREADS do fabricante)",
+    )
+    parser.add_argument(
+        "--ocioso",
+        type=int,
+        default=TEMPO_OCIOSO,
+        metavar="SEGUNDOS",
+        help=f"modo daemon: fecha sessões sem uso há mais deste tempo (padrão: {TEMPO_OCIOSO})",
+    )
+    parser.add_argument(
+        "--prazo",
+        default=None,
+        metavar="HH:MM",
+        help="delete: fim da janela de manutenção. OLTs e ONUs offline há mais tempo primeiro; nenhuma OLT ou lote "
+             "de deleção começa se o tempo restante (estimado pelas execuções anteriores) não cobrir o lote e o save",
+    )
+    parser.add_argument(
+        "--por-pon",
+        action="store_true",
+        help="delete (cli): deleta cada PON assim que o histórico das suas ONUs é verificado, sem esperar a descoberta "
+             "da OLT inteira, com um único save por OLT no fim",
+    )
+    parser.add_argument(
+        "--intervalo-minimo",
+        type=float,
+        default=None,
+        metavar="SEGUNDOS",
+        help="piso do intervalo entre comandos de deleção ajustado pelo ritmo da OLT "
+             "(padrão: INTERVALO_DELECAO do fabricante, a espera fixa anterior)",
+    )
+    parser.add_argument(
+        "--janela-maxima",
+        type=int,
+        default=None,
+        metavar="N",
+        help="teto da janela do pipeline de consultas ajustada pelo ritmo da OLT (padrão: JANELA_MAXIMA do fabricante)",
+    )
+    parser.add_argument(
+        "--gravar",
+        default=None,
+        metavar="DIRETORIO",
+        help="grava a transcrição comprimida (comandos e respostas) de cada sessão SSH no diretório, "
+             "para reprodução offline com reproduzir.py",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="perfil da execução (delete/census): cProfile por OLT (tempo de parede e de CPU), tracemalloc e pilhas "
+             "colapsadas para flamegraph, gravados em <log>_perfil_<data>/ ao lado do log",
+    )
+    parser.add_argument(
+        "--ociosidade",
+        action="store_true",
+        help="(delete/census) divide o tempo de parede de cada OLT em sono, espera por dados, recepção, processamento, "
+             "log e espera de lock; grava ociosidade_<fabricante>.csv e resume no log a espera evitável",
+    )
+    parser.add_argument(
+        "--metricas",
+        type=int,
+        default=None,
+        metavar="PORTA",
+        help="endpoint HTTP /metrics (formato Prometheus) com o andamento da execução: OLTs por estado, fase das OLTs "
+             "em andamento, concorrência, totais de ONUs e latência recente dos comandos",
+    )
+    parser.add_argument(
+        "--shard",
+        type=ler_particao,
+        default=None,
+        metavar="i/N",
+        help="delete/census: processa só a partição i de N da frota (divisão estável por hash do host) e grava o "
+             "resultado de cada OLT em resultado_<fabricante>_<i>de<N>.jsonl, para o modo merge",
+    )
+    parser.add_argument(
+        "--resultados",
+        nargs="+",
+        default=None,
+        metavar="ARQUIVO",
+        help="modo merge: arquivos de resultado das partições (padrão: resultado_<fabricante>_*de*.jsonl no diretório atual)",
+    )
+    parser.add_argument(
+        "--fila",
+        default=None,
+        metavar="ARQUIVO",
+        help="queue/worker: arquivo SQLite da fila de OLTs (padrão: fila_<fabricante>.db)",
+    )
+    parser.add_argument(
+        "--lease",
+        type=int,
+        default=LEASE,
+        metavar="SEGUNDOS",
+        help=f"queue/worker: tempo sem heartbeat até a OLT de um worker voltar para a fila (padrão: {LEASE})",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        metavar="N",
+        help="queue: workers locais iniciados pelo coordenador (padrão: 0, workers iniciados à parte)",
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=None,
+        metavar="N",
+        help="worker: OLTs processadas ao mesmo tempo por worker (padrão: MAX_THREADS do fabricante)",
+    )
+    # Para os modos que gravam o relatório fora do script (daemon, queue)
+    parser.set_defaults(fabricante=fabricante)
+    return parser
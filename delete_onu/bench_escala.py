@@ -0,0 +1,241 @@
+import argparse
+import csv
+import importlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Benchmark de escala: executa o processar_olt de cada fabricante contra OLTs simuladas em
+# processo (cli_simulador, sem rede), variando a quantidade de OLTs e de threads. Cada ponto
+# roda num processo novo (RSS de pico isolado) e mede tempo total, vazão, percentis do tempo
+# por OLT, RSS de pico e por worker, threads (uma de transporte por conexão, como no
+# paramiko) e descritores de arquivo no pico, e o tempo em log e esperando locks (ociosidade).
+# As esperas fixas dos scripts (time.sleep) são multiplicadas por --fator-espera para a
+# varredura caber em minutos; a latência das OLTs simuladas não é escalada.
+# Uso: python bench_escala.py [--fabricantes huawei,zte,fiberhome] [--olts 10,100,1000]
+#      [--threads 10,50,90] [--onus 256] [--latencia 0.02] [--fator-espera 0.1]
+#      [--saida escala.csv] [--grafico escala.png]
+
+FABRICANTES = {
+    "huawei": "delete_onu_offline_bigger_45_days_olt_huawei_v3",
+    "zte": "delete_onu_offline_bigger_45_days_olt_zte_v3",
+    "fiberhome": "delete_onu_offline_bigger_45_days_olt_fiberhome_v4",
+}
+
+COLUNAS = (
+    "fabricante", "olts", "threads", "onus_por_olt", "latencia_s", "fator_espera",
+    "segundos", "olts_por_minuto", "olt_p50_s", "olt_p95_s", "olt_p99_s",
+    "onus_deletadas", "olts_com_erro", "comandos", "rss_base_mib", "rss_pico_mib",
+    "rss_por_worker_kib", "threads_pico", "fds_pico", "espera_lock_s", "log_s", "sono_s", "espera_dados_s",
+)
+
+AMOSTRAGEM = 0.05  # segundos entre amostras de RSS, threads e descritores
+
+def _rss_atual_kib():
+    try:
+        with open("/proc/self/statm") as arquivo:
+            return int(arquivo.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError):
+        return None
+
+def _rss_pico_kib():
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss  # macOS informa bytes
+
+def _fds_abertos():
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return None
+
+class Amostrador(threading.Thread):
+    """
+    Pico de threads, descritores e RSS durante a execução
+    """
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.parar = threading.Event()
+        self.threads = self.fds = self.rss = 0
+
+    def run(self):
+        while not self.parar.wait(AMOSTRAGEM):
+            self.threads = max(self.threads, threading.active_count())
+            self.fds = max(self.fds, _fds_abertos() or 0)
+            self.rss = max(self.rss, _rss_atual_kib() or 0)
+
+def medir_ponto(fabricante, qtd_olts, threads, onus, latencia, fator_espera, latencia_conexao, proporcao_offline):
+    """
+    Executa um ponto da varredura no processo atual (diretório de trabalho descartável)
+    e retorna a linha do CSV
+    """
+    import ociosidade
+    from cli_simulador import criar_olt, conector
+    from tempos_resposta import percentil
+
+    # Esperas fixas dos scripts escaladas; a contabilidade de ociosidade mede log e locks
+    dormir = time.sleep
+    def espera_escalada(segundos):
+        dormir(segundos * fator_espera)
+    time.sleep = espera_escalada
+    ociosidade._sleep_original = espera_escalada
+    ociosidade.ativar_ociosidade()
+
+    modulo = importlib.import_module(FABRICANTES[fabricante])
+    hosts = [f"10.{i // 65536}.{i // 256 % 256}.{i % 256}" for i in range(1, qtd_olts + 1)]
+    olts = {host: criar_olt(fabricante, onus, proporcao_offline, seed=i) for i, host in enumerate(hosts)}
+    ssh_simulado = conector(olts, latencia, latencia_conexao)
+    def ssh(host):
+        # Como o connection_ssh.ssh: canal medido pela contabilidade de ociosidade
+        conexao, canal = ssh_simulado(host)
+        return conexao, ociosidade.contabilizar_se_ativo(canal)
+    modulo.ssh = ssh
+
+    rss_base = _rss_atual_kib() or 0
+    amostrador = Amostrador()
+    amostrador.start()
+    saida_original = sys.stdout
+    sys.stdout = open(os.devnull, "w")  # o print das threads continua custando, sem poluir o terminal
+    inicio = time.perf_counter()
+    try:
+        resultados = []
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            futuros = [executor.submit(ociosidade.contabilizar_olt(modulo.processar_olt), host, i + 1)
+                       for i, host in enumerate(hosts)]
+            for futuro in as_completed(futuros):
+                resultados.append(futuro.result())
+    finally:
+        segundos = time.perf_counter() - inicio
+        sys.stdout.close()
+        sys.stdout = saida_original
+        amostrador.parar.set()
+        amostrador.join()
+
+    paredes = [parede for _, parede, _ in ociosidade.medidas]
+    soma = {categoria: sum(conta[categoria] for _, _, conta in ociosidade.medidas) for categoria in ociosidade.CATEGORIAS}
+    rss_pico = max(amostrador.rss, _rss_pico_kib() or 0)
+    return {
+        "fabricante": fabricante, "olts": qtd_olts, "threads": threads, "onus_por_olt": onus,
+        "latencia_s": latencia, "fator_espera": fator_espera,
+        "segundos": round(segundos, 2),
+        "olts_por_minuto": round(60 * qtd_olts / segundos, 1),
+        "olt_p50_s": round(percentil(paredes, 50), 2),
+        "olt_p95_s": round(percentil(paredes, 95), 2),
+        "olt_p99_s": round(percentil(paredes, 99), 2),
+        "onus_deletadas": sum(resultado.deletadas for resultado in resultados),
+        "olts_com_erro": sum(not resultado.sucesso for resultado in resultados),
+        "comandos": sum(olt.comandos for olt in olts.values()),
+        "rss_base_mib": round(rss_base / 1024, 1),
+        "rss_pico_mib": round(rss_pico / 1024, 1),
+        "rss_por_worker_kib": round(max(0, rss_pico - rss_base) / min(threads, qtd_olts)),
+        "threads_pico": amostrador.threads,
+        "fds_pico": amostrador.fds,
+        "espera_lock_s": round(soma[ociosidade.ESPERA_LOCK], 3),
+        "log_s": round(soma[ociosidade.LOG], 3),
+        "sono_s": round(soma[ociosidade.SONO], 2),
+        "espera_dados_s": round(soma[ociosidade.ESPERA_DADOS], 2),
+    }
+
+def executar_ponto(args, fabricante, qtd_olts, threads):
+    """
+    Roda um ponto num processo novo, num diretório temporário (logs e arquivos por thread)
+    """
+    diretorio = tempfile.mkdtemp(prefix="bench_escala_")
+    comando = [sys.executable, os.path.abspath(__file__), "--ponto", f"{fabricante},{qtd_olts},{threads}",
+               "--onus", str(args.onus), "--latencia", str(args.latencia), "--fator-espera", str(args.fator_espera),
+               "--latencia-conexao", str(args.latencia_conexao), "--offline", str(args.offline)]
+    try:
+        processo = subprocess.run(comando, capture_output=True, text=True, cwd=diretorio)
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+    if processo.returncode != 0:
+        linhas = processo.stderr.strip().splitlines() or ["sem saída"]
+        raise RuntimeError(f"Falha no ponto {fabricante}/{qtd_olts} OLTs/{threads} threads: {linhas[-1]}")
+    return json.loads(processo.stdout.strip().splitlines()[-1])
+
+def gravar_grafico(linhas, path):
+    """
+    Vazão e RSS de pico pela quantidade de OLTs, uma curva por fabricante e threads.
+    matplotlib é opcional e só importado aqui
+    """
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("[WARN] matplotlib não instalado: gráfico não gerado")
+        return False
+
+    figura, (vazao, memoria) = plt.subplots(1, 2, figsize=(12, 5))
+    curvas = sorted({(linha["fabricante"], linha["threads"]) for linha in linhas})
+    for fabricante, threads in curvas:
+        pontos = sorted((linha["olts"], linha) for linha in linhas if (linha["fabricante"], linha["threads"]) == (fabricante, threads))
+        olts = [quantidade for quantidade, _ in pontos]
+        rotulo = f"{fabricante} ({threads} threads)"
+        vazao.plot(olts, [linha["olts_por_minuto"] for _, linha in pontos], marker="o", label=rotulo)
+        memoria.plot(olts, [linha["rss_pico_mib"] for _, linha in pontos], marker="o", label=rotulo)
+    for eixo, titulo in ((vazao, "OLTs por minuto"), (memoria, "RSS de pico (MiB)")):
+        eixo.set_xscale("log")
+        eixo.set_xlabel("OLTs no inventário")
+        eixo.set_title(titulo)
+        eixo.grid(True, alpha=0.3)
+    vazao.legend(fontsize="small")
+    figura.tight_layout()
+    figura.savefig(path)
+    return True
+
+def _lista_inteiros(texto):
+    return [int(valor) for valor in texto.split(",") if valor]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Escala do processamento por OLT contra OLTs simuladas")
+    parser.add_argument("--fabricantes", default="huawei,zte,fiberhome", help="lista separada por vírgula")
+    parser.add_argument("--olts", type=_lista_inteiros, default=[10, 100, 500], metavar="N,N", help="tamanhos do inventário")
+    parser.add_argument("--threads", type=_lista_inteiros, default=[10, 50, 90], metavar="N,N", help="concorrência (max_workers)")
+    parser.add_argument("--onus", type=int, default=256, help="ONUs por OLT (padrão: 256)")
+    parser.add_argument("--offline", type=float, default=0.2, help="proporção de ONUs offline (padrão: 0.2)")
+    parser.add_argument("--latencia", type=float, default=0.02, metavar="S", help="resposta de cada comando na OLT simulada")
+    parser.add_argument("--latencia-conexao", type=float, default=0.2, metavar="S", help="tempo de conexão SSH simulado")
+    parser.add_argument("--fator-espera", type=float, default=0.1, metavar="F", help="multiplica os time.sleep dos scripts")
+    parser.add_argument("--saida", default="escala.csv", metavar="CSV")
+    parser.add_argument("--grafico", default=None, metavar="PNG", help="gráfico de vazão e memória (requer matplotlib)")
+    parser.add_argument("--ponto", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.ponto:
+        # Processo filho: um ponto da varredura, resultado em JSON na última linha
+        fabricante, qtd_olts, threads = args.ponto.split(",")
+        linha = medir_ponto(fabricante, int(qtd_olts), int(threads), args.onus, args.latencia,
+                            args.fator_espera, args.latencia_conexao, args.offline)
+        print(json.dumps(linha))
+        sys.exit(0)
+
+    linhas = []
+    for fabricante in args.fabricantes.split(","):
+        for qtd_olts in args.olts:
+            for threads in args.threads:
+                linha = executar_ponto(args, fabricante, qtd_olts, threads)
+                linhas.append(linha)
+                print(f"{fabricante:10} {qtd_olts:5} OLTs {threads:3} threads: {linha['segundos']:8.1f}s "
+                      f"{linha['olts_por_minuto']:7.1f} OLTs/min  OLT p50/p95/p99 {linha['olt_p50_s']}/{linha['olt_p95_s']}/{linha['olt_p99_s']}s  "
+                      f"RSS {linha['rss_pico_mib']} MiB ({linha['rss_por_worker_kib']} KiB/worker)  "
+                      f"threads {linha['threads_pico']}  fds {linha['fds_pico']}  lock {linha['espera_lock_s']}s"
+                      + (f"  [ERRO] {linha['olts_com_erro']} OLTs com erro" if linha["olts_com_erro"] else ""))
+
+    with open(args.saida, "w", encoding="utf-8", newline="") as arquivo:
+        escritor = csv.DictWriter(arquivo, fieldnames=COLUNAS)
+        escritor.writeheader()
+        escritor.writerows(linhas)
+    print(f"[INFO] Resultados em {args.saida}")
+    if args.grafico and gravar_grafico(linhas, args.grafico):
+        print(f"[INFO] Gráfico em {args.grafico}")
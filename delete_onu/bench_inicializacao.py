@@ -0,0 +1,97 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+from statistics import median
+
+# Benchmark de inicialização: tempo de import e RSS de cada script de fabricante, medidos em
+# um processo novo (como numa execução do cron), e os módulos pesados carregados sem
+# necessidade. Uso: python bench_inicializacao.py [--repetir N] [--limite-ms MS]
+# Sai com código 1 se algum módulo pesado for importado na inicialização ou se a mediana
+# passar do limite
+
+SCRIPTS = (
+    "delete_onu_offline_bigger_45_days_olt_huawei_v3",
+    "delete_onu_offline_bigger_45_days_olt_zte_v3",
+    "delete_onu_offline_bigger_45_days_olt_fiberhome_v4",
+)
+
+# Só devem ser importados quando usados (conexão SSH, --backend snmp, --metricas, --profile)
+PESADOS = ("pandas", "numpy", "paramiko", "pysnmp", "http.server", "cProfile", "pstats")
+
+TOP_MODULOS = 8
+
+_CODIGO = """
+import json, sys, time
+inicio = time.perf_counter()
+import {modulo}
+duracao = time.perf_counter() - inicio
+try:
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss = rss / 1024 if sys.platform == "darwin" else rss  # KiB (macOS informa bytes)
+except ImportError:
+    rss = None
+print(json.dumps({{"segundos": duracao, "rss_kib": rss,
+                  "pesados": [nome for nome in {pesados!r} if nome in sys.modules]}}))
+"""
+
+def medir(modulo, importtime=False):
+    """
+    Importa o módulo em um processo novo. Retorna (medida, linhas do -X importtime)
+    """
+    comando = [sys.executable] + (["-X", "importtime"] if importtime else []) + \
+              ["-c", _CODIGO.format(modulo=modulo, pesados=PESADOS)]
+    processo = subprocess.run(comando, capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    if processo.returncode != 0:
+        raise RuntimeError(f"Falha ao importar {modulo}: {processo.stderr.strip().splitlines()[-1]}")
+    return json.loads(processo.stdout.strip().splitlines()[-1]), processo.stderr.splitlines()
+
+def modulos_mais_lentos(linhas, modulo, quantidade=TOP_MODULOS):
+    """
+    Módulos importados diretamente pelo script (filhos dele no -X importtime), pelo tempo acumulado
+    """
+    diretos = []
+    for linha in linhas:
+        if not linha.startswith("import time:") or linha.count("|") != 2:
+            continue
+        _, acumulado, nome = linha.split("|")
+        if not acumulado.strip().isdigit():
+            continue
+        nivel = (len(nome) - len(nome.lstrip())) // 2
+        if nivel == 0:
+            # O -X importtime lista os filhos antes do módulo que os importou
+            if nome.strip() == modulo:
+                break
+            diretos = []
+        elif nivel == 1:
+            diretos.append((int(acumulado), nome.strip()))
+    return sorted(diretos, reverse=True)[:quantidade]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tempo de import e RSS dos scripts de fabricante")
+    parser.add_argument("--repetir", type=int, default=5, metavar="N", help="processos por script (padrão: 5)")
+    parser.add_argument("--limite-ms", type=float, default=None, metavar="MS", help="falha se a mediana passar do limite")
+    args = parser.parse_args()
+
+    falhou = False
+    for modulo in SCRIPTS:
+        medidas = [medir(modulo)[0] for _ in range(args.repetir)]
+        _, linhas = medir(modulo, importtime=True)
+        tempo_ms = median(medida["segundos"] for medida in medidas) * 1000
+        rss = [medida["rss_kib"] for medida in medidas if medida["rss_kib"] is not None]
+        pesados = sorted({nome for medida in medidas for nome in medida["pesados"]})
+
+        rss_texto = f"{median(rss) / 1024:.1f} MiB" if rss else "n/d"
+        print(f"{modulo}: import {tempo_ms:.0f} ms (mediana de {args.repetir}), RSS {rss_texto}")
+        for acumulado, nome in modulos_mais_lentos(linhas, modulo):
+            print(f"    {acumulado / 1000:7.1f} ms  {nome}")
+        if pesados:
+            print(f"    [ERRO] módulos pesados importados na inicialização: {', '.join(pesados)}")
+            falhou = True
+        if args.limite_ms is not None and tempo_ms > args.limite_ms:
+            print(f"    [ERRO] acima do limite de {args.limite_ms:.0f} ms")
+            falhou = True
+
+    sys.exit(1 if falhou else 0)
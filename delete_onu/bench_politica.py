@@ -0,0 +1,67 @@
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+import politica
+from politica import Politica, avaliar
+from registro_onu import CandidatosONU
+
+# Benchmark da política de retenção: avaliar() com numpy (se instalado) e sem numpy sobre
+# listas de ONUs offline do tamanho de um PON, de uma OLT e da frota, comparado com o tempo
+# de leitura dessas ONUs na OLT (um comando por ONU em pipeline, com a latência informada).
+# Uso: python bench_politica.py [--tamanhos 128,4096,100000] [--latencia 0.02] [--janela 8]
+
+HOJE = date(2025, 10, 19)
+
+def gerar_offline(quantidade, seriais_mantidos, semente=1):
+    aleatorio = random.Random(semente)
+    offline = CandidatosONU("zte", "olt")
+    for i in range(quantidade):
+        queda = None if i % 20 == 0 else HOJE - timedelta(days=aleatorio.randrange(1, 200))
+        serial = f"ZTEG{i:08X}"
+        if i % 50 == 0:
+            serial = aleatorio.choice(seriais_mantidos)
+        offline.adicionar(1, 1 + i // 2048 % 16, 1 + i // 128 % 16, 1 + i % 128, serial=serial, ultima_queda=queda)
+    return offline
+
+def cronometrar(funcao, repeticoes=9):
+    melhor = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        duracao = time.perf_counter() - inicio
+        melhor = duracao if melhor is None else min(melhor, duracao)
+    return melhor, resultado
+
+def avaliar_com(numpy, offline, regra):
+    politica._modulo_numpy = numpy
+    return avaliar(offline, HOJE, regra)
+
+def chave(avaliacao):
+    return (list(avaliacao.candidatas.onu), list(avaliacao.candidatas.dias_offline), avaliacao.proxima_delecao,
+            avaliacao.aguardando, avaliacao.mantidas, avaliacao.sem_queda)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark da política de retenção")
+    parser.add_argument("--tamanhos", default="128,4096,100000")
+    parser.add_argument("--latencia", type=float, default=0.02, help="segundos por comando na OLT")
+    parser.add_argument("--janela", type=int, default=8, help="comandos por janela do pipeline")
+    args = parser.parse_args()
+
+    numpy = politica._numpy()
+    seriais_mantidos = [f"ZTEG9{i:07X}" for i in range(1000)]
+    regra = Politica(45, seriais_mantidos=seriais_mantidos, nunca_online="deletar")
+    print(f"numpy: {numpy.__version__ if numpy else 'não instalado'}")
+    for quantidade in (int(valor) for valor in args.tamanhos.split(",")):
+        offline = gerar_offline(quantidade, seriais_mantidos)
+        leitura = quantidade / args.janela * args.latencia
+        tempo_python, resultado_python = cronometrar(lambda: avaliar_com(False, offline, regra))
+        linha = f"  {quantidade:>7} ONUs  python {tempo_python * 1000:8.2f} ms"
+        if numpy:
+            tempo_numpy, resultado_numpy = cronometrar(lambda: avaliar_com(numpy, offline, regra))
+            iguais = "ok" if chave(resultado_python) == chave(resultado_numpy) else "DIFERENTE"
+            linha += f"  numpy {tempo_numpy * 1000:8.2f} ms ({tempo_python / tempo_numpy:4.1f}x, {iguais})"
+        melhor = min(tempo_python, tempo_numpy) if numpy else tempo_python
+        print(f"{linha}  leitura na OLT ~{leitura:8.2f} s ({melhor / leitura * 100:.3f}% da leitura)")
+    politica._modulo_numpy = None
@@ -0,0 +1,63 @@
+import gc
+import tracemalloc
+from datetime import date, timedelta
+
+from registro_onu import RegistroONU, CandidatosONU
+
+# Benchmark de memória: 100k candidatos nos formatos antigos (tupla Huawei, tupla ZTE,
+# dict Fiberhome) contra RegistroONU e CandidatosONU. Uso: python bench_registros.py [quantidade]
+
+def _linhas(quantidade):
+    # Valores como vêm do split() da saída da CLI: strings novas a cada linha
+    hoje = date.today()
+    for i in range(quantidade):
+        yield (f"{i % 2}", f"{(i // 2048) % 16}", f"{(i // 128) % 16}", f"{i % 128}",
+               f"48575443{i:08X}", f"{1000 + i}", 45 + i % 90, hoje - timedelta(days=45 + i % 90),
+               f"HG{260 + i % 2}")
+
+def tuplas_huawei(quantidade):
+    return [(serial, sp, c, s, p, o) for c, s, p, o, serial, sp, _, _, _ in _linhas(quantidade)]
+
+def tuplas_zte(quantidade):
+    return [(f"gpon_onu-{c}/{s}/{p}:{o}", serial) for c, s, p, o, serial, _, _, _, _ in _linhas(quantidade)]
+
+def dicts_fiberhome(quantidade):
+    return [
+        {'slot': s, 'pon': p, 'onu': o, 'onu_type': modelo, 'phy_id': serial,
+         'dias_offline': dias, 'last_off_time': queda.isoformat(), 'status_offline': 'normal'}
+        for _, s, p, o, serial, _, dias, queda, modelo in _linhas(quantidade)
+    ]
+
+def registros(quantidade):
+    return [RegistroONU("huawei", "10.0.0.1", c, s, p, o, serial, int(sp), dias, queda, modelo, "normal")
+            for c, s, p, o, serial, sp, dias, queda, modelo in _linhas(quantidade)]
+
+def colunar(quantidade):
+    candidatos = CandidatosONU("huawei", "10.0.0.1")
+    for c, s, p, o, serial, sp, dias, queda, modelo in _linhas(quantidade):
+        candidatos.adicionar(c, s, p, o, serial, sp, dias, queda, modelo, "normal")
+    return candidatos
+
+def medir(funcao, quantidade):
+    gc.collect()
+    tracemalloc.start()
+    resultado = funcao(quantidade)
+    atual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del resultado
+    return atual
+
+if __name__ == "__main__":
+    import sys
+
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"Memória para {quantidade} candidatos:")
+    for nome, funcao in [
+        ("tupla huawei (6 campos)", tuplas_huawei),
+        ("tupla zte (indice, serial)", tuplas_zte),
+        ("dict fiberhome", dicts_fiberhome),
+        ("RegistroONU (__slots__)", registros),
+        ("CandidatosONU (colunar)", colunar),
+    ]:
+        memoria = medir(funcao, quantidade)
+        print(f"  {nome:<28} {memoria / 1024 / 1024:8.2f} MiB  ({memoria / quantidade:6.1f} bytes/ONU)")
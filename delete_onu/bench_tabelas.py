@@ -0,0 +1,161 @@
+import gc
+import re
+import time
+
+from tabela import TabelaRegex, registros
+
+# Benchmark do leitor de tabelas contra os laços antigos (split por linha) em saídas de
+# 100k linhas de cada fabricante. Uso: python bench_tabelas.py [linhas]
+
+LAYOUT_SERVICE_PORT = TabelaRegex(r'^\s*(\d+)\s+\d+\s+\S+\s+gpon\s+(\d+)/ ?(\d+) ?/(\d+)\s+(\d+)\s.*\s(up|down)\s*$')
+COLUNA_INDICE = (0,)
+LAYOUT_INDICE = TabelaRegex(r'^\s*(\d+/\d+/\d+:\d+)\s')
+COLUNAS_ONU_STATE = (0, 1, 2, 3)
+INDICE_ONU = re.compile(r'^\d+/\d+/\d+:\d+$')
+LAYOUT_ONU_STATE = TabelaRegex(r'^\s*(\d+/\d+/\d+:\d+)\s+(\S+)\s+(\S+)\s+(\S+)')
+COLUNAS_AUTHORIZATION = (0, 1, 2, 3, 6, 7)
+LAYOUT_AUTHORIZATION = TabelaRegex(r'^\s*(\d+)\s+(\d+)\s+(\d+)\s+(\S+)\s+\S+\s+\S+\s+(up|dn)\b[ \t]*(\S*)')
+
+def saida_huawei(linhas):
+    saida = []
+    for i in range(linhas):
+        slot, pon = 1 + i // 4096 % 16, i // 128 % 16
+        interface = f"0/{slot}/{pon}" if slot >= 10 else f"0/{slot} /{pon}"
+        estado = "down" if i % 5 == 0 else "up"
+        saida.append(f"  {i:>6} {100 + i % 50:>4} common   gpon {interface:<7} {i % 128:<4} {10 + i % 4:<5} vlan  {100 + i % 50:<8} -    -    {estado}")
+    return "\n".join(saida)
+
+def saida_zte(linhas):
+    saida = ["OnuIndex     Admin State  OMCC State  Phase State  Channel",
+             "----------------------------------------------------------------"]
+    for i in range(linhas):
+        fase = "LOS" if i % 5 == 0 else "working"
+        saida.append(f"{f'1/{1 + i // 2048 % 16}/{1 + i // 128 % 16}:{1 + i % 128}':<13}enable       enable      {fase:<13}1(GPON)")
+    return "\n".join(saida)
+
+def saida_fiberhome(linhas):
+    saida = ["Slot Pon Onu OnuType        ST Lic OST PhyId        PhyPwd",
+             "---- --- --- -------------- -- --- --- ------------ ----------"]
+    for i in range(linhas):
+        estado = "dn" if i % 5 == 0 else "up"
+        saida.append(f"1    1   {i % 128 + 1:<3} HG260          A  1   {estado}  FHTT{i:08X}")
+    return "\n".join(saida)
+
+# Laços antigos (como estavam nos scripts)
+def antigo_huawei(content):
+    resultado = []
+    for line in content.splitlines():
+        if '    down' in line:
+            result = line.split()
+            gpon_index = result.index('gpon')
+            gpon_interface = result[gpon_index + 1]
+            if gpon_interface.count('/') == 2:
+                chassi_id, slot_id, pon_id = gpon_interface.split('/')
+                onu_id = result[gpon_index + 2]
+            else:
+                chassi_id, slot_id = gpon_interface.split('/')[:2]
+                pon_id = result[gpon_index + 2].replace('/', '')
+                onu_id = result[gpon_index + 3]
+            resultado.append((result[0], chassi_id, slot_id, pon_id, onu_id))
+    return resultado
+
+def antigo_zte(content):
+    return [f"gpon_onu-{line.split()[0]}" for line in content.splitlines()
+            if ('working' not in line) and ('enable' in line)]
+
+def antigo_zte_contagem(content):
+    contagem = {}
+    for line in content.splitlines():
+        parts = line.split()
+        if len(parts) < 4 or not re.match(r'^\d+/\d+/\d+:\d+$', parts[0]):
+            continue
+        pon = tuple(parts[0].split(':')[0].split('/'))
+        contagem[pon] = contagem.get(pon, 0) + (parts[1] == 'enable' and parts[3] != 'working')
+    return contagem
+
+def antigo_fiberhome(content, slot="1", pon="1"):
+    resultado = []
+    for line in content.splitlines():
+        if 'dn' in line and len(line.split()) >= 6:
+            parts = line.split()
+            if parts[0] == slot and parts[1] == pon and parts[6] == 'dn':
+                resultado.append((parts[0], parts[1], parts[2], parts[3], parts[7] if len(parts) > 7 else ''))
+    return resultado
+
+def antigo_fiberhome_contagem(content, slot="1", pon="1"):
+    total = 0
+    up = 0
+    for line in content.splitlines():
+        parts = line.split()
+        if len(parts) >= 7 and parts[0] == slot and parts[1] == pon and parts[6] in ('up', 'dn'):
+            total += 1
+            if parts[6] == 'up':
+                up += 1
+    return total, up, len(antigo_fiberhome(content, slot, pon))
+
+# Leitor novo
+def novo_huawei(content):
+    return [registro[:5] for registro in LAYOUT_SERVICE_PORT.registros(content, contem=' down') if registro[5] == 'down']
+
+def novo_zte(content):
+    # O script mantém o split(): o índice é a primeira coluna e nunca fica vazio
+    return antigo_zte(content)
+
+def novo_zte_contagem(content):
+    contagem = {}
+    for indice, admin, _, fase in registros(content, COLUNAS_ONU_STATE, LAYOUT_ONU_STATE):
+        if not INDICE_ONU.match(indice):
+            continue
+        pon = tuple(indice.split(':')[0].split('/'))
+        contagem[pon] = contagem.get(pon, 0) + (admin == 'enable' and fase != 'working')
+    return contagem
+
+def novo_fiberhome(content, slot="1", pon="1"):
+    return [(s, p, onu, tipo, phy_id)
+            for s, p, onu, tipo, estado, phy_id in registros(content, COLUNAS_AUTHORIZATION, LAYOUT_AUTHORIZATION, contem=' dn')
+            if s == slot and p == pon and estado == 'dn']
+
+def novo_fiberhome_contagem(content, slot="1", pon="1"):
+    total = up = dn = 0
+    for s, p, _, _, estado, _ in registros(content, COLUNAS_AUTHORIZATION, LAYOUT_AUTHORIZATION):
+        if s == slot and p == pon and estado in ('up', 'dn'):
+            total += 1
+            if estado == 'up':
+                up += 1
+            else:
+                dn += 1
+    return total, up, dn
+
+def cronometrar(antigo, novo, content, repeticoes=9):
+    """
+    Melhor tempo de cada leitor, alternando antigo e novo a cada repetição (o ruído da
+    máquina atinge os dois por igual)
+    """
+    tempos = {antigo: None, novo: None}
+    resultados = {}
+    for _ in range(repeticoes):
+        for funcao in (antigo, novo):
+            gc.collect()
+            inicio = time.perf_counter()
+            resultados[funcao] = funcao(content)
+            duracao = time.perf_counter() - inicio
+            tempos[funcao] = duracao if tempos[funcao] is None else min(tempos[funcao], duracao)
+    return tempos[antigo], resultados[antigo], tempos[novo], resultados[novo]
+
+if __name__ == "__main__":
+    import sys
+
+    linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"Saídas com {linhas} linhas (melhor de 9):")
+    for nome, gerar, antigo, novo in [
+        ("huawei display service-port", saida_huawei, antigo_huawei, novo_huawei),
+        ("zte show gpon onu state", saida_zte, antigo_zte, novo_zte),
+        ("zte contagem (census)", saida_zte, antigo_zte_contagem, novo_zte_contagem),
+        ("fiberhome show authorization", saida_fiberhome, antigo_fiberhome, novo_fiberhome),
+        ("fiberhome contagem (census)", saida_fiberhome, antigo_fiberhome_contagem, novo_fiberhome_contagem),
+    ]:
+        content = gerar(linhas)
+        tempo_antigo, resultado_antigo, tempo_novo, resultado_novo = cronometrar(antigo, novo, content)
+        iguais = "ok" if list(resultado_antigo) == list(resultado_novo) else "DIFERENTE"
+        print(f"  {nome:<30} antigo {tempo_antigo * 1000:8.1f} ms  novo {tempo_novo * 1000:8.1f} ms  "
+              f"({tempo_antigo / tempo_novo:4.1f}x, {iguais})")
@@ -0,0 +1,41 @@
+import csv
+import os
+from datetime import datetime
+
+from ociosidade import LockMedido
+
+# Colunas do CSV de censo (uma linha por OLT e uma por PON)
+CAMPOS_CENSUS = ["data", "fabricante", "host", "chassi", "slot", "pon", "total", "online", "offline", "detalhe"]
+
+# Lock para escrita no CSV de censo (thread-safe)
+census_lock = LockMedido()
+
+def linha_census(fabricante, host, chassi="", slot="", pon="", total="", online="", offline="", detalhe=""):
+    """
+    Monta uma linha do censo. Campos vazios indicam valor não disponível
+    no comando agregado do fabricante (ex: linha de total da OLT sem PON)
+    """
+    return {
+        "data": datetime.now().strftime("%Y/%m/%d %H:%M:%S"),
+        "fabricante": fabricante,
+        "host": host,
+        "chassi": chassi,
+        "slot": slot,
+        "pon": pon,
+        "total": total,
+        "online": online,
+        "offline": offline,
+        "detalhe": detalhe,
+    }
+
+def escrever_census(path, linhas):
+    """
+    Acrescenta linhas ao CSV de censo de forma thread-safe, criando o cabeçalho se necessário
+    """
+    with census_lock:
+        novo = not os.path.exists(path) or os.path.getsize(path) == 0
+        with open(path, "a", newline="", encoding="utf-8") as arquivo:
+            writer = csv.DictWriter(arquivo, fieldnames=CAMPOS_CENSUS, restval="")
+            if novo:
+                writer.writeheader()
+            writer.writerows(linhas)
@@ -0,0 +1,429 @@
+import random
+import re
+import threading
+import time
+from collections import deque
+from datetime import date, timedelta
+
+# Simulador em processo das CLIs Huawei, ZTE e Fiberhome, para benchmarks e testes sem rede.
+# Cada OLT simulada mantém suas ONUs em memória e responde aos comandos usados pelos
+# scripts (descoberta, deleção, verificação e save) com eco, saída e prompt do contexto
+# atual, como o canal do paramiko. As respostas saem com um atraso fixo por comando e em
+# ordem (a OLT processa um comando por vez), então o pipeline e as esperas dos scripts
+# enxergam a mesma latência de um equipamento real
+
+PONS_POR_SLOT = 8      # placa GC8B na Fiberhome
+ONUS_POR_PON = 128
+LATENCIAS_SAVE = 20    # o save leva este múltiplo da latência de um comando
+
+# Colunas (nome, largura) das tabelas com cabeçalho
+COLUNAS_ZTE = (("OnuIndex", 13), ("Admin State", 13), ("OMCC State", 12), ("Phase State", 13), ("Channel", 8))
+COLUNAS_FIBERHOME = (("Slot", 5), ("Pon", 4), ("Onu", 4), ("OnuType", 10), ("ST", 4), ("Lic", 4), ("OST", 4), ("PhyId", 16))
+
+_esperar = time.sleep  # esperas do próprio canal (fora do fator de escala dos benchmarks)
+
+def _tabela(colunas, linhas):
+    """
+    Tabela de largura fixa como a da CLI: cabeçalho, traços por coluna e linhas.
+    colunas: [(nome, largura)]
+    """
+    def formatar(valores):
+        return "".join(f"{valor:<{largura}}" for valor, (_, largura) in zip(valores, colunas)).rstrip()
+    tracos = "".join(f"{'-' * (largura - 1):<{largura}}" for _, largura in colunas).rstrip()
+    return "\r\n".join([formatar(nome for nome, _ in colunas), tracos] + [formatar(linha) for linha in linhas])
+
+class ONUSimulada:
+    __slots__ = ("serial", "online", "queda")
+
+    def __init__(self, serial, online, queda):
+        self.serial = serial
+        self.online = online
+        self.queda = queda  # date da última queda (None: nunca subiu)
+
+def gerar_onus(qtd_onus, proporcao_offline=0.2, dias_max=120, data_atual=None, seed=0, prefixo="SIMU", base=1):
+    """
+    ONUs aleatórias (reprodutíveis pela seed): {(slot, pon, onu): ONUSimulada}. pon e onu
+    começam em base (0 na Huawei); slots de PONS_POR_SLOT PONs com ONUS_POR_PON ONUs
+    """
+    aleatorio = random.Random(seed)
+    data_atual = data_atual or date.today()
+    onus = {}
+    for i in range(qtd_onus):
+        posicao = (1 + i // (PONS_POR_SLOT * ONUS_POR_PON), base + (i // ONUS_POR_PON) % PONS_POR_SLOT, base + i % ONUS_POR_PON)
+        online = aleatorio.random() >= proporcao_offline
+        queda = None
+        if online or aleatorio.random() >= 0.05:
+            queda = data_atual - timedelta(days=aleatorio.randint(0, dias_max))
+        onus[posicao] = ONUSimulada(f"{prefixo}{seed:04X}{i:06X}", online, queda)
+    return onus
+
+class OLTSimulada:
+    """
+    Estado e respostas de uma OLT. As subclasses implementam o prompt, a navegação
+    entre contextos e os comandos do fabricante
+    """
+    fabricante = None
+    erro = "Unknown command."
+
+    def __init__(self, onus, data_atual=None):
+        self.onus = onus
+        self.data_atual = data_atual or date.today()
+        self.contexto = []
+        self.comandos = 0
+        self.delecoes = 0
+        self.saves = 0
+        self.encerrada = False
+
+    def banner(self):
+        return f"\r\nWelcome (simulador {self.fabricante})\r\n\r\n{self.prompt()}"
+
+    def prompt(self):
+        raise NotImplementedError
+
+    def responder(self, comando):
+        """
+        Executa um comando. Retorna (saída, quantidade de latências que o comando leva)
+        """
+        raise NotImplementedError
+
+    def pon(self, slot, pon):
+        return [(onu, dados) for (s, p, onu), dados in self.onus.items() if (s, p) == (slot, pon)]
+
+class OLTHuawei(OLTSimulada):
+    fabricante = "huawei"
+    erro = "  % Unknown command, the error locates at '^'"
+    chassi = 0
+
+    def __init__(self, onus, data_atual=None, seed=0):
+        super().__init__(onus, data_atual)
+        # Cada ONT com 1 a 3 service-ports (internet, VoIP, IPTV)
+        aleatorio = random.Random(seed)
+        self.service_ports = {}
+        for posicao in onus:
+            for _ in range(aleatorio.randint(1, 3)):
+                self.service_ports[len(self.service_ports)] = posicao
+        self.saindo = False
+
+    def prompt(self):
+        if not self.contexto:
+            return "MA5800>"
+        if len(self.contexto) == 1:
+            return "MA5800#"
+        if len(self.contexto) == 2:
+            return "MA5800(config)#"
+        return f"MA5800(config-if-gpon-{self.chassi}/{self.contexto[2]})#"
+
+    def responder(self, comando):
+        if self.saindo:
+            self.saindo = False
+            if comando.lower() == "y":
+                self.encerrada = True
+            return "", 1
+        if not comando:
+            return "", 0
+        if comando == "enable" and not self.contexto:
+            self.contexto.append(comando)
+        elif comando == "config" and len(self.contexto) == 1:
+            self.contexto.append(comando)
+        elif comando.startswith("interface gpon ") and len(self.contexto) >= 2:
+            self.contexto[2:] = [int(comando.split("/")[-1])]
+        elif comando == "quit":
+            if len(self.contexto) <= 1:
+                self.saindo = True
+                return "  Are you sure to log out? (y/n)[n]:", 1
+            self.contexto.pop()
+        elif comando == "mmi-mode original-output":
+            pass
+        elif comando == "display time":
+            return f"  {self.data_atual.isoformat()} 10:00:00+08:00", 1
+        elif comando.startswith("display service-port all"):
+            return self._service_ports(), 1
+        elif comando.startswith("display ont info "):
+            return self._ont_info(comando.split()[3:]), 1
+        elif comando.startswith("undo service-port port "):
+            _, _, _, fsp, _, onu = comando.split()
+            posicao = (*(int(x) for x in fsp.split("/")[1:]), int(onu))
+            for sp in [sp for sp, pos in self.service_ports.items() if pos == posicao]:
+                del self.service_ports[sp]
+        elif comando.startswith("undo service-port "):
+            if self.service_ports.pop(int(comando.split()[2]), None) is None:
+                return "  Failure: The service virtual port does not exist", 1
+        elif comando.startswith("ont delete ") and len(self.contexto) == 3:
+            pon, onu = (int(x) for x in comando.split()[2:4])
+            posicao = (self.contexto[2], pon, onu)
+            if posicao not in self.onus:
+                return "  Failure: The ONT does not exist", 1
+            if posicao in self.service_ports.values():
+                return "  Failure: This configured object has some service virtual ports", 1
+            del self.onus[posicao]
+            self.delecoes += 1
+            return "  Number of ONTs that can be deleted: 1, success: 1", 1
+        elif comando == "save":
+            self.saves += 1
+            return ("  It will take several minutes to save configuration file, please wait...\r\n"
+                    "  Configuration file had been saved successfully"), LATENCIAS_SAVE
+        else:
+            return self.erro, 1
+        return "", 1
+
+    def _service_ports(self):
+        linhas = []
+        down = 0
+        for sp, (slot, pon, onu) in self.service_ports.items():
+            estado = "up" if self.onus[(slot, pon, onu)].online else "down"
+            down += estado == "down"
+            linhas.append(f"{sp:>7}  100 common   gpon {self.chassi}/{slot:<2}/{pon:<2} {onu:<5} 1     vlan  100        -    -    {estado}")
+        filtradas = [linha for linha in linhas if linha.endswith("down")]
+        total = len(self.service_ports)
+        return "\r\n".join(filtradas + [f"  Total : {total}  (Up/Down :    {total - down}/{down})"])
+
+    def _ont_info(self, argumentos):
+        if len(argumentos) == 4 and argumentos[3] == "all":
+            _, slot, pon, _ = argumentos
+            linhas = [f"  {self.chassi}/{int(slot):>2}/{pon}  {onu:>4}  {dados.serial}  active      {'online' if dados.online else 'offline'}  normal   match    no"
+                      for onu, dados in self.pon(int(slot), int(pon))]
+            if not linhas:
+                return "  Failure: There is not any ONT available"
+            return "\r\n".join(["  " + "-" * 77, "  F/S/P   ONT         SN         Control     Run      Config   Match    Protect", "  " + "-" * 77] + linhas)
+        _, slot, pon, onu = (int(x) for x in argumentos)
+        dados = self.onus.get((slot, pon, onu))
+        if dados is None:
+            return "  Failure: The ONT does not exist"
+        queda = f"{dados.queda.isoformat()} 10:00:00+08:00" if dados.queda else "-"
+        return (f"  F/S/P                   : {self.chassi}/{slot}/{pon}\r\n  ONT-ID                  : {onu}\r\n"
+                f"  Run state               : {'online' if dados.online else 'offline'}\r\n"
+                f"  SN                      : {dados.serial} (HWTC-{dados.serial[-8:]})\r\n"
+                f"  Last down time          : {queda}")
+
+class OLTZTE(OLTSimulada):
+    fabricante = "zte"
+    erro = "%Error 20200: Invalid input detected at '^' marker."
+    chassi = 1
+
+    def prompt(self):
+        if not self.contexto:
+            return "ZXAN#"
+        if len(self.contexto) == 1:
+            return "ZXAN(config)#"
+        return f"ZXAN(config-if-{self.contexto[1]})#"
+
+    def responder(self, comando):
+        if not comando:
+            return "", 0
+        if comando == "configure terminal" and not self.contexto:
+            self.contexto.append(comando)
+        elif comando.startswith("interface gpon_olt-") and self.contexto:
+            self.contexto[1:] = [comando.split()[1]]
+        elif comando == "exit":
+            if self.contexto:
+                self.contexto.pop()
+        elif comando == "end":
+            self.contexto = []
+        elif comando == "terminal length 0":
+            pass
+        elif comando == "show clock":
+            return f"10:00:00 BRT {self.data_atual.strftime('%a %b %d %Y')}", 1
+        elif comando.startswith("show gpon onu state"):
+            return self._estado(comando.split()[4:]), 1
+        elif comando.startswith("show gpon onu detail-info gpon_onu-"):
+            return self._detalhe(comando.split()[4]), 1
+        elif comando.startswith("no onu ") and len(self.contexto) == 2:
+            _, slot, pon = (int(x) for x in self.contexto[1].split("-")[1].split("/"))
+            if self.onus.pop((slot, pon, int(comando.split()[2])), None) is None:
+                return "%Code 32310-GPONSRV : The ONU does not exist.", 1
+            self.delecoes += 1
+        elif comando == "write":
+            self.saves += 1
+            return "Building configuration...\r\n..[OK]", LATENCIAS_SAVE
+        else:
+            return self.erro, 1
+        return "", 1
+
+    def _estado(self, argumentos):
+        if argumentos:
+            _, slot, pon = (int(x) for x in argumentos[0].split("-")[1].split("/"))
+            onus = [((slot, pon, onu), dados) for onu, dados in self.pon(slot, pon)]
+        else:
+            onus = self.onus.items()
+        linhas = [(f"{self.chassi}/{slot}/{pon}:{onu}", "enable", "enable" if dados.online else "disable",
+                   "working" if dados.online else "LOS", "1(GPON)") for (slot, pon, onu), dados in onus]
+        return _tabela(COLUNAS_ZTE, linhas)
+
+    def _detalhe(self, indice):
+        slot, pon, onu = (int(x) for x in re.split(r"[/:]", indice.split("-")[1])[1:])
+        dados = self.onus.get((slot, pon, onu))
+        if dados is None:
+            return "%Code 32310-GPONSRV : The ONU does not exist."
+        if dados.queda is None:
+            historico = "   1   0000-00-00 00:00:00  0000-00-00 00:00:00"
+        else:
+            subida = dados.queda - timedelta(days=30)
+            historico = f"   1   {subida.isoformat()} 10:00:00  {dados.queda.isoformat()} 10:00:00  LOS"
+        return (f"ONU interface:          gpon_onu-{indice.split('-')[1]}\r\nSerial number:          {dados.serial}\r\n"
+                f"Phase state:            {'working' if dados.online else 'LOS'}\r\n"
+                f"   Authpass Time          OfflineTime             Cause\r\n{historico}")
+
+class OLTFiberhome(OLTSimulada):
+    fabricante = "fiberhome"
+
+    def prompt(self):
+        return "Admin" + "".join(f"\\{diretorio}" for diretorio in self.contexto) + "#"
+
+    def responder(self, comando):
+        if not comando:
+            return "", 0
+        if comando.startswith("cd "):
+            diretorio = comando[3:].strip()
+            if diretorio == "..":
+                if self.contexto:
+                    self.contexto.pop()
+            else:
+                self.contexto.append(diretorio)
+        elif comando == "terminal length 0":
+            pass
+        elif comando == "show version":
+            return "HSWA RP1000 V1.0 (simulador)", 1
+        elif comando == "show time":
+            return f"Current Date is {self.data_atual.isoformat()} 10:00:00", 1
+        elif comando == "show":
+            slots = sorted({slot for slot, _, _ in self.onus})
+            return "\r\n".join(f"{slot:<6}GC8B    GC8B    MATCH" for slot in slots), 1
+        elif comando.startswith("show authorization slot "):
+            _, _, _, slot, _, pon = comando.split()
+            return self._autorizacao(int(slot), int(pon)), 1
+        elif comando.startswith("show onu_last_on_and_off_time "):
+            _, _, _, slot, _, pon, _, onu = comando.split()
+            return self._ultima_queda(int(slot), int(pon), int(onu)), 1
+        elif comando.startswith("set whitelist phy_addr address "):
+            serial = comando.split()[4]
+            posicao = next((posicao for posicao, dados in self.onus.items() if dados.serial == serial), None)
+            if posicao is None:
+                return "Set whitelist failed: phy address does not exist.", 1
+            del self.onus[posicao]
+            self.delecoes += 1
+        elif comando == "save":
+            self.saves += 1
+            return "Saving...\r\nsave success", LATENCIAS_SAVE
+        else:
+            return self.erro, 1
+        return "", 1
+
+    def _autorizacao(self, slot, pon):
+        linhas = [(slot, pon, onu, "HG260", "A", "up", "up" if dados.online else "dn", dados.serial)
+                  for onu, dados in self.pon(slot, pon)]
+        if not linhas:
+            return "----- no onu -----"
+        return _tabela(COLUNAS_FIBERHOME, linhas)
+
+    def _ultima_queda(self, slot, pon, onu):
+        dados = self.onus.get((slot, pon, onu))
+        if dados is None:
+            return "ONU does not exist."
+        queda = f"{dados.queda.isoformat()} 10:00:00" if dados.queda else "0000-00-00 00:00:00"
+        subida = f"{(dados.queda - timedelta(days=30)).isoformat()} 10:00:00" if dados.queda else "0000-00-00 00:00:00"
+        return f"Last On Time = {subida}, Last Off Time = {queda}"
+
+def criar_olt(fabricante, qtd_onus, proporcao_offline=0.2, dias_max=120, data_atual=None, seed=0):
+    """
+    OLT simulada do fabricante com ONUs geradas por gerar_onus
+    """
+    if fabricante == "huawei":
+        return OLTHuawei(gerar_onus(qtd_onus, proporcao_offline, dias_max, data_atual, seed, "4857", base=0), data_atual, seed)
+    if fabricante == "zte":
+        return OLTZTE(gerar_onus(qtd_onus, proporcao_offline, dias_max, data_atual, seed, "ZTEG"), data_atual)
+    return OLTFiberhome(gerar_onus(qtd_onus, proporcao_offline, dias_max, data_atual, seed, "FHTT"), data_atual)
+
+class CanalSimulado:
+    """
+    Canal no lugar do invoke_shell do paramiko (send, recv, recv_ready, settimeout, close).
+    Cada linha enviada vira eco + saída + prompt, disponível após a latência do comando
+    """
+
+    def __init__(self, olt, latencia=0.0):
+        self.olt = olt
+        self.latencia = latencia
+        self.fila = deque()  # (disponível em, bytes)
+        self.livre_em = time.monotonic()
+        self.closed = False
+        self._pendente = ""
+        self._agendar(olt.banner(), 1)
+
+    def _agendar(self, texto, latencias):
+        # A OLT atende um comando por vez: a resposta sai depois da anterior
+        self.livre_em = max(self.livre_em, time.monotonic()) + self.latencia * latencias
+        self.fila.append((self.livre_em, texto.encode()))
+
+    def send(self, data):
+        if self.closed or self.olt.encerrada:
+            raise OSError("Socket is closed")
+        self._pendente += data
+        *linhas, self._pendente = self._pendente.split("\n")
+        for linha in linhas:
+            comando = linha.strip()
+            self.olt.comandos += 1
+            saida, latencias = self.olt.responder(comando)
+            if self.olt.encerrada:
+                self._agendar(f"{comando}\r\n", latencias)
+                break
+            corpo = f"{saida}\r\n" if saida else ""
+            self._agendar(f"{comando}\r\n{corpo}{self.olt.prompt()}", latencias)
+        return len(data)
+
+    def recv_ready(self):
+        return bool(self.fila) and self.fila[0][0] <= time.monotonic()
+
+    def recv(self, nbytes):
+        # Como o paramiko, bloqueia até haver dados
+        if self.fila and not self.recv_ready():
+            _esperar(max(0.0, self.fila[0][0] - time.monotonic()))
+        partes = []
+        tamanho = 0
+        agora = time.monotonic()
+        while self.fila and self.fila[0][0] <= agora and tamanho < nbytes:
+            pronto, dados = self.fila.popleft()
+            resto = nbytes - tamanho
+            if len(dados) > resto:
+                self.fila.appendleft((pronto, dados[resto:]))
+                dados = dados[:resto]
+            partes.append(dados)
+            tamanho += len(dados)
+        return b"".join(partes)
+
+    def settimeout(self, timeout):
+        pass
+
+    def close(self):
+        self.closed = True
+
+class ConexaoSimulada:
+    """
+    Conexão no lugar do SSHClient. Com transporte=True mantém uma thread parada por
+    conexão, como a thread de Transport do paramiko (memória e contagem de threads)
+    """
+
+    def __init__(self, canal, transporte=True):
+        self.canal = canal
+        self._fechada = threading.Event()
+        if transporte:
+            threading.Thread(target=self._fechada.wait, daemon=True).start()
+
+    def close(self):
+        self.canal.close()
+        self._fechada.set()
+
+def conector(olts, latencia=0.0, latencia_conexao=0.0, transporte=True):
+    """
+    Função no lugar do connection_ssh.ssh para um dict {host: OLTSimulada}.
+    Retorna ssh(host) -> (conexão, canal)
+    """
+    def ssh(host):
+        if latencia_conexao:
+            _esperar(latencia_conexao)
+        olt = olts.get(host)
+        if olt is None:
+            raise OSError(f"[Errno 113] No route to host: {host}")
+        olt.contexto = []
+        olt.encerrada = False
+        canal = CanalSimulado(olt, latencia)
+        return ConexaoSimulada(canal, transporte), canal
+    return ssh
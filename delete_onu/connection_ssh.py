@@ -1,7 +1,9 @@
-import paramiko
 from dotenv import load_dotenv
 import os
 
+from gravador import gravar_se_ativo
+from ociosidade import contabilizar_se_ativo
+
 load_dotenv()
 
 PORT = 22
@@ -9,6 +11,9 @@ LOGIN = os.getenv("LOGIN")
 PASSWORD = os.getenv("PASSWORD")
 
 def ssh(host):
+    # paramiko só é importado na primeira conexão (inicialização mais rápida)
+    import paramiko
+
     conn = paramiko.SSHClient()
     conn.set_missing_host_key_policy(paramiko.AutoAddPolicy())
 
@@ -20,5 +25,5 @@ def ssh(host):
         timeout=60
     )
     
-    shell = conn.invoke_shell()
+    shell = contabilizar_se_ativo(gravar_se_ativo(conn.invoke_shell(), host))
     return conn, shell
\ No newline at end of file
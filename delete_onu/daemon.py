@@ -0,0 +1,288 @@
+import signal
+import time
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from threading import Lock, Event, Thread
+
+from connection_ssh import ssh
+from agendador import carregar_agenda, hosts_devidos, atualizar_agenda
+from tempos_resposta import carregar_tempos, salvar_tempos
+from resultado_olt import ResultadoOLT, escrever_relatorio, registrar_erro
+from metricas import acompanhar_olt
+
+# Intervalo (segundos) entre keepalives enviados às sessões ociosas
+KEEPALIVE = 60
+# Pausa padrão (segundos) entre o fim de uma varredura e o início da próxima
+INTERVALO_VARREDURA = 900
+# Tempo (segundos) que uma sessão pode ficar ociosa antes de ser fechada
+TEMPO_OCIOSO = 1800
+# Fases (fase_atual) em que uma falha ainda pode ser repetida numa conexão nova: nenhum
+# comando de deleção foi enviado na tentativa
+FASES_REPETIVEIS = {"descoberta"}
+
+class Sessao:
+    """
+    Sessão SSH autenticada e com o modo CLI já preparado
+    """
+    __slots__ = ("conn", "shell", "ultimo_uso", "em_uso")
+
+    def __init__(self, conn, shell):
+        self.conn = conn
+        self.shell = shell
+        self.ultimo_uso = time.monotonic()
+        self.em_uso = True
+
+    def ativa(self):
+        transport = self.conn.get_transport()
+        return transport is not None and transport.is_active() and not self.shell.closed
+
+    def fechar(self):
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+
+class PoolSessoes:
+    """
+    Pool limitado de sessões por OLT: reaproveita sessões vivas, fecha as ociosas,
+    envia keepalives e reconecta quando a sessão caiu
+    """
+
+    def __init__(self, preparar_sessao, max_sessoes, tempo_ocioso=TEMPO_OCIOSO, intervalo_conexao=0):
+        self.preparar_sessao = preparar_sessao
+        self.max_sessoes = max_sessoes
+        self.tempo_ocioso = tempo_ocioso
+        self.intervalo_conexao = intervalo_conexao
+        self.sessoes = {}  # host -> Sessao (None enquanto a conexão está sendo aberta)
+        self.lock = Lock()
+        self.conexao_lock = Lock()
+        self.ultima_conexao = 0.0
+        self.conexoes_abertas = 0
+
+    def _liberar_vaga(self):
+        # Fecha a sessão ociosa usada há mais tempo (chamado com self.lock)
+        ociosas = [(s.ultimo_uso, h) for h, s in self.sessoes.items() if s is not None and not s.em_uso]
+        if not ociosas:
+            return False
+        _, host = min(ociosas)
+        self.sessoes.pop(host).fechar()
+        return True
+
+    def _conectar(self, host):
+        # Espaça as conexões novas como o THREAD_DELAY do modo cron, evitando rajadas de login
+        with self.conexao_lock:
+            espera = self.ultima_conexao + self.intervalo_conexao - time.monotonic()
+            if espera > 0:
+                time.sleep(espera)
+            self.ultima_conexao = time.monotonic()
+
+        conn, shell = ssh(host)
+        try:
+            transport = conn.get_transport()
+            if transport is not None:
+                transport.set_keepalive(KEEPALIVE)
+            shell = self.preparar_sessao(shell)
+        except Exception:
+            conn.close()
+            raise
+        return Sessao(conn, shell)
+
+    def obter(self, host):
+        """
+        Retorna o shell de uma sessão pronta para o host, abrindo uma nova se necessário
+        """
+        with self.lock:
+            sessao = self.sessoes.get(host)
+            if sessao is not None and not sessao.em_uso:
+                if sessao.ativa():
+                    sessao.em_uso = True
+                    return sessao.shell
+                # Sessão caiu: descarta e reconecta abaixo
+                self.sessoes.pop(host).fechar()
+
+            while len(self.sessoes) >= self.max_sessoes:
+                if not self._liberar_vaga():
+                    raise RuntimeError(f"Pool de sessões cheio ({self.max_sessoes}) ao abrir sessão com {host}")
+            self.sessoes[host] = None
+
+        try:
+            sessao = self._conectar(host)
+        except Exception:
+            with self.lock:
+                self.sessoes.pop(host, None)
+            raise
+
+        with self.lock:
+            self.sessoes[host] = sessao
+            self.conexoes_abertas += 1
+        return sessao.shell
+
+    def devolver(self, host):
+        """
+        Devolve a sessão ao pool após o uso
+        """
+        with self.lock:
+            sessao = self.sessoes.get(host)
+            if sessao is not None:
+                sessao.em_uso = False
+                sessao.ultimo_uso = time.monotonic()
+
+    def descartar(self, host):
+        """
+        Fecha e remove a sessão do host (ex: após falha), forçando reconexão no próximo uso
+        """
+        with self.lock:
+            sessao = self.sessoes.pop(host, None)
+        if sessao is not None:
+            sessao.fechar()
+
+    def manutencao(self):
+        """
+        Fecha sessões ociosas há mais de tempo_ocioso e envia keepalive às demais
+        para não estourar o idle-timeout da CLI da OLT
+        """
+        agora = time.monotonic()
+        with self.lock:
+            for host, sessao in list(self.sessoes.items()):
+                if sessao is None or sessao.em_uso:
+                    continue
+                if agora - sessao.ultimo_uso > self.tempo_ocioso or not sessao.ativa():
+                    self.sessoes.pop(host).fechar()
+                    continue
+                try:
+                    sessao.shell.send('\n')
+                    while sessao.shell.recv_ready():
+                        sessao.shell.recv(65535)
+                except Exception:
+                    self.sessoes.pop(host).fechar()
+
+    def fechar_todas(self):
+        with self.lock:
+            sessoes = [s for s in self.sessoes.values() if s is not None]
+            self.sessoes.clear()
+        for sessao in sessoes:
+            sessao.fechar()
+
+def limpar_buffer(shell):
+    """
+    Descarta saída pendente de um uso anterior da sessão
+    """
+    while shell.recv_ready():
+        shell.recv(65535)
+
+def processar_olt_pool(modulo, pool, host, thread_id):
+    """
+    Processa uma OLT usando uma sessão do pool. Falha ao abrir a sessão, ou da sessão antes
+    de qualquer deleção (sessão do pool que caiu, descoberta), descarta a sessão e tenta mais
+    uma vez com uma conexão nova. Depois que a deleção começou não há nova tentativa: os
+    comandos seriam reenviados sem verificação no meio. Retorna o ResultadoOLT
+    """
+    resultado = ResultadoOLT(host, thread_id, "delete")
+    with resultado.executando():
+        for tentativa in (1, 2):
+            try:
+                shell = pool.obter(host)
+            except Exception as e:
+                if tentativa == 1:
+                    modulo.write_log(f"[WARN] Thread-{thread_id}: Falha ao conectar OLT {host} ({e}), tentando de novo...")
+                    continue
+                erro = f"Falha ao conectar OLT {host}: {e}"
+                modulo.write_log(f"[ERRO] Thread-{thread_id}: {erro}")
+                registrar_erro(erro)
+                return resultado
+
+            try:
+                limpar_buffer(shell)
+                modulo.processar_sessao(shell, host, thread_id, "delete", manter_sessao=True)
+                pool.devolver(host)
+                return resultado
+            except Exception as e:
+                pool.descartar(host)
+                if tentativa == 2 or not FASES_REPETIVEIS.issuperset(resultado.fases):
+                    fase = resultado.fases[-1] if resultado.fases else "conexão"
+                    erro = f"Falha ao processar OLT {host} (fase {fase}): {e}"
+                    modulo.write_log(f"[ERRO] Thread-{thread_id}: {erro}")
+                    registrar_erro(erro)
+                    return resultado
+                modulo.write_log(f"[WARN] Thread-{thread_id}: Sessão com {host} falhou ({e}), reconectando...")
+                resultado.zerar_contadores()
+                resultado.fases = []
+
+def executar_daemon(modulo, args):
+    """
+    Modo daemon: varreduras contínuas sobre o inventário reaproveitando sessões
+    já autenticadas e preparadas, até receber SIGTERM/SIGINT
+    """
+    parar = Event()
+
+    def sinal_parada(signum, frame):
+        modulo.write_log(f"[INFO] Sinal {signum} recebido, encerrando após a varredura atual...")
+        parar.set()
+
+    signal.signal(signal.SIGTERM, sinal_parada)
+    signal.signal(signal.SIGINT, sinal_parada)
+
+    max_sessoes = args.max_sessoes or modulo.MAX_THREADS
+    pool = PoolSessoes(modulo.preparar_sessao, max_sessoes, args.ocioso, modulo.THREAD_DELAY)
+
+    def manutencao_periodica():
+        while not parar.wait(KEEPALIVE):
+            pool.manutencao()
+
+    Thread(target=manutencao_periodica, daemon=True).start()
+
+    modulo.write_log(f"DAEMON INICIADO EM {datetime.now().strftime('%Y/%m/%d %H:%M:%S')} - Max Sessões: {max_sessoes}\n")
+
+    carregar_tempos(modulo.path_tempos)
+
+    varredura = 0
+    thread_id = 0
+    try:
+        while not parar.is_set():
+            varredura += 1
+            inicio = time.monotonic()
+
+            try:
+                equipamentos = modulo.carregar_equipamentos()
+            except Exception as e:
+                modulo.write_log(f"[ERRO] Varredura {varredura}: não foi possível carregar o inventário: {e}")
+                parar.wait(args.intervalo)
+                continue
+
+            if args.agendado:
+                equipamentos = hosts_devidos(carregar_agenda(modulo.path_agenda), equipamentos,
+                                             dias_varredura=args.varredura_completa)
+
+            modulo.write_log(f"[INFO] Varredura {varredura}: {len(equipamentos)} OLTs")
+            inicio_varredura = datetime.now()
+
+            resultados = []
+            # acompanhar_olt: estado, fase e contadores parciais da OLT no /metrics (--metricas)
+            processar = acompanhar_olt(lambda host, thread_id: processar_olt_pool(modulo, pool, host, thread_id))
+            with ThreadPoolExecutor(max_workers=max_sessoes) as executor:
+                future_to_host = {}
+                for host in equipamentos:
+                    thread_id += 1
+                    future = executor.submit(processar, host, thread_id)
+                    future_to_host[future] = host
+
+                for future in as_completed(future_to_host):
+                    resultado = future.result()
+                    print(resultado.linha_log())
+                    resultados.append(resultado)
+                    modulo.somar_resultado(resultado)
+
+            atualizar_agenda(modulo.path_agenda)
+            modulo.salvar_total_no_log()
+            escrever_relatorio(modulo.path_relatorio, args.fabricante, "daemon", resultados, inicio_varredura)
+            salvar_tempos(modulo.path_tempos)
+
+            duracao = int(time.monotonic() - inicio)
+            modulo.write_log(f"[INFO] Varredura {varredura} concluída em {duracao}s "
+                             f"({pool.conexoes_abertas} conexões abertas desde o início)")
+
+            parar.wait(args.intervalo)
+    finally:
+        parar.set()
+        pool.fechar_todas()
+        modulo.write_log(f"DAEMON FINALIZADO EM {datetime.now().strftime('%Y/%m/%d %H:%M:%S')}\n")
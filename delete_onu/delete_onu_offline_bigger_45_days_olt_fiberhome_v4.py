@@ -1,19 +1,46 @@
 import os
+import sys
 import time
 import re
-from datetime import datetime, date
-import pandas as pd
-from dotenv import load_dotenv
+from datetime import datetime
 from connection_ssh import ssh
-import threading
+from gravador import ativar_gravacao
+from perfilador import ativar_perfil, perfilar_olt, escrever_perfil_agregado
+from ociosidade import ativar_ociosidade, contabilizar_olt, escrever_ociosidade, medir, LockMedido, LOG
+from janela import definir_prazo, carregar_custos, salvar_custos, ordenar_por_atraso, no_prazo, lotes_no_prazo, medir_save, registrar_candidatos, prazo_esgotado, segundos_restantes, resumo_prazo
+from metricas import iniciar_servidor, registrar_contador, registrar_olts, acompanhar_olt, fase_atual, somar_olt
+from argumentos import criar_parser
+from particao import hosts_da_particao, caminho_resultados, escrever_resultados, arquivos_resultados, mesclar_resultados
+from resultado_olt import ResultadoOLT, contar, contar_avaliacoes, registrar_erro, registrar_save, escrever_relatorio, CONSULTADAS, DELETADAS, SEM_QUEDA, SUCESSO, ERRO, ADIADA
+from daemon import executar_daemon
+from fila import executar_coordenador, executar_worker
+from pipeline import executar_pipeline
+from tempos_resposta import ler_ate_prompt, aguardar_comando, carregar_tempos, salvar_tempos
+from snmp_backend import coletar_candidatos
+from ritmo import Ritmo
+from sessao_cli import SessaoCLI, FIBERHOME, FIBERHOME_RAIZ, FIBERHOME_ONU, FIBERHOME_SERVICE
+from census import linha_census, escrever_census
+from registro_onu import CandidatosONU
+from inventario import carregar_hosts
+from politica import Politica, carregar_politica, avaliar, resumo, proxima_delecao
+from verificacao import verificar_delecoes
+from tabela import TabelaFixa, TabelaRegex, registros
+from agendador import registrar_visita, conferir_delecoes, carregar_agenda, hosts_devidos, atualizar_agenda
 from concurrent.futures import ThreadPoolExecutor, as_completed
-import queue
-from threading import Lock
 
 # Paths de arquivos
 path_02 = 'log_fh.txt'
 path_03 = 'onu_last_on_and_off_time.txt'
 path_04_base = 'slots_ativos'  # Será usado como prefixo para cada thread
+path_census = 'census_fh.csv'
+path_agenda = 'agenda_fh.json'
+path_tempos = 'tempos_fh.json'
+path_ociosidade = 'ociosidade_fh.csv'
+path_custos = 'custos_fh.json'
+path_politica = 'politica_fh.json'
+path_resultados = 'resultado_fh'  # resultado por OLT de cada partição (--shard)
+path_fila = 'fila_fh.db'  # fila de OLTs dos modos queue/worker
+path_relatorio = 'relatorio_fh.json'  # status, tempos e contadores de cada OLT da execução
 qtd_dias = 45
 
 # Variavel que controla o total de onus deletadas
@@ -24,12 +51,29 @@ total_onus_sem_last_off_time = 0
 # Configurações de threading
 MAX_THREADS = 50  # Número máximo de threads simultâneas
 THREAD_DELAY = 10  # Delay entre inicialização de threads (segundos)
+JANELA_PIPELINE = 8  # Comandos show enviados de uma vez por sessão (inicial; ajustado pelo ritmo da OLT)
+INTERVALO_DELECAO = 1  # Segundos entre comandos de deleção (inicial; ajustado pelo ritmo da OLT)
+# Limites do ritmo da OLT (ritmo.py): por padrão o intervalo não desce abaixo do INTERVALO_DELECAO
+INTERVALO_MINIMO = INTERVALO_DELECAO  # Segundos (definido por --intervalo-minimo)
+INTERVALO_MAXIMO = 5.0  # Segundos
+JANELA_MINIMA = 1  # Comandos por janela do pipeline
+JANELA_MAXIMA = 32  # Comandos por janela do pipeline (definido por --janela-maxima)
+BACKEND_DESCOBERTA = "cli"  # "cli" ou "snmp" (definido por --backend)
+DELECAO_POR_PON = False  # deleção em fluxo, PON a PON (definido por --por-pon)
+POLITICA = Politica(qtd_dias)  # limites e exclusões (politica_fh.json, lida no início da rotina)
+
+# show authorization: Slot, Pon, Onu, OnuType, OST (up/dn) e PhyId (colunas pelo cabeçalho;
+# sem cabeçalho, uma linha "1  1  1  HG260  A  1  dn  FHTT12345678 ...")
+COLUNAS_AUTHORIZATION = (0, 1, 2, 3, 6, 7)
+LAYOUT_AUTHORIZATION = TabelaRegex(r'^\s*(\d+)\s+(\d+)\s+(\d+)\s+(\S+)\s+\S+\s+\S+\s+(up|dn)\b[ \t]*(\S*)')
+# Resposta do show authorization para um PON sem ONUs autorizadas
+PON_VAZIO_FIBERHOME = "no onu"
 
 # Lista de OLTs para validação ou uso unico
 #equipamentos = ['10.144.123.12']  # Adicione mais IPs aqui
 
 # Lock para escrita no arquivo de log (thread-safe)
-log_lock = Lock()
+log_lock = LockMedido()
 
 # -------------------------
 # Funções para controlar contador global
@@ -37,33 +81,37 @@ log_lock = Lock()
 
 def adicionar_onus_deletadas(quantidade):
     """
-    Adiciona ONUs ao contador global usando o log_lock existente
+    Adiciona ONUs deletadas ao resultado da OLT da thread atual
     """
-    global total_onus_deletadas
-    with log_lock:
-        total_onus_deletadas += quantidade
+    contar(DELETADAS, quantidade)
         
 def adicionar_onus_sem_last_off_time(quantidade):
     """
-    Adiciona ONUs sem last off time ao contador global
+    Adiciona ONUs sem last off time ao resultado da OLT da thread atual
     """
-    global total_onus_sem_last_off_time
-    with log_lock:
-        total_onus_sem_last_off_time += quantidade
+    contar(SEM_QUEDA, quantidade)
+
+def somar_resultado(resultado):
+    """
+    Soma o ResultadoOLT aos contadores globais. Chamada só pela thread principal
+    (ao receber cada OLT), por isso sem lock
+    """
+    global total_onus_deletadas, total_onus_sem_last_off_time
+    total_onus_deletadas += resultado.deletadas
+    total_onus_sem_last_off_time += resultado.sem_queda
+    somar_olt(resultado)
 
 def obter_total_onus_deletadas():
     """
     Retorna o total geral de ONUs deletadas
     """
-    with log_lock:
-        return total_onus_deletadas
+    return total_onus_deletadas
 
 def obter_total_onus_sem_last_off_time():
     """
     Retorna o total geral de ONUs sem last off time
     """
-    with log_lock:
-        return total_onus_sem_last_off_time
+    return total_onus_sem_last_off_time
 
 def salvar_total_no_log():
     """
@@ -74,7 +122,7 @@ def salvar_total_no_log():
     
     write_log("\n" + "="*50)
     write_log(f"TOTAL GERAL DE ONUs DELETADAS: {total_deletadas}")
-    write_log(f"SENDO {total_onus_sem_last_off_time} ONUs SEM LAST OFF TIME (0000-00-00)")
+    write_log(f"TOTAL GERAL DE ONUs SEM LAST OFF TIME (0000-00-00) ENCONTRADAS: {total_onus_sem_last_off_time}")
     write_log("="*50)
 
 # Função thread-safe para escrita de logs
@@ -82,12 +130,13 @@ def write_log(message, include_print=True):
     """
     Escreve log de forma thread-safe
     """
-    if include_print:
-        print(message)
-    
-    with log_lock:
-        with open(path_02, "a", encoding="utf-8") as log_file:
-            log_file.write(f"{message}\n")
+    with medir(LOG):
+        if include_print:
+            print(message)
+        
+        with log_lock:
+            with open(path_02, "a", encoding="utf-8") as log_file:
+                log_file.write(f"{message}\n")
 
 # Função para ler toda a saída do shell sem cortar
 def read_output(shell, buffer_size=65535, wait=1):
@@ -117,15 +166,9 @@ def rotina_finalizada(start_time, total_hosts):
 
 # Função para obter versão da OLT
 def get_version_olt(shell):
-    shell.send("cd service\n")
-    time.sleep(0.5)
-    shell.send("terminal length 0\n")
-    time.sleep(0.5)
-    shell.send("cd ..\n")
-    time.sleep(0.5)
-    shell.send("show version\n")
-    time.sleep(5)
-    result = read_output(shell)
+    shell.configurar_uma_vez("terminal length 0", FIBERHOME_SERVICE)
+    shell.executar("show version\n", FIBERHOME_RAIZ)
+    result = ler_ate_prompt(shell, "show version", 6)
     
     versao = "DESCONHECIDO"
     
@@ -147,13 +190,16 @@ def get_version_olt(shell):
         elif "HSUC" in line and "RP1200" in line:
             versao = "RP1200"
 
+    # Histórico de tempos de resposta passa a ser por modelo/versão
+    if versao != "DESCONHECIDO":
+        shell.equipamento = versao
+
     return versao
 
 # Função para coletar hora da OLT
 def olt_date(shell):
-    shell.send('show time\n')
-    time.sleep(5)
-    result = read_output(shell)
+    shell.executar('show time\n', FIBERHOME_RAIZ)
+    result = ler_ate_prompt(shell, 'show time', 6)
     
     for line in result.splitlines():
         # Extrai a data usando regex
@@ -173,9 +219,8 @@ def get_slot(shell, thread_id):
     Coleta informações dos slots da OLT usando comando 'show'
     Thread-safe version com arquivo específico por thread
     """
-    shell.send('show\n')
-    time.sleep(10)
-    result = read_output(shell)
+    shell.executar('show\n', FIBERHOME_RAIZ)
+    result = ler_ate_prompt(shell, 'show', 11)
     
     # Cada thread usa seu próprio arquivo
     path_04 = f'{path_04_base}_{thread_id}.txt'
@@ -231,9 +276,13 @@ def get_slot_enable(shell, thread_id):
             pass
                     
     except FileNotFoundError:
-        write_log(f"[ERRO] Arquivo {path_04} não encontrado ao processar slots")
+        erro = f"Arquivo {path_04} não encontrado ao processar slots"
+        write_log(f"[ERRO] {erro}")
+        registrar_erro(erro)
     except Exception as e:
-        write_log(f"[ERRO] Erro ao processar slots: {e}")
+        erro = f"Erro ao processar slots: {e}"
+        write_log(f"[ERRO] {erro}")
+        registrar_erro(erro)
 
     return list_slot_enables, list_pon_enable
 
@@ -254,7 +303,9 @@ def processar_slots_olt(shell, host, thread_id):
         return slots_habilitados, pons_por_slot
         
     except Exception as e:
-        write_log(f"[ERRO] Thread-{thread_id}: Falha ao processar slots da OLT {host}: {e}")
+        erro = f"Falha ao processar slots da OLT {host}: {e}"
+        write_log(f"[ERRO] Thread-{thread_id}: {erro}")
+        registrar_erro(erro)
         return [], []
 
 # Função para coletar ONUs autorizadas que estão DOWN
@@ -262,28 +313,21 @@ def get_onus_down(shell, slots_habilitados, pons_por_slot, host, thread_id):
     """
     Thread-safe version
     """
-    onus_down = []
+    onus_down = CandidatosONU("fiberhome", host)
     
     try:
-        shell.send('cd onu\n')
-        time.sleep(1)
-        
         #write_log(f"[INFO] Thread-{thread_id}: Coletando ONUs DOWN de {len(slots_habilitados)} slot(s) da OLT {host}...")
         print(f"[INFO] Thread-{thread_id}: Coletando ONUs DOWN de {len(slots_habilitados)} slot(s) da OLT {host}...\n")
         
-        for i, slot in enumerate(slots_habilitados):
-            max_pons = pons_por_slot[i]
-            
-            for pon in range(1, max_pons + 1):
-                print(f"[INFO] Thread-{thread_id}: Verificando slot {slot}, PON {pon}...\n")
-                command = f'show authorization slot {slot} pon {pon}\n'
-                shell.send(command)
-                time.sleep(5)
-                result = read_output(shell)
-                
-                onus_down.extend(parse_authorization_output(result, slot, pon))
+        pons = [(slot, pon) for i, slot in enumerate(slots_habilitados) for pon in range(1, pons_por_slot[i] + 1)]
+        
+        # Consulta os PONs em janelas de comandos enviados de uma vez (pipeline)
+        comandos = [f'show authorization slot {slot} pon {pon}' for slot, pon in pons]
+        saidas = executar_pipeline(shell, comandos, FIBERHOME_ONU, JANELA_PIPELINE, timeout_por_comando=6, nome="show authorization")
         
-        time.sleep(3)
+        for (slot, pon), result in zip(pons, saidas):
+            print(f"[INFO] Thread-{thread_id}: Verificando slot {slot}, PON {pon}...\n")
+            parse_authorization_output(result, slot, pon, onus_down)
         
         if len(onus_down) >= 1:
             #write_log(f"[INFO] Thread-{thread_id}: OLT {host} - Encontradas {len(onus_down)} ONUs offline")
@@ -292,51 +336,82 @@ def get_onus_down(shell, slots_habilitados, pons_por_slot, host, thread_id):
         return onus_down
         
     except Exception as e:
-        write_log(f"[ERRO] Thread-{thread_id}: Erro ao coletar ONUs DOWN da OLT {host}: {e}")
+        erro = f"Erro ao coletar ONUs DOWN da OLT {host}: {e}"
+        write_log(f"[ERRO] Thread-{thread_id}: {erro}")
+        registrar_erro(erro)
         return []
 
-def parse_authorization_output(output, slot, pon):
+def parse_authorization_output(output, slot, pon, onus_down=None):
     """
     Analisa o output do comando show authorization e extrai ONUs DOWN
+    (acrescenta em onus_down, um CandidatosONU, se informado)
     """
-    onus_down = []
+    if onus_down is None:
+        onus_down = CandidatosONU("fiberhome", "")
+    
+    for slot_onu, pon_onu, onu, onu_type, estado, phy_id in registros(output, COLUNAS_AUTHORIZATION, LAYOUT_AUTHORIZATION, contem=' dn'):
+        if slot_onu == str(slot) and pon_onu == str(pon) and estado == 'dn':
+            onus_down.adicionar(0, slot_onu, pon_onu, onu, serial=phy_id, modelo=onu_type)
     
-    lines = output.splitlines()
-    for line in lines:
-        if 'dn' in line and len(line.split()) >= 6:
-            parts = line.split()
-            try:
-                if (parts[0] == str(slot) and 
-                    parts[1] == str(pon) and 
-                    parts[6] == 'dn'):
-                    
-                    onu_info = {
-                        'slot': parts[0],
-                        'pon': parts[1], 
-                        'onu': parts[2],
-                        'onu_type': parts[3],
-                        'phy_id': parts[7] if len(parts) > 7 else '',
-                    }
-                    onus_down.append(onu_info)
-                    
-            except (IndexError, ValueError):
-                continue
-                
     return onus_down
 
-def check_onu_offline_time(shell, onu_info, data_atual_olt,thread_id, contador_sem_last_off):
+def contar_authorization_output(output, slot, pon):
+    """
+    Conta ONUs autorizadas de um PON no output do show authorization
+    Retorna (total, up, dn); o dn usa o mesmo critério do parse_authorization_output
+    """
+    total = 0
+    up = 0
+    dn = 0
+    
+    for slot_onu, pon_onu, _, _, estado, _ in registros(output, COLUNAS_AUTHORIZATION, LAYOUT_AUTHORIZATION):
+        if slot_onu == str(slot) and pon_onu == str(pon) and estado in ('up', 'dn'):
+            total += 1
+            if estado == 'up':
+                up += 1
+            else:
+                dn += 1
+    
+    return total, up, dn
+
+def census_olt(shell, host, thread_id):
+    """
+    Censo rápido (somente leitura): conta ONUs up/dn por PON usando apenas o
+    show authorization, sem consultar o last_on_and_off_time de cada ONU
+    """
+    fase_atual("census")
+    version = get_version_olt(shell)
+    print(f"[INFO] Thread-{thread_id}: OLT {host} - Versão: {version}\n")
+    
+    slots_habilitados, pons_por_slot = processar_slots_olt(shell, host, thread_id)
+    
+    linhas = []
+    if not slots_habilitados:
+        write_log(f"[WARN] Thread-{thread_id}: Nenhum slot ativo encontrado na OLT {host}")
+        return linhas
+    
+    pons = [(slot, pon) for i, slot in enumerate(slots_habilitados) for pon in range(1, pons_por_slot[i] + 1)]
+    comandos = [f'show authorization slot {slot} pon {pon}' for slot, pon in pons]
+    saidas = executar_pipeline(shell, comandos, FIBERHOME_ONU, JANELA_PIPELINE, timeout_por_comando=6, nome="show authorization")
+    
+    for (slot, pon), result in zip(pons, saidas):
+        total, up, dn = contar_authorization_output(result, slot, pon)
+        if total:
+            linhas.append(linha_census("fiberhome", host, "", slot, pon, total, up, dn, version))
+    
+    total_offline = sum(linha["offline"] for linha in linhas)
+    print(f"[INFO] Thread-{thread_id}: OLT {host} - {total_offline} ONUs offline em {len(linhas)} PON(s)\n")
+    return linhas
+
+def check_onu_offline_time(result, onu_info, data_atual_olt,thread_id, contador_sem_last_off):
     """
     Verifica há quantos dias uma ONU específica está offline
+    a partir do output do show onu_last_on_and_off_time
     """
     try:
-        slot = onu_info['slot']
-        pon = onu_info['pon'] 
-        onu = onu_info['onu']
-        
-        command = f'show onu_last_on_and_off_time slot {slot} pon {pon} onu {onu}\n'
-        shell.send(command)
-        time.sleep(3)
-        result = read_output(shell)
+        slot = onu_info.slot
+        pon = onu_info.pon
+        onu = onu_info.onu
         
         for line in result.splitlines():
             if 'Last Off Time' in line and 'Last On Time' in line:
@@ -347,15 +422,14 @@ def check_onu_offline_time(shell, onu_info, data_atual_olt,thread_id, contador_s
                     last_off_time = off_match.group(1)
                     
                     if last_off_time == '0000-00-00':
-                        continue # Ignora ONUs com last_off_time 0000-00-00, comente esta linha se quiser considerar
+                        # Sem data de queda: a política decide se deleta (nunca_online)
                         contador_sem_last_off[0] += 1
                         print(f"[INFO] Thread-{thread_id}: ONU {slot}/{pon}:{onu} SEM LAST OFF TIME (0000-00-00)")
                         
-                        
                         if on_match and on_match.group(1) == '0000-00-00':
-                            onu_info['dias_offline'] = 1000
-                            onu_info['last_off_time'] = last_off_time
-                            onu_info['status_offline'] = 'fantasma'
+                            onu_info.dias_offline = None
+                            onu_info.ultima_queda = None
+                            onu_info.status = 'fantasma'
                             return onu_info
                             
                         else:
@@ -365,9 +439,9 @@ def check_onu_offline_time(shell, onu_info, data_atual_olt,thread_id, contador_s
                         data_off = datetime.strptime(last_off_time, '%Y-%m-%d').date()
                         dias_offline = (data_atual_olt - data_off).days
                         
-                        onu_info['dias_offline'] = dias_offline
-                        onu_info['last_off_time'] = last_off_time
-                        onu_info['status_offline'] = 'normal'
+                        onu_info.dias_offline = dias_offline
+                        onu_info.ultima_queda = data_off
+                        onu_info.status = 'normal'
                         return onu_info
                         
                     except ValueError:
@@ -378,10 +452,24 @@ def check_onu_offline_time(shell, onu_info, data_atual_olt,thread_id, contador_s
     except Exception as e:
         return None
 
-def get_onus_for_deletion(shell, slots_habilitados, pons_por_slot, dias_limite, host, thread_id):
+def get_onus_for_deletion(shell, slots_habilitados, pons_por_slot, host, thread_id):
     """
     Thread-safe version
     """
+    # Um único grupo com a OLT inteira (consome o gerador até o fim: contador, log e agenda)
+    onus_para_deletar = []
+    for onus_para_deletar in candidatas_por_pon(shell, slots_habilitados, pons_por_slot, host, thread_id, por_pon=False):
+        pass
+    return onus_para_deletar
+
+def candidatas_por_pon(shell, slots_habilitados, pons_por_slot, host, thread_id, por_pon=True):
+    """
+    Descoberta das ONUs a deletar. Com por_pon=True gera uma CandidatosONU por PON assim
+    que o last off time das ONUs do PON é verificado (deleção em fluxo); senão gera uma
+    única lista com a OLT inteira. Contador, log e agenda da OLT são atualizados ao fim.
+    Em caso de erro não gera mais nada
+    """
+    fase_atual("descoberta")
     try:
         data_atual = olt_date(shell)
         #write_log(f"[INFO] Thread-{thread_id}: OLT {host} - Data atual: {data_atual}")
@@ -392,43 +480,86 @@ def get_onus_for_deletion(shell, slots_habilitados, pons_por_slot, dias_limite,
         
         if not onus_down:
             write_log(f"[INFO] Nenhuma ONU Offline na OLT {host}.\n")
+            registrar_visita(host, None)
             #print(f"[INFO] Nenhuma ONU Offline na OLT {host}.\n")
-            return []
-        
-    
+            return
         
-        onus_para_deletar = []
         contador_sem_last_off_time= [0]  # Contador local por OLT
+        avaliacoes = []
         
-    
+        # Por PON (slot, pon), na ordem do show authorization
+        grupos = {}
+        for onu in onus_down:
+            grupos.setdefault((onu.slot, onu.pon) if por_pon else None, []).append(onu)
         
-        for onu_info in onus_down:
-            onu_com_tempo = check_onu_offline_time(shell, onu_info, data_atual, thread_id,contador_sem_last_off_time)
+        for onus_grupo in grupos.values():
+            offline = CandidatosONU("fiberhome", host)
             
-            if onu_com_tempo:
-                dias_offline = onu_com_tempo['dias_offline']
-                
-                if dias_offline >= dias_limite:
-                    onus_para_deletar.append(onu_com_tempo)  
-                #write_log(f"[INFO] Thread-{thread_id}: OLT {host} - ONU {onu_com_tempo['slot']}/{onu_com_tempo['pon']}:{onu_com_tempo['onu']} está há {dias_offline} dia(s) offline")
-                print(f"[INFO] Thread-{thread_id}: OLT {host} - ONU {onu_com_tempo['slot']}/{onu_com_tempo['pon']}:{onu_com_tempo['onu']} está há {dias_offline} dia(s) offline (último last_off_time {onu_com_tempo['last_off_time']})\n")
+            # Consulta as ONUs em janelas de comandos enviados de uma vez (pipeline)
+            comandos = [f"show onu_last_on_and_off_time slot {onu.slot} pon {onu.pon} onu {onu.onu}" for onu in onus_grupo]
+            saidas = executar_pipeline(shell, comandos, FIBERHOME_ONU, JANELA_PIPELINE, timeout_por_comando=4, nome="show onu_last_on_and_off_time")
+            
+            for onu_info, result in zip(onus_grupo, saidas):
+                onu_com_tempo = check_onu_offline_time(result, onu_info, data_atual, thread_id,contador_sem_last_off_time)
+            
+                if onu_com_tempo:
+                    # A decisão (limite de dias, exclusões) é da política, sobre o PON/OLT inteiro
+                    offline.anexar(onu_com_tempo)
+                    if onu_com_tempo.ultima_queda is None:
+                        continue
+                    dias_offline = onu_com_tempo.dias_offline
+                    #write_log(f"[INFO] Thread-{thread_id}: OLT {host} - ONU {onu_com_tempo.slot}/{onu_com_tempo.pon}:{onu_com_tempo.onu} está há {dias_offline} dia(s) offline")
+                    print(f"[INFO] Thread-{thread_id}: OLT {host} - ONU {onu_com_tempo.slot}/{onu_com_tempo.pon}:{onu_com_tempo.onu} está há {dias_offline} dia(s) offline (último last_off_time {onu_com_tempo.ultima_queda})\n")
+            
+            avaliacao = avaliar(offline, data_atual, POLITICA)
+            avaliacoes.append(avaliacao)
+            yield avaliacao.candidatas
         
         # Adiciona ao contador global
         adicionar_onus_sem_last_off_time(contador_sem_last_off_time[0])
         
+        contar_avaliacoes(avaliacoes)
+        write_log(f"[INFO] Thread-{thread_id}: {resumo(host, avaliacoes, POLITICA)}")
         write_log(f"[INFO] Thread-{thread_id}: OLT {host} - {contador_sem_last_off_time[0]} ONUs sem Last Off Time (0000-00-00)")
         
-        #print(f"[DEBUG]:\n{onus_para_deletar}.\n")
-        return onus_para_deletar
+        # Descoberta concluída: registra a OLT na agenda
+        registrar_visita(host, proxima_delecao(avaliacoes))
         
     except Exception as e:
-        write_log(f"[ERRO] Thread-{thread_id}: Erro na identificação de ONUs para deleção da OLT {host}: {e}")
+        erro = f"Erro na identificação de ONUs para deleção da OLT {host}: {e}"
+        write_log(f"[ERRO] Thread-{thread_id}: {erro}")
+        registrar_erro(erro)
+
+
+def get_onus_for_deletion_snmp(host, thread_id):
+    """
+    Descoberta via SNMP: mesma lista do get_onus_for_deletion, sem comandos na sessão SSH
+    """
+    fase_atual("descoberta")
+    try:
+        print(f"[INFO] Thread-{thread_id}: Obtendo ONUs offline da OLT {host} via SNMP...\n")
+        avaliacao = coletar_candidatos(host, "fiberhome", POLITICA)
+        
+        # Adiciona ao contador global
+        adicionar_onus_sem_last_off_time(avaliacao.sem_queda)
+        contar_avaliacoes([avaliacao])
+        write_log(f"[INFO] Thread-{thread_id}: {resumo(host, [avaliacao], POLITICA)}")
+        
+        # Descoberta concluída: registra a OLT na agenda
+        registrar_visita(host, avaliacao.proxima_delecao)
+        return avaliacao.candidatas
+    
+    except Exception as e:
+        erro = f"Erro na identificação de ONUs para deleção da OLT {host} via SNMP: {e}"
+        write_log(f"[ERRO] Thread-{thread_id}: {erro}")
+        registrar_erro(erro)
         return []
 
 def save_olt(shell, host, thread_id):
     """
     Thread-safe version
     """
+    fase_atual("save")
     try:
         #write_log(f"[INFO] Thread-{thread_id}: Salvando configuração na OLT {host}...")
         print(f"[INFO] Thread-{thread_id}: Salvando configuração na OLT {host}...\n")
@@ -436,7 +567,7 @@ def save_olt(shell, host, thread_id):
         while shell.recv_ready():
             shell.recv(1024)
             
-        shell.send('save\n')
+        shell.executar('save\n', FIBERHOME_RAIZ)
         
         full_response = ""
         max_wait = 90
@@ -468,9 +599,13 @@ def save_olt(shell, host, thread_id):
                     raise Exception("Timeout com possível erro")
             else:
                 raise Exception("Timeout sem resposta da OLT")
+        registrar_save(True)
                 
     except Exception as e:
-        write_log(f"[ERROR] Thread-{thread_id}: Erro ao salvar configuração na OLT {host}: {e}")
+        registrar_save(False)
+        erro = f"Erro ao salvar configuração na OLT {host}: {e}"
+        write_log(f"[ERROR] Thread-{thread_id}: {erro}")
+        registrar_erro(erro)
 
 def delete_onus_from_whitelist(shell, onus_para_deletar, host, thread_id):
     """
@@ -478,6 +613,7 @@ def delete_onus_from_whitelist(shell, onus_para_deletar, host, thread_id):
     """
     try:
         
+        registrar_candidatos(host, onus_para_deletar)
         total_deletadas = len(onus_para_deletar)
         
         if total_deletadas == 0:
@@ -488,17 +624,48 @@ def delete_onus_from_whitelist(shell, onus_para_deletar, host, thread_id):
         
         
         
-        for onu in onus_para_deletar:
+        fase_atual("deleção")
+        total_deletadas = 0
+        try:
+            enviadas = deletar_onus_whitelist(shell, onus_para_deletar, host, thread_id)
+            total_deletadas = verificar_whitelist(shell, host, thread_id, enviadas)
+        finally:
+            conferir_delecoes(host, len(onus_para_deletar), total_deletadas)
+        
+        #  Adiciona ao contador
+        adicionar_onus_deletadas(total_deletadas)
+        
+        write_log(f"[INFO] Thread-{thread_id}: TOTAL DE {total_deletadas} ONUs DELETADAS NA OLT {host}")
+        write_log(f"[INFO] Thread-{thread_id}: Ritmo da OLT {host}: {shell.ritmo}")
+    
+        
+        with medir_save(host):
+            save_olt(shell, host, thread_id)
+        
+    except Exception as e:
+        erro = f"Erro no processo de deleção da OLT {host}: {e}"
+        write_log(f"[ERRO] Thread-{thread_id}: {erro}")
+        registrar_erro(erro)
+
+def deletar_onus_whitelist(shell, onus_para_deletar, host, thread_id):
+    """
+    Remove as ONUs da whitelist (em lotes, com --prazo). Retorna as ONUs com deleção
+    enviada (as respostas não são lidas; a confirmação é do verificar_whitelist)
+    """
+    # Com --prazo: lotes da mais antiga para a mais nova enquanto couberem na janela
+    enviadas = CandidatosONU("fiberhome", host)
+    for lote in lotes_no_prazo(host, onus_para_deletar):
+        for onu in lote:
             try:
-                slot = onu['slot']
-                pon = onu['pon']
-                onu_id = onu['onu']
-                phy_id = onu['phy_id']
-                dias_offline = onu['dias_offline']
+                slot = onu.slot
+                pon = onu.pon
+                onu_id = onu.onu
+                phy_id = onu.serial
                 
                 command = f'set whitelist phy_addr address {phy_id} password null action delete\n'
-                shell.send(command)
-                time.sleep(1)
+                shell.executar(command, FIBERHOME_ONU)
+                aguardar_comando(shell, command.strip(), "set whitelist phy_addr", INTERVALO_DELECAO)
+                enviadas.anexar(onu)
                 
                 now = datetime.now()
                 log_msg = f"[INFO] Thread-{thread_id}: OLT {host} - SLOT {slot} PON {pon} ONU {onu_id} SERIAL {phy_id} DELETADO EM {now.strftime('%Y/%m/%d %H:%M:%S')}\n"
@@ -508,81 +675,263 @@ def delete_onus_from_whitelist(shell, onus_para_deletar, host, thread_id):
                 
                 
             except Exception as e:
-                write_log(f"[ERRO] Thread-{thread_id}: Erro ao deletar ONU {onu} da OLT {host}: {e}")
+                erro = f"Erro ao deletar ONU {onu} da OLT {host}: {e}"
+                write_log(f"[ERRO] Thread-{thread_id}: {erro}")
+                registrar_erro(erro)
                 continue
-        
-        shell.send('cd ..\n')
-        time.sleep(1)
-        
-        #  Adiciona ao contador
-        adicionar_onus_deletadas(total_deletadas)
-        
-        write_log(f"[INFO] Thread-{thread_id}: TOTAL DE {total_deletadas} ONUs DELETADAS NA OLT {host}")
+    return enviadas
+
+def onus_presentes(saida, chassi, slot, pon):
+    """
+    Ids das ONUs do PON que ainda aparecem no show authorization (qualquer estado). None
+    quando a saída não traz a tabela (cabeçalho Slot/Pon/Onu ou linha do PON) nem a mensagem de PON vazio
+    """
+    presentes = {int(onu) for slot_onu, pon_onu, onu, _, _, _ in registros(saida, COLUNAS_AUTHORIZATION, LAYOUT_AUTHORIZATION)
+                 if slot_onu == str(slot) and pon_onu == str(pon)}
+    tabela, _ = TabelaFixa.detectar(saida)
+    if presentes or (tabela is not None and tabela.nomes[:3] == ["Slot", "Pon", "Onu"]) or PON_VAZIO_FIBERHOME in saida:
+        return presentes
+    return None
+
+def verificar_whitelist(shell, host, thread_id, enviadas):
+    """
+    Relê uma vez cada PON afetado (show authorization) e confere as ONUs enviadas.
+    Retorna quantas foram de fato deletadas; falhas e PONs sem resposta vão para o log
+    """
+    if not enviadas:
+        return 0
+    fase_atual("verificação")
+    deletadas, falhas, nao_verificadas = verificar_delecoes(
+        shell, enviadas, lambda chassi, slot, pon: f"show authorization slot {slot} pon {pon}",
+        onus_presentes, FIBERHOME_ONU, JANELA_PIPELINE, timeout_por_comando=6, nome="show authorization")
     
-        
-        save_olt(shell, host, thread_id)
-        
+    for onu in falhas:
+        erro = f"OLT {host} - SLOT {onu.slot} PON {onu.pon} ONU {onu.onu} SERIAL {onu.serial} continua autorizada após a deleção"
+        write_log(f"[ERRO] Thread-{thread_id}: {erro}")
+        registrar_erro(erro)
+    if nao_verificadas:
+        write_log(f"[WARN] Thread-{thread_id}: OLT {host} - {len(nao_verificadas)} ONUs sem verificação (PON sem resposta), fora do total")
+    write_log(f"[INFO] Thread-{thread_id}: OLT {host} - Verificação: {len(deletadas)} deletadas, {len(falhas)} falhas, {len(nao_verificadas)} não verificadas")
+    return len(deletadas)
+
+def delete_onus_por_pon(shell, slots_habilitados, pons_por_slot, host, thread_id):
+    """
+    Deleção em fluxo (--por-pon): cada PON é deletado assim que o last off time das suas
+    ONUs é verificado, sem esperar a descoberta da OLT inteira. Um único save ao fim
+    """
+    todas = []
+    enviadas = CandidatosONU("fiberhome", host)
+    try:
+        for onus_pon in candidatas_por_pon(shell, slots_habilitados, pons_por_slot, host, thread_id):
+            if not onus_pon:
+                continue
+            todas.extend(onus_pon)
+            fase_atual("deleção")
+            onu = onus_pon[0]
+            write_log(f"[INFO] Thread-{thread_id}: OLT {host} - Deletando {len(onus_pon)} ONUs do SLOT {onu.slot} PON {onu.pon}")
+            for onu in deletar_onus_whitelist(shell, onus_pon, host, thread_id):
+                enviadas.anexar(onu)
+            if prazo_esgotado(host):
+                break
+            fase_atual("descoberta")
     except Exception as e:
-        write_log(f"[ERRO] Thread-{thread_id}: Erro no processo de deleção da OLT {host}: {e}")
+        erro = f"Erro no processo de deleção da OLT {host}: {e}"
+        write_log(f"[ERRO] Thread-{thread_id}: {erro}")
+        registrar_erro(erro)
+    finally:
+        registrar_candidatos(host, todas)
+        if todas:
+            total_deletadas = verificar_whitelist(shell, host, thread_id, enviadas)
+            conferir_delecoes(host, len(todas), total_deletadas)
+            adicionar_onus_deletadas(total_deletadas)
+            write_log(f"[INFO] Thread-{thread_id}: TOTAL DE {total_deletadas} ONUs DELETADAS NA OLT {host}")
+            write_log(f"[INFO] Thread-{thread_id}: Ritmo da OLT {host}: {shell.ritmo}")
+            with medir_save(host):
+                save_olt(shell, host, thread_id)
+
+    if not todas:
+        write_log(f"[INFO] Thread-{thread_id}: Nenhuma ONU a ser deletada na OLT {host}.")
+
+# Ritmo de uma sessão nova, nos limites do fabricante
+def ritmo_da_olt():
+    return Ritmo(INTERVALO_MINIMO, INTERVALO_MAXIMO, JANELA_MINIMA, JANELA_MAXIMA)
+
+# Prepara uma sessão nova (modo daemon): desativa a paginação uma única vez
+def preparar_sessao(shell):
+    shell = SessaoCLI(shell, FIBERHOME, ritmo_da_olt())
+    shell.configurar_uma_vez("terminal length 0", FIBERHOME_SERVICE)
+    shell.garantir_contexto(FIBERHOME_RAIZ)
+    read_output(shell)
+    return shell
+
+# Executa o modo escolhido numa sessão já aberta com a OLT
+def processar_sessao(shell, host, thread_id, modo="delete", manter_sessao=False, candidatos=None):
+    # A Fiberhome não faz logout no save_olt, então manter_sessao não altera o fluxo
+    # Até ler a versão (get_version_olt) o histórico de tempos é por OLT
+    shell.equipamento = shell.equipamento or host
+    if modo == "census":
+        escrever_census(path_census, census_olt(shell, host, thread_id))
+        return
+    
+    if candidatos is None and BACKEND_DESCOBERTA == "snmp":
+        candidatos = get_onus_for_deletion_snmp(host, thread_id)
+    
+    if candidatos is not None:
+        # Descoberta já feita via SNMP: a sessão só executa as deleções e o save
+        delete_onus_from_whitelist(shell, candidatos, host, thread_id)
+        return
+    
+    # Obtém versão
+    version = get_version_olt(shell)
+    #write_log(f"[INFO] Thread-{thread_id}: OLT {host} - Versão: {version}")
+    print(f"[INFO] Thread-{thread_id}: OLT {host} - Versão: {version}\n")
+    
+    # Processa slots
+    slots_habilitados, pons_por_slot = processar_slots_olt(shell, host, thread_id)
+    
+    if slots_habilitados:
+        if DELECAO_POR_PON:
+            delete_onus_por_pon(shell, slots_habilitados, pons_por_slot, host, thread_id)
+            return
+
+        # Identifica ONUs para deleção
+        onus_para_deletar = get_onus_for_deletion(shell, slots_habilitados, pons_por_slot, host, thread_id)
+
+        # Executa deleções
+        delete_onus_from_whitelist(shell, onus_para_deletar, host, thread_id)
+        
+    else:
+        write_log(f"[WARN] Thread-{thread_id}: Nenhum slot ativo encontrado na OLT {host}")
 
 # Função principal para processar uma OLT (executada em thread)
-def processar_olt(host, thread_id):
+def processar_olt(host, thread_id, modo="delete"):
     """
     Função principal que processa uma OLT específica
-    Executada em thread separada
+    Executada em thread separada. Retorna o ResultadoOLT (falhas registradas com registrar_erro marcam a OLT com erro)
     """
-    try:
-        #write_log(f"[INFO] Thread-{thread_id}: Iniciando processamento da OLT {host}")
-        print(f"[INFO] Thread-{thread_id}: Iniciando processamento da OLT {host}\n")
-        
-        # Estabelece conexão
-        conn, shell = ssh(host)
-        
+    resultado = ResultadoOLT(host, thread_id, modo)
+    with resultado.executando():
         try:
-            # Obtém versão
-            version = get_version_olt(shell)
-            #write_log(f"[INFO] Thread-{thread_id}: OLT {host} - Versão: {version}")
-            print(f"[INFO] Thread-{thread_id}: OLT {host} - Versão: {version}\n")
+            #write_log(f"[INFO] Thread-{thread_id}: Iniciando processamento da OLT {host}")
+            print(f"[INFO] Thread-{thread_id}: Iniciando processamento da OLT {host}\n")
             
-            # Processa slots
-            slots_habilitados, pons_por_slot = processar_slots_olt(shell, host, thread_id)
+            candidatos = None
+            if modo == "delete" and BACKEND_DESCOBERTA == "snmp":
+                # Descoberta via SNMP: a sessão SSH só é aberta se houver ONUs para deletar
+                candidatos = get_onus_for_deletion_snmp(host, thread_id)
+                registrar_candidatos(host, candidatos)
+                if not candidatos:
+                    write_log(f"[INFO] Thread-{thread_id}: Nenhuma ONU a ser deletada na OLT {host}.")
+                    return resultado
             
-            if slots_habilitados:
-                # Identifica ONUs para deleção
-                onus_para_deletar = get_onus_for_deletion(shell, slots_habilitados, pons_por_slot,qtd_dias, host, thread_id)
-        
-                # Executa deleções
-                delete_onus_from_whitelist(shell, onus_para_deletar, host, thread_id)
-                
-            else:
-                write_log(f"[WARN] Thread-{thread_id}: Nenhum slot ativo encontrado na OLT {host}")
-        
-        finally:
-            conn.close()
-            #write_log(f"[INFO] Thread-{thread_id}: Conexão fechada com {host}")
-            print(f"[INFO] Thread-{thread_id}: Conexão fechada com {host}\n")
+            # Estabelece conexão
+            conn, shell = ssh(host)
+            shell = SessaoCLI(shell, FIBERHOME, ritmo_da_olt())
             
-        return f"Thread-{thread_id}: OLT {host} processada com sucesso"
-        
-    except Exception as e:
-        write_log(f"[ERRO] Thread-{thread_id}: Falha ao processar OLT {host}: {e}")
-        return f"Thread-{thread_id}: Erro ao processar OLT {host}: {e}"
+            try:
+                processar_sessao(shell, host, thread_id, modo, candidatos=candidatos)
+            
+            finally:
+                conn.close()
+                #write_log(f"[INFO] Thread-{thread_id}: Conexão fechada com {host}")
+                print(f"[INFO] Thread-{thread_id}: Conexão fechada com {host}\n")
+            
+        except Exception as e:
+            erro = f"Falha ao processar OLT {host}: {e}"
+            write_log(f"[ERRO] Thread-{thread_id}: {erro}")
+            registrar_erro(erro)
+    return resultado
+
+# Lê a lista de OLTs do CSV
+def carregar_equipamentos():
+    hosts, descartados = carregar_hosts("olts_fiberhome.csv")
+    for linha, valor, motivo in descartados:
+        write_log(f"[WARN] olts_fiberhome.csv linha {linha}: host {valor!r} ignorado ({motivo})")
+    return hosts
 
 # -------------------------
 # Script principal com multithreading
 # -------------------------
 if __name__ == "__main__":
+    args = criar_parser("fiberhome").parse_args()
+    if args.modo == "merge":
+        # Soma os resultados das partições (--shard) nos totais de uma execução única
+        arquivos = args.resultados or arquivos_resultados(path_resultados)
+        olts_mescladas, totais, avisos = mesclar_resultados(arquivos, "fiberhome")
+        for aviso in avisos:
+            write_log(f"[WARN] {aviso}")
+        write_log(f"[INFO] Merge de {len(arquivos)} arquivo(s): {len(olts_mescladas)} OLTs, {totais[ERRO]} com erro, {totais[ADIADA]} adiada(s)")
+        resultados = [ResultadoOLT.de_dict(registro) for registro in olts_mescladas.values()]
+        for resultado in resultados:
+            somar_resultado(resultado)
+        salvar_total_no_log()
+        inicio_merge = min((resultado.inicio for resultado in resultados if resultado.inicio), default=datetime.now())
+        escrever_relatorio(path_relatorio, "fiberhome", "merge", resultados, inicio_merge)
+        write_log(f"[INFO] Relatório das partições gravado em {path_relatorio}")
+        sys.exit(0)
+    
+    BACKEND_DESCOBERTA = args.backend
+    DELECAO_POR_PON = args.por_pon
+    if args.intervalo_minimo is not None:
+        INTERVALO_MINIMO = args.intervalo_minimo
+    if args.janela_maxima is not None:
+        JANELA_MAXIMA = args.janela_maxima
+    POLITICA = carregar_politica(path_politica, qtd_dias)
+    if os.path.exists(path_politica):
+        write_log(f"[INFO] Política de retenção ({path_politica}): {POLITICA}")
+    ativar_gravacao(args.gravar)
+    if args.metricas:
+        iniciar_servidor(args.metricas, "fiberhome")
+        registrar_contador("delete_onu_onus_deletadas_total", "ONUs deletadas na execução (inclui as OLTs em andamento)", DELETADAS)
+        registrar_contador("delete_onu_onus_consultadas_total", "ONUs offline consultadas na execução (inclui as OLTs em andamento)", CONSULTADAS)
+        registrar_contador("delete_onu_onus_sem_last_off_time_encontradas_total", "ONUs sem last off time encontradas na execução (deletadas ou mantidas pela política)", SEM_QUEDA)
+    
+    if args.modo == "daemon":
+        executar_daemon(sys.modules[__name__], args)
+        sys.exit(0)
+    
+    if args.modo == "queue":
+        executar_coordenador(sys.modules[__name__], args)
+        sys.exit(0)
+    
+    if args.modo == "worker":
+        executar_worker(sys.modules[__name__], args)
+        sys.exit(0)
+    
     inicio_global = registrar_inicio_rotina()
+    carregar_tempos(path_tempos)
+    if args.profile:
+        write_log(f"[INFO] Perfil de execução em {ativar_perfil(path_02)}")
+    if args.ociosidade:
+        ativar_ociosidade()
     
-    # Lê lista de equipamentos do CSV se necessário
+    # Lê lista de equipamentos do CSV
     try:
-        df_hosts = pd.read_csv("olts_fiberhome.csv")
-        # Descomente a linha abaixo se quiser usar o CSV
-        equipamentos = df_hosts["host"].tolist()
-    except:
-        write_log("[WARN] Não foi possível carregar CSV, usando lista hardcoded")
+        equipamentos = carregar_equipamentos()
+    except (OSError, ValueError) as e:
+        # Sem inventário não há lista de OLTs para processar
+        write_log(f"[ERRO] Não foi possível carregar olts_fiberhome.csv: {e}")
+        sys.exit(1)
     
     #write_log(f"[INFO] Processando {len(equipamentos)} OLTs com máximo de {MAX_THREADS} threads")
+    if args.agendado:
+        devidos = hosts_devidos(carregar_agenda(path_agenda), equipamentos, dias_varredura=args.varredura_completa)
+        write_log(f"[INFO] Modo agendado: {len(devidos)} de {len(equipamentos)} OLTs devidas")
+        equipamentos = devidos
+    
+    if args.shard:
+        indice_particao, total_particoes = args.shard
+        particao = hosts_da_particao(equipamentos, indice_particao, total_particoes)
+        write_log(f"[INFO] Partição {indice_particao}/{total_particoes}: {len(particao)} de {len(equipamentos)} OLTs")
+        equipamentos = particao
+    
+    if args.prazo and args.modo == "delete":
+        # Janela de manutenção: OLTs com as ONUs offline há mais tempo começam primeiro
+        write_log(f"[INFO] Prazo da janela: {definir_prazo(args.prazo).strftime('%Y/%m/%d %H:%M')}")
+        carregar_custos(path_custos)
+        equipamentos = ordenar_por_atraso(equipamentos)
+    
+    registrar_olts(equipamentos)
     print(f"[INFO] Processando {len(equipamentos)} OLTs com máximo de {MAX_THREADS} threads\n")
     
     # Executa processamento multithread
@@ -594,21 +943,24 @@ if __name__ == "__main__":
         
         for i, host in enumerate(equipamentos):
             # Adiciona delay entre submissions para evitar sobrecarga
-            if i > 0:
+            if i > 0 and segundos_restantes() > 0:
                 time.sleep(THREAD_DELAY)
             
-            future = executor.submit(processar_olt, host, i+1)
+            future = executor.submit(perfilar_olt, acompanhar_olt(contabilizar_olt(no_prazo(processar_olt))), host, i+1, args.modo)
             future_to_host[future] = host
         
-        # Coleta resultados conforme completam
+        # Coleta resultados conforme completam (só esta thread soma os contadores)
         for future in as_completed(future_to_host):
             host = future_to_host[future]
             try:
                 resultado = future.result()
-                resultados.append(resultado)
-                write_log(f"[SUCCESS] {resultado}")
+                write_log(resultado.linha_log())
             except Exception as e:
                 write_log(f"[ERRO] Falha na thread para OLT {host}: {e}")
+                resultado = ResultadoOLT(host, modo=args.modo)
+                resultado.falhar(f"Falha na thread: {e}")
+            resultados.append(resultado)
+            somar_resultado(resultado)
     
     # Limpa arquivos temporários
     try:
@@ -624,7 +976,38 @@ if __name__ == "__main__":
         write_log(f"[INFO] {resultado}")
         
     # Salva totais finais
-    salvar_total_no_log()
+    if args.modo == "census":
+        write_log(f"[INFO] Censo salvo em {path_census}")
+    else:
+        salvar_total_no_log()
+        
+        # Atualiza a agenda com a próxima data de deleção de cada OLT visitada
+        total_agendadas = atualizar_agenda(path_agenda)
+        write_log(f"[INFO] Agenda atualizada para {total_agendadas} OLT(s) em {path_agenda}")
+    
+    totais_execucao = escrever_relatorio(path_relatorio, "fiberhome", args.modo, resultados, inicio_global)
+    write_log(f"[INFO] Relatório gravado em {path_relatorio}: {totais_execucao[SUCESSO]} OLT(s) com sucesso, "
+              f"{totais_execucao[ERRO]} com erro, {totais_execucao[ADIADA]} adiada(s)")
+    
+    if args.shard:
+        path_particao = caminho_resultados(path_resultados, *args.shard)
+        total_resultados = escrever_resultados(path_particao, "fiberhome", *args.shard, resultados)
+        write_log(f"[INFO] Resultado de {total_resultados} OLT(s) da partição gravado em {path_particao}")
+    
+    # Guarda os tempos de resposta observados para as próximas execuções
+    salvar_tempos(path_tempos)
+    
+    if args.prazo and args.modo == "delete":
+        salvar_custos(path_custos)
+        for linha in resumo_prazo():
+            write_log(linha)
+    
+    if args.profile:
+        write_log(f"[INFO] Perfil da execução gravado em {escrever_perfil_agregado()}")
+    
+    if args.ociosidade:
+        for linha in escrever_ociosidade(path_ociosidade, "fiberhome"):
+            write_log(linha)
     
     # Final global
     rotina_finalizada(inicio_global, len(equipamentos))
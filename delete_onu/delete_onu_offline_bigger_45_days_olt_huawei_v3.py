@@ -1,19 +1,47 @@
 import os
+import sys
 import time
 import re
 from datetime import datetime, date
-import pandas as pd
-from dotenv import load_dotenv
 from connection_ssh import ssh
-import threading
+from gravador import ativar_gravacao
+from perfilador import ativar_perfil, perfilar_olt, escrever_perfil_agregado
+from ociosidade import ativar_ociosidade, contabilizar_olt, escrever_ociosidade, medir, LockMedido, LOG
+from janela import definir_prazo, carregar_custos, salvar_custos, ordenar_por_atraso, no_prazo, lotes_no_prazo, prazo_esgotado, medir_save, registrar_candidatos, segundos_restantes, resumo_prazo
+from metricas import iniciar_servidor, registrar_contador, registrar_olts, acompanhar_olt, fase_atual, somar_olt
+from argumentos import criar_parser
+from particao import hosts_da_particao, caminho_resultados, escrever_resultados, arquivos_resultados, mesclar_resultados
+from resultado_olt import ResultadoOLT, contar, contar_avaliacoes, registrar_erro, registrar_save, escrever_relatorio, CONSULTADAS, DELETADAS, SEM_QUEDA, SUCESSO, ERRO, ADIADA
+from daemon import executar_daemon
+from fila import executar_coordenador, executar_worker
+from pipeline import executar_pipeline
+from tempos_resposta import ler_ate_prompt, aguardar_comando, carregar_tempos, salvar_tempos
+from snmp_backend import coletar_candidatos
+from tl1_huawei import ClienteTL1, listar_onts, onts_offline, listar_service_ports, remover_onts, salvar
+from ritmo import Ritmo
+from sessao_cli import SessaoCLI, HUAWEI, HUAWEI_PRIVILEGIADO, HUAWEI_CONFIG, huawei_interface
+from census import linha_census, escrever_census
+from registro_onu import CandidatosONU
+from inventario import carregar_hosts
+from politica import Politica, carregar_politica, avaliar, resumo, proxima_delecao
+from verificacao import verificar_delecoes
+from tabela import TabelaRegex
+from agendador import registrar_visita, conferir_delecoes, carregar_agenda, hosts_devidos, atualizar_agenda
 from concurrent.futures import ThreadPoolExecutor, as_completed
-import queue
-from threading import Lock
 
 # Paths de arquivos
 path_01_base = "service_port_all"  # Será usado como prefixo para cada thread
 path_02 = "log_hw.txt"
 path_03 = "onus_offline.txt"
+path_census = "census_hw.csv"
+path_agenda = "agenda_hw.json"
+path_tempos = "tempos_hw.json"
+path_ociosidade = "ociosidade_hw.csv"
+path_custos = "custos_hw.json"
+path_politica = "politica_hw.json"
+path_resultados = "resultado_hw"  # resultado por OLT de cada partição (--shard)
+path_fila = "fila_hw.db"  # fila de OLTs dos modos queue/worker
+path_relatorio = "relatorio_hw.json"  # status, tempos e contadores de cada OLT da execução
 qtd_dias = 45
 
 # Variavel que controla o total de onus deletadas
@@ -24,10 +52,29 @@ total_onus_sem_last_down = 0
 # Configurações de threading
 MAX_THREADS = 50  # Número máximo de threads simultâneas
 THREAD_DELAY = 10  # Delay entre inicialização de threads (segundos)
+JANELA_PIPELINE = 8  # Comandos display ont info enviados de uma vez por sessão (inicial; ajustado pelo ritmo da OLT)
+INTERVALO_DELECAO = 0.5  # Segundos entre comandos de deleção (inicial; ajustado pelo ritmo da OLT)
+# Limites do ritmo da OLT (ritmo.py): por padrão o intervalo não desce abaixo do INTERVALO_DELECAO
+INTERVALO_MINIMO = INTERVALO_DELECAO  # Segundos (definido por --intervalo-minimo)
+INTERVALO_MAXIMO = 5.0  # Segundos
+JANELA_MINIMA = 1  # Comandos por janela do pipeline
+JANELA_MAXIMA = 32  # Comandos por janela do pipeline (definido por --janela-maxima)
+# Linha do display service-port (formatos 0/15/6 e 0/1 /4, chassi/slot separado do pon):
+# service-port, chassi, slot, pon, onu e estado
+LAYOUT_SERVICE_PORT = TabelaRegex(r'^\s*(\d+)\s+\d+\s+\S+\s+gpon\s+(\d+)/ ?(\d+) ?/(\d+)\s+(\d+)\s.*\s(up|down)\s*$')
+# Linha do display ont info F S P all (formato 0/ 1/4): chassi, slot, pon e ONT ID
+LAYOUT_ONT_PON = TabelaRegex(r'^\s*(\d+)/\s*(\d+)\s*/\s*(\d+)\s+(\d+)\s+\S')
+# Cabeçalho da tabela do display ont info F S P all e resposta para um PON sem ONTs
+CABECALHO_ONT_PON = re.compile(r'^\s*F/S/P\s+ONT\b', re.MULTILINE)
+PON_VAZIO_HUAWEI = "There is not any ONT"
+
+BACKEND_DESCOBERTA = "cli"  # "cli", "snmp" ou "tl1" (definido por --backend)
+DELECAO_POR_PON = False  # deleção em fluxo, PON a PON (definido por --por-pon)
+POLITICA = Politica(qtd_dias)  # limites e exclusões (politica_hw.json, lida no início da rotina)
 
 
 # Lock para escrita no arquivo de log (thread-safe)
-log_lock = Lock()
+log_lock = LockMedido()
 
 # -------------------------
 # Funções para controlar contador global
@@ -35,33 +82,37 @@ log_lock = Lock()
 
 def adicionar_onus_deletadas(quantidade):
     """
-    Adiciona ONUs ao contador global usando o log_lock existente
+    Adiciona ONUs deletadas ao resultado da OLT da thread atual
     """
-    global total_onus_deletadas
-    with log_lock:
-        total_onus_deletadas += quantidade
+    contar(DELETADAS, quantidade)
         
 def adicionar_onus_sem_last_down(quantidade):
     """
-    Adiciona ONUs sem last down time ao contador global
+    Adiciona ONUs sem last down time ao resultado da OLT da thread atual
     """
-    global total_onus_sem_last_down
-    with log_lock:
-        total_onus_sem_last_down += quantidade
+    contar(SEM_QUEDA, quantidade)
+
+def somar_resultado(resultado):
+    """
+    Soma o ResultadoOLT aos contadores globais. Chamada só pela thread principal
+    (ao receber cada OLT), por isso sem lock
+    """
+    global total_onus_deletadas, total_onus_sem_last_down
+    total_onus_deletadas += resultado.deletadas
+    total_onus_sem_last_down += resultado.sem_queda
+    somar_olt(resultado)
 
 def obter_total_onus_deletadas():
     """
     Retorna o total geral de ONUs deletadas
     """
-    with log_lock:
-        return total_onus_deletadas
+    return total_onus_deletadas
 
 def obter_total_onus_sem_last_down():
     """
     Retorna o total geral de ONUs sem last down time
     """
-    with log_lock:
-        return total_onus_sem_last_down
+    return total_onus_sem_last_down
 
 def salvar_total_no_log():
     """
@@ -72,7 +123,7 @@ def salvar_total_no_log():
     
     write_log("\n" + "="*50)
     write_log(f"TOTAL GERAL DE ONUs DELETADAS: {total_deletadas}")
-    write_log(f"TOTAL GERAL DE ONUs SEM LAST DOWN TIME (-): {total_sem_last_down}")
+    write_log(f"TOTAL GERAL DE ONUs SEM LAST DOWN TIME (-) ENCONTRADAS: {total_sem_last_down}")
     write_log("="*50)
 
 # -------------------------
@@ -83,21 +134,18 @@ def write_log(message, include_print=True):
     """
     Escreve log de forma thread-safe
     """
-    if include_print:
-        print(message)
-    
-    with log_lock:
-        with open(path_02, "a", encoding="utf-8") as log_file:
-            log_file.write(f"{message}\n")
+    with medir(LOG):
+        if include_print:
+            print(message)
+        
+        with log_lock:
+            with open(path_02, "a", encoding="utf-8") as log_file:
+                log_file.write(f"{message}\n")
 
 def olt_date(shell):
-    shell.send('enable\n')
-    shell.send('config\n')
-    shell.send('mmi-mode original-output\n')
-    time.sleep(1)
-    shell.send('display time\n\n')
-    time.sleep(5)
-    output = read_output(shell).splitlines()
+    shell.configurar_uma_vez('mmi-mode original-output', HUAWEI_CONFIG)
+    shell.executar('display time\n\n', HUAWEI_CONFIG)
+    output = ler_ate_prompt(shell, 'display time', 6).splitlines()
     
     # procura a linha que comece com YYYY-MM-DD
     date_line = next((l.strip() for l in output if re.match(r"^\d{4}-\d{2}-\d{2}", l.strip())), None)
@@ -126,16 +174,9 @@ def get_service_port(shell, thread_id):
     """
     path_01 = f"{path_01_base}_{thread_id}.txt"
     
-    time.sleep(3)
-    shell.send('enable\n')
-    time.sleep(0.5)
-    shell.send('config\n')
-    time.sleep(0.5)
-    shell.send('mmi-mode original-output\n')
-    time.sleep(0.5)
-    shell.send('display service-port all | include down\n\n')
-    time.sleep(15)
-    result = read_output(shell).splitlines()
+    shell.configurar_uma_vez('mmi-mode original-output', HUAWEI_CONFIG)
+    shell.executar('display service-port all | include down\n\n', HUAWEI_CONFIG)
+    result = ler_ate_prompt(shell, 'display service-port all', 16).splitlines()
     
     with open(path_01, 'w') as data:
         data.write("\n".join(result))
@@ -147,17 +188,24 @@ def contar_onus_down(path_01):
     """
     Thread-safe version
     """
-    count_down = 0
-    
     try:
         with open(path_01, 'r') as file:
-            for line in file:
-                if '    down' in line:
-                    count_down += 1
-        return count_down
+            return len(service_ports_por_ont(file.read()))
     except FileNotFoundError:
         return 0
 
+def parse_statistics(content):
+    """
+    Extrai (total, up, down) da linha 'Total : N (Up/Down : x/y)' do display service-port
+    Retorna None se a linha não existir
+    """
+    match = re.search(r'Total\s*:\s*(\d+)\s*\(Up/Down\s*:\s*(\d+)/(\d+)\)', content)
+    
+    if not match:
+        return None
+    
+    return int(match.group(1)), int(match.group(2)), int(match.group(3))
+
 def get_statistics_from_service_port(path_01, thread_id):
     """
     Thread-safe version
@@ -167,12 +215,10 @@ def get_statistics_from_service_port(path_01, thread_id):
             content = file.read()
             
         # Procura pela linha de estatísticas
-        match = re.search(r'Total\s*:\s*(\d+)\s*\(Up/Down\s*:\s*(\d+)/(\d+)\)', content)
+        estatisticas = parse_statistics(content)
         
-        if match:
-            total = int(match.group(1))
-            up = int(match.group(2))  
-            down = int(match.group(3))
+        if estatisticas:
+            total, up, down = estatisticas
             
             print(f"[INFO] Thread-{thread_id}: Estatísticas da OLT:")
             print(f"  Total de Service-Ports: {total}")
@@ -189,10 +235,40 @@ def get_statistics_from_service_port(path_01, thread_id):
         print(f"[WARN] Thread-{thread_id}: Erro ao extrair estatísticas: {e}")
         return contar_onus_down(path_01)
 
-def get_onus_offlines(shell, host, thread_id):
+def service_ports_down(content):
+    """
+    Service-ports down do display service-port: [(service_port_id, chassi, slot, pon, onu)]
+    """
+    return [registro[:5] for registro in LAYOUT_SERVICE_PORT.registros(content, contem=' down') if registro[5] == 'down']
+
+def service_ports_por_ont(content):
+    """
+    Índice dos service-ports down por ONT: {(chassi, slot, pon, onu): [service_port_id, ...]},
+    na ordem em que as ONTs aparecem no display service-port (ONT com internet, VoIP, IPTV
+    e gerência aparece uma vez, com os quatro service-ports)
+    """
+    indice = {}
+    for service_port_id, chassi_id, slot_id, pon_id, onu_id in service_ports_down(content):
+        indice.setdefault((int(chassi_id), int(slot_id), int(pon_id), int(onu_id)), []).append(service_port_id)
+    return indice
+
+def get_onus_offlines(shell, host, thread_id, service_ports=None):
     """
     Thread-safe version
     """
+    # Um único grupo com a OLT inteira (consome o gerador até o fim: contador, log e agenda)
+    [list_onus_deletadas] = candidatas_por_pon(shell, host, thread_id, por_pon=False, service_ports=service_ports)
+    return list_onus_deletadas
+
+def candidatas_por_pon(shell, host, thread_id, por_pon=True, service_ports=None):
+    """
+    Descoberta das ONUs a deletar. Com por_pon=True gera uma CandidatosONU por PON assim
+    que o histórico das ONTs do PON é verificado (deleção em fluxo); senão gera uma única
+    lista com a OLT inteira. Contador, log e agenda da OLT são atualizados ao fim.
+    Cada ONT é consultada uma vez; o dict service_ports, se informado, recebe o índice
+    ONT -> service-ports usado pelo deletar_onts
+    """
+    fase_atual("descoberta")
     print(f"[INFO] Thread-{thread_id}: Obtendo ONUs offline da OLT {host}...")
     path_01 = get_service_port(shell, thread_id)
     date_olt_now = olt_date(shell)
@@ -201,47 +277,37 @@ def get_onus_offlines(shell, host, thread_id):
     # Usa a função que extrai das estatísticas 
     get_statistics_from_service_port(path_01, thread_id)
     
-    list_onus_deletadas = []
-    contador_sem_last_down = 0  # Contador local por OLT
+    avaliacoes = []
 
     with open(path_01, 'r') as file:
-        data = file.readlines()
-
-    for line in data:
-        if '    down' in line:
-            
-            result = line.split()
-            
-            #print(f"[DEBUG] Thread-{thread_id}: Linha service-port down encontrada: {result}")
-            
-            service_port_id = result[0]
-            
-             # Verifica se o próximo campo após 'gpon' contém '/' (formato completo)
-            gpon_index = result.index('gpon')
-            gpon_interface = result[gpon_index + 1]
-            
-            if gpon_interface.count('/') == 2:  # Formato: 0/15/6
-                # Interface completa em um campo
-                chassi_slot_pon = gpon_interface.split('/')
-                chassi_id = chassi_slot_pon[0]
-                slot_id = chassi_slot_pon[1] 
-                pon_id = chassi_slot_pon[2]
-                onu_id = result[gpon_index + 2]
-                
-            else:  # Formato: 0/1 /4 (chassi/slot separado do pon)
-                # Interface dividida em dois campos
-                chassi_slot = gpon_interface.split('/')
-                chassi_id = chassi_slot[0]
-                slot_id = chassi_slot[1]
-                pon_id = result[gpon_index + 2].replace('/', '')  # Remove a '/' do pon
-                onu_id = result[gpon_index + 3]
-            
+        indice = service_ports_por_ont(file.read())
+    if service_ports is not None:
+        service_ports.update(indice)
+    
+    # Remove arquivo temporário
+    try:
+        os.remove(path_01)
+    except:
+        pass
+    
+    # Por PON (chassi, slot, pon), na ordem em que aparecem no display service-port
+    grupos = {}
+    for ont in indice:
+        grupos.setdefault(ont[:3] if por_pon else None, []).append(ont)
+    
+    for onts_grupo in grupos.values() or [[]]:
+        offline = CandidatosONU("huawei", host)
+        
+        # Consulta as ONTs em janelas de comandos enviados de uma vez (pipeline)
+        comandos = [f"display ont info {chassi_id} {slot_id} {pon_id} {onu_id}" for chassi_id, slot_id, pon_id, onu_id in onts_grupo]
+        saidas = executar_pipeline(shell, comandos, HUAWEI_CONFIG, JANELA_PIPELINE, timeout_por_comando=6, terminador="\n\n", nome="display ont info")
+        
+        for (chassi_id, slot_id, pon_id, onu_id), saida in zip(onts_grupo, saidas):
+            portas = indice[(chassi_id, slot_id, pon_id, onu_id)]
+            service_port_id = ",".join(portas)
             print(f"[INFO] Thread-{thread_id}: Verificando SERVICE-PORT:{service_port_id} ONU {chassi_id}/{slot_id}/{pon_id}:{onu_id}...")
-
-            shell.send(f"display ont info {chassi_id} {slot_id} {pon_id} {onu_id}\n\n")
-            time.sleep(5)
-            output = read_output(shell).splitlines()
-            
+            output = saida.splitlines()
+        
             #print(f"[DEBUG] Thread-{thread_id}: Saída do comando display ont info:\n" + "\n".join(output))
 
             result_sn = None
@@ -251,33 +317,112 @@ def get_onus_offlines(shell, host, thread_id):
                     result_sn = l.split()[2]
                 elif 'Last down time' in l:
                     #print(f"[DEBUG] Thread-{thread_id}: Last down time linha: {l.strip()}")
-                    if l.split()[4] == '-':
-                        break # comente caso queira deletar as sem last down time
-                        contador_sem_last_down += 1
-                        list_onus_deletadas.append((result_sn, service_port_id, chassi_id, slot_id, pon_id, onu_id))
-                        print(f"[INFO] Thread-{thread_id}: SERVICE-PORT:{service_port_id} ONU {chassi_id}/{slot_id}/{pon_id}:{onu_id} SEM LAST DOWN TIME (-)")
-                        continue
-                    else:
-                        last_down_time = datetime.strptime(l.split()[4], '%Y-%m-%d').date()
-                        
-                        diff = (date_olt_now - last_down_time).days
-                        if diff >= qtd_dias:
-                            list_onus_deletadas.append((result_sn, service_port_id, chassi_id, slot_id, pon_id, onu_id))
-                        print(f"[INFO] Thread-{thread_id}: SERVICE-PORT:{service_port_id} ONU {chassi_id}/{slot_id}/{pon_id}:{onu_id} ESTA A {diff} DIA(S) OFFLINE (último last_down_time {last_down_time})\n")
+                    # A decisão (limite de dias, exclusões, sem last down time) é da política
+                    last_down_time = None if l.split()[4] == '-' else date.fromisoformat(l.split()[4])
+                    offline.adicionar(chassi_id, slot_id, pon_id, onu_id, serial=result_sn,
+                                      service_port=portas[0], ultima_queda=last_down_time)
+                    print(f"[INFO] Thread-{thread_id}: SERVICE-PORT:{service_port_id} ONU {chassi_id}/{slot_id}/{pon_id}:{onu_id} OFFLINE (último last_down_time {last_down_time or '-'})\n")
                     break
-     # Adiciona ao contador global
+        
+        avaliacao = avaliar(offline, date_olt_now, POLITICA)
+        avaliacoes.append(avaliacao)
+        yield avaliacao.candidatas
+    
+    # Adiciona ao contador global
+    contador_sem_last_down = sum(avaliacao.sem_queda for avaliacao in avaliacoes)
     adicionar_onus_sem_last_down(contador_sem_last_down)
     
     # Log do total por OLT
+    contar_avaliacoes(avaliacoes)
+    write_log(f"[INFO] Thread-{thread_id}: {resumo(host, avaliacoes, POLITICA)}")
     write_log(f"[INFO] Thread-{thread_id}: OLT {host} - {contador_sem_last_down} ONUs sem Last Down Time (-)")
     
+    # Descoberta concluída: registra a OLT na agenda
+    registrar_visita(host, proxima_delecao(avaliacoes))
+
+def get_onus_offlines_snmp(host, thread_id):
+    """
+    Descoberta via SNMP: mesma lista do get_onus_offlines, sem comandos na sessão SSH
+    As ONTs vêm sem service-port (removidos por ONT na deleção)
+    """
+    fase_atual("descoberta")
+    print(f"[INFO] Thread-{thread_id}: Obtendo ONUs offline da OLT {host} via SNMP...")
+    avaliacao = coletar_candidatos(host, "huawei", POLITICA)
+    
+    # Adiciona ao contador global
+    adicionar_onus_sem_last_down(avaliacao.sem_queda)
+    contar_avaliacoes([avaliacao])
+    write_log(f"[INFO] Thread-{thread_id}: {resumo(host, [avaliacao], POLITICA)}")
+    
+    # Descoberta concluída: registra a OLT na agenda
+    registrar_visita(host, avaliacao.proxima_delecao)
+    return avaliacao.candidatas
+
+def get_onus_offlines_tl1(cliente, host, thread_id):
+    """
+    Descoberta via TL1: uma única listagem LST-ONT da OLT, já com estado e last down time
+    """
+    fase_atual("descoberta")
+    print(f"[INFO] Thread-{thread_id}: Obtendo ONUs offline da OLT {host} via TL1...")
+    tabela, date_olt_now = listar_onts(cliente, host)
+    date_olt_now = date_olt_now or date.today()
+    print(f"[INFO] Thread-{thread_id}: Data atual da OLT: {date_olt_now}\n")
+    
+    offline = CandidatosONU("huawei", host)
+    for chassi_id, slot_id, pon_id, onu_id, result_sn, last_down_time in onts_offline(tabela):
+        offline.adicionar(chassi_id, slot_id, pon_id, onu_id, serial=result_sn, ultima_queda=last_down_time)
+    avaliacao = avaliar(offline, date_olt_now, POLITICA)
+    
+    adicionar_onus_sem_last_down(avaliacao.sem_queda)
+    contar_avaliacoes([avaliacao])
+    write_log(f"[INFO] Thread-{thread_id}: {resumo(host, [avaliacao], POLITICA)}")
+    write_log(f"[INFO] Thread-{thread_id}: OLT {host} - {avaliacao.sem_queda} ONUs sem Last Down Time (-)")
+    
+    # Descoberta concluída: registra a OLT na agenda
+    registrar_visita(host, avaliacao.proxima_delecao)
+    return avaliacao.candidatas
+
+def census_olt(shell, host, thread_id):
+    """
+    Censo rápido (somente leitura): conta ONUs offline por PON usando apenas o
+    display service-port, sem consultar o histórico de cada ONU
+    """
+    fase_atual("census")
+    print(f"[INFO] Thread-{thread_id}: Censo de ONUs offline da OLT {host}...")
+    path_01 = get_service_port(shell, thread_id)
+    
+    with open(path_01, 'r') as file:
+        content = file.read()
+    
     # Remove arquivo temporário
     try:
         os.remove(path_01)
     except:
         pass
-        
-    return list_onus_deletadas
+    
+    # Agrupa as ONTs com service-ports down por PON (cada ONT uma única vez)
+    onus_por_pon = {}
+    service_ports_por_pon = {}
+    for (chassi_id, slot_id, pon_id, onu_id), portas in service_ports_por_ont(content).items():
+        pon = (chassi_id, slot_id, pon_id)
+        onus_por_pon.setdefault(pon, set()).add(onu_id)
+        service_ports_por_pon[pon] = service_ports_por_pon.get(pon, 0) + len(portas)
+    
+    linhas = []
+    
+    # Linha de total da OLT (contagem de service-ports)
+    estatisticas = parse_statistics(content)
+    if estatisticas:
+        total, up, down = estatisticas
+        linhas.append(linha_census("huawei", host, total=total, online=up, offline=down, detalhe="service-ports"))
+    
+    for (chassi_id, slot_id, pon_id), onus in sorted(onus_por_pon.items()):
+        linhas.append(linha_census("huawei", host, chassi_id, slot_id, pon_id,
+                                   offline=len(onus),
+                                   detalhe=f"{service_ports_por_pon[(chassi_id, slot_id, pon_id)]} service-ports down"))
+    
+    print(f"[INFO] Thread-{thread_id}: OLT {host} - {sum(len(o) for o in onus_por_pon.values())} ONUs offline em {len(onus_por_pon)} PON(s)")
+    return linhas
 
 # Função para registrar o inicio da rotina
 def registrar_inicio_rotina():
@@ -295,10 +440,23 @@ def rotina_finalizada(start_time, total_hosts):
     message = f"\nTérmino: {fim.strftime('%Y/%m/%d %H:%M:%S')}\nDuração: {duracao_str}\nTotal de OLTs processadas: {total_hosts}\nROTINA FINALIZADA\n\n"
     write_log(message)
 
-def save_olt(shell, host, thread_id):
+def encerrar_sessao(shell):
+    """
+    Volta ao modo privilegiado e faz logout da OLT (quit, y)
+    """
+    shell.garantir_contexto(HUAWEI_PRIVILEGIADO)
+    time.sleep(0.1)
+    shell.send('quit\n')
+    time.sleep(0.1)
+    shell.send('y\n')
+    shell.contexto_perdido()
+
+def save_olt(shell, host, thread_id, manter_sessao=False):
     """
     Thread-safe version
+    Com manter_sessao=True não faz logout após o save (sessões reaproveitadas no modo daemon)
     """
+    fase_atual("save")
     try:
         print(f"[INFO] Thread-{thread_id}: Salvando configuração na OLT {host}...")
         # Limpa buffer antes
@@ -306,7 +464,7 @@ def save_olt(shell, host, thread_id):
             shell.recv(1024)
             
         # Envia comando save
-        shell.send('save\n\n')
+        shell.executar('save\n\n', HUAWEI_CONFIG)
         
         # Coleta resposta com timeout inteligente
         full_response = ""
@@ -330,12 +488,8 @@ def save_olt(shell, host, thread_id):
             # Verifica se terminou com sucesso
             if re.search(r'success|complete|saved.*successfully', full_response.lower()):
                 print(f"[SUCCESS] Thread-{thread_id}: Configuração salva na OLT {host}")
-                time.sleep(0.1)
-                shell.send('quit\n')
-                time.sleep(0.1)
-                shell.send('quit\n')
-                time.sleep(0.1)
-                shell.send('y\n')
+                if not manter_sessao:
+                    encerrar_sessao(shell)
                 break
             
             # Verifica erro explícito
@@ -350,31 +504,37 @@ def save_olt(shell, host, thread_id):
                 # Se não tem erro, assume sucesso
                 if not re.search(r'error|fail', response_clean.lower()):
                     print(f"[INFO] Thread-{thread_id}: Assumindo sucesso (sem erro detectado)")
-                    time.sleep(0.1)
-                    shell.send('quit\n')
-                    time.sleep(0.1)
-                    shell.send('quit\n')
-                    time.sleep(0.1)
-                    shell.send('y\n')
+                    if not manter_sessao:
+                        encerrar_sessao(shell)
                 else:
                     raise Exception("Timeout com possível erro")
             else:
                 raise Exception("Timeout sem resposta da OLT")
+        registrar_save(True)
     except Exception as e:
-        time.sleep(0.1)
-        shell.send('quit\n')
-        time.sleep(0.1)
-        shell.send('quit\n')
-        time.sleep(0.1)
-        shell.send('y\n')
-        write_log(f"[ERROR] Thread-{thread_id}: Erro ao salvar configuração na OLT {host}: {e}")
-
-def delete_onu(shell, host, thread_id):
+        registrar_save(False)
+        if not manter_sessao:
+            encerrar_sessao(shell)
+        erro = f"Erro ao salvar configuração na OLT {host}: {e}"
+        write_log(f"[ERROR] Thread-{thread_id}: {erro}")
+        registrar_erro(erro)
+
+def delete_onu(shell, host, thread_id, manter_sessao=False, list_remove_onus=None):
     """
     Thread-safe version
+    list_remove_onus pode vir de uma descoberta já feita (ex: via SNMP)
     """
-    list_remove_onus = get_onus_offlines(shell, host, thread_id)
+    if list_remove_onus is None and DELECAO_POR_PON and BACKEND_DESCOBERTA == "cli":
+        delete_onu_por_pon(shell, host, thread_id, manter_sessao)
+        return
+    service_ports = {}
+    if list_remove_onus is None:
+        if BACKEND_DESCOBERTA == "snmp":
+            list_remove_onus = get_onus_offlines_snmp(host, thread_id)
+        else:
+            list_remove_onus = get_onus_offlines(shell, host, thread_id, service_ports)
     #print(f"DEBUG: \n{list_remove_onus}\n")
+    registrar_candidatos(host, list_remove_onus)
     total_deletadas = len(list_remove_onus)
 
     if total_deletadas == 0:
@@ -382,79 +542,345 @@ def delete_onu(shell, host, thread_id):
         write_log(log)
         return
 
-    now = datetime.now()
-    date_time = now.strftime("%Y/%m/%d, %H:%M:%S")
+    fase_atual("deleção")
+    write_log(f"[INFO] Thread-{thread_id}: Deletando {total_deletadas} ONUs offline a {POLITICA.limite(host)} dia(s) da OLT {host}...\n")
+    total_deletadas = 0
+    try:
+        enviadas = deletar_onts(shell, host, thread_id, list_remove_onus, service_ports)
+        total_deletadas = verificar_onts(shell, host, thread_id, enviadas)
+    finally:
+        conferir_delecoes(host, len(list_remove_onus), total_deletadas)
     
-    write_log(f"[INFO] Thread-{thread_id}: Deletando {total_deletadas} ONUs offline a {qtd_dias} dia(s) da OLT {host}...\n")
-
-    for onu in list_remove_onus:
-        result_sn, service_port_id, chassi_id, slot_id, pon_id, onu_id = onu
-        
-        
-        shell.send(f"undo service-port {service_port_id}\n")
-        time.sleep(0.5)
-        shell.send(f"interface gpon {chassi_id}/{slot_id}\n")
-        time.sleep(0.5)
-        shell.send(f"ont delete {pon_id} {onu_id}\n")
-        time.sleep(0.5)
-        shell.send("quit\n")
-        
-        log_msg = f"[INFO] Thread-{thread_id}: CHASSI {chassi_id} SLOT {slot_id} PON {pon_id} ONU {onu_id} SERIAL {result_sn} SERVICE-PORT {service_port_id} DELETADO EM {date_time}."
-        print(log_msg)
-        
     # Adiciona ao contador global
     adicionar_onus_deletadas(total_deletadas)
     
     # Total de ONUs deletadas
     write_log(f"[INFO] Thread-{thread_id}: TOTAL DE {total_deletadas} ONUs DELETADAS NA OLT {host}")
+    write_log(f"[INFO] Thread-{thread_id}: Ritmo da OLT {host}: {shell.ritmo}")
+    
+    with medir_save(host):
+        save_olt(shell, host, thread_id, manter_sessao)
+
+def delete_onu_por_pon(shell, host, thread_id, manter_sessao=False):
+    """
+    Deleção em fluxo (--por-pon): cada PON é deletado assim que o histórico das suas ONTs
+    é verificado, sem esperar a descoberta da OLT inteira. O save continua único, no fim,
+    e acontece mesmo se a descoberta falhar depois de alguma deleção
+    """
+    todas = CandidatosONU("huawei", host)
+    enviadas = CandidatosONU("huawei", host)
+    service_ports = {}
+    try:
+        for candidatos in candidatas_por_pon(shell, host, thread_id, service_ports=service_ports):
+            if not candidatos:
+                continue
+            for onu in candidatos:
+                todas.anexar(onu)
+            
+            onu = candidatos[0]
+            fase_atual("deleção")
+            write_log(f"[INFO] Thread-{thread_id}: Deletando {len(candidatos)} ONUs offline a {POLITICA.limite(host)} dia(s) do PON {onu.chassi}/{onu.slot}/{onu.pon} da OLT {host}...\n")
+            for onu in deletar_onts(shell, host, thread_id, candidatos, service_ports):
+                enviadas.anexar(onu)
+            if prazo_esgotado(host):
+                break
+            fase_atual("descoberta")
+    finally:
+        registrar_candidatos(host, todas)
+        if todas:
+            total_deletadas = verificar_onts(shell, host, thread_id, enviadas)
+            conferir_delecoes(host, len(todas), total_deletadas)
+            adicionar_onus_deletadas(total_deletadas)
+            write_log(f"[INFO] Thread-{thread_id}: TOTAL DE {total_deletadas} ONUs DELETADAS NA OLT {host}")
+            write_log(f"[INFO] Thread-{thread_id}: Ritmo da OLT {host}: {shell.ritmo}")
+            with medir_save(host):
+                save_olt(shell, host, thread_id, manter_sessao)
+    
+    if not todas:
+        write_log(f"[INFO] Thread-{thread_id}: Nenhuma ONU a ser deletada na OLT {host}.")
+
+def deletar_onts(shell, host, thread_id, list_remove_onus, service_ports=None):
+    """
+    Remove os service-ports e as ONTs da lista. Retorna as ONTs com deleção enviada
+    (a confirmação é do verificar_onts). Com o índice service_ports da descoberta, todos
+    os service-ports da ONT saem em um único envio, seguido de um único ont delete
+    """
+    service_ports = service_ports or {}
+    date_time = datetime.now().strftime("%Y/%m/%d, %H:%M:%S")
     
-    save_olt(shell, host, thread_id)
+    # Com --prazo: lotes da mais antiga para a mais nova enquanto couberem na janela
+    enviadas = CandidatosONU("huawei", host)
+    for lote in lotes_no_prazo(host, list_remove_onus):
+        for onu in lote:
+            portas = service_ports.get((onu.chassi, onu.slot, onu.pon, onu.onu))
+            if portas:
+                undos = [f"undo service-port {service_port_id}" for service_port_id in portas]
+            elif onu.service_port is None:
+                # Descoberta via SNMP: remove todos os service-ports da ONT
+                undos = [f"undo service-port port {onu.chassi}/{onu.slot}/{onu.pon} ont {onu.onu}"]
+            else:
+                undos = [f"undo service-port {onu.service_port}"]
+            shell.executar("".join(f"{undo}\n" for undo in undos), HUAWEI_CONFIG)
+            # A resposta do último undo fecha o lote; lotes de tamanhos diferentes têm históricos próprios
+            nome = "undo service-port" if len(undos) == 1 else f"undo service-port ({len(undos)})"
+            aguardar_comando(shell, undos[-1], nome, INTERVALO_DELECAO)
+            shell.executar(f"ont delete {onu.pon} {onu.onu}\n", huawei_interface(onu.chassi, onu.slot))
+            aguardar_comando(shell, f"ont delete {onu.pon} {onu.onu}", "ont delete", INTERVALO_DELECAO)
+            enviadas.anexar(onu)
+            
+            log_msg = f"[INFO] Thread-{thread_id}: CHASSI {onu.chassi} SLOT {onu.slot} PON {onu.pon} ONU {onu.onu} SERIAL {onu.serial} SERVICE-PORT {','.join(portas) if portas else onu.service_port} DELETADO EM {date_time}."
+            print(log_msg)
+    return enviadas
+
+def onts_presentes(saida, chassi_id, slot_id, pon_id):
+    """
+    ONT IDs do PON que ainda aparecem no display ont info F S P all. None quando a saída
+    não traz a tabela (cabeçalho F/S/P ou linha do PON) nem a mensagem de PON vazio
+    """
+    presentes = {int(onu_id) for chassi, slot, pon, onu_id in LAYOUT_ONT_PON.registros(saida)
+                 if (int(chassi), int(slot), int(pon)) == (chassi_id, slot_id, pon_id)}
+    if presentes or CABECALHO_ONT_PON.search(saida) or PON_VAZIO_HUAWEI in saida:
+        return presentes
+    return None
+
+def verificar_onts(shell, host, thread_id, enviadas):
+    """
+    Relê uma vez cada PON afetado (display ont info F S P all) e confere as ONTs enviadas.
+    Retorna quantas foram de fato deletadas; falhas e PONs sem resposta vão para o log
+    """
+    if not enviadas:
+        return 0
+    fase_atual("verificação")
+    deletadas, falhas, nao_verificadas = verificar_delecoes(
+        shell, enviadas, lambda chassi_id, slot_id, pon_id: f"display ont info {chassi_id} {slot_id} {pon_id} all",
+        onts_presentes, HUAWEI_CONFIG, JANELA_PIPELINE, timeout_por_comando=10, terminador="\n\n", nome="display ont info all")
+    
+    for onu in falhas:
+        erro = f"OLT {host} - ONT {onu.chassi}/{onu.slot}/{onu.pon}:{onu.onu} SERIAL {onu.serial} continua no PON após a deleção"
+        write_log(f"[ERRO] Thread-{thread_id}: {erro}")
+        registrar_erro(erro)
+    if nao_verificadas:
+        write_log(f"[WARN] Thread-{thread_id}: OLT {host} - {len(nao_verificadas)} ONTs sem verificação (PON sem resposta), fora do total")
+    write_log(f"[INFO] Thread-{thread_id}: OLT {host} - Verificação: {len(deletadas)} deletadas, {len(falhas)} falhas, {len(nao_verificadas)} não verificadas")
+    return len(deletadas)
+
+def save_olt_tl1(cliente, host, thread_id):
+    """
+    Save via TL1: o resultado vem no código de conclusão, sem esperas nem regex
+    """
+    fase_atual("save")
+    print(f"[INFO] Thread-{thread_id}: Salvando configuração na OLT {host}...")
+    resposta = salvar(cliente, host)
+    registrar_save(resposta.sucesso)
+    if resposta.sucesso:
+        print(f"[SUCCESS] Thread-{thread_id}: Configuração salva na OLT {host}")
+    else:
+        erro = f"Erro ao salvar configuração na OLT {host}: EN={resposta.en} {resposta.endesc}"
+        write_log(f"[ERROR] Thread-{thread_id}: {erro}")
+        registrar_erro(erro)
+
+def delete_onu_tl1(cliente, host, thread_id):
+    """
+    Deleção via TL1: service-ports e ONTs removidos em lotes, contando apenas
+    as ONTs com DEL-ONT concluído (COMPLD)
+    """
+    list_remove_onus = get_onus_offlines_tl1(cliente, host, thread_id)
+    registrar_candidatos(host, list_remove_onus)
+    
+    if not list_remove_onus:
+        write_log(f"[INFO] Thread-{thread_id}: Nenhuma ONU a ser deletada na OLT {host}.")
+        return
+    
+    fase_atual("deleção")
+    write_log(f"[INFO] Thread-{thread_id}: Deletando {len(list_remove_onus)} ONUs offline a {POLITICA.limite(host)} dia(s) da OLT {host}...\n")
+    
+    service_ports = listar_service_ports(cliente, host)
+    
+    total_deletadas = 0
+    try:
+        for lote in lotes_no_prazo(host, list_remove_onus):
+            onts = [(onu.chassi, onu.slot, onu.pon, onu.onu) for onu in lote]
+            resultados = remover_onts(cliente, host, onts, service_ports)
+            
+            date_time = datetime.now().strftime("%Y/%m/%d, %H:%M:%S")
+            for onu, (ont, resposta) in zip(lote, resultados):
+                portas = ",".join(service_ports.get(ont, [])) or "-"
+                if resposta.sucesso:
+                    total_deletadas += 1
+                    print(f"[INFO] Thread-{thread_id}: CHASSI {onu.chassi} SLOT {onu.slot} PON {onu.pon} ONU {onu.onu} SERIAL {onu.serial} SERVICE-PORT {portas} DELETADO EM {date_time}.")
+                else:
+                    erro = f"CHASSI {onu.chassi} SLOT {onu.slot} PON {onu.pon} ONU {onu.onu} SERIAL {onu.serial} NÃO DELETADO: EN={resposta.en} {resposta.endesc}"
+                    write_log(f"[ERRO] Thread-{thread_id}: {erro}")
+                    registrar_erro(erro)
+    finally:
+        conferir_delecoes(host, len(list_remove_onus), total_deletadas)
+    
+    adicionar_onus_deletadas(total_deletadas)
+    write_log(f"[INFO] Thread-{thread_id}: TOTAL DE {total_deletadas} ONUs DELETADAS NA OLT {host}")
+    
+    with medir_save(host):
+        save_olt_tl1(cliente, host, thread_id)
+
+# Ritmo de uma sessão nova, nos limites do fabricante
+def ritmo_da_olt():
+    return Ritmo(INTERVALO_MINIMO, INTERVALO_MAXIMO, JANELA_MINIMA, JANELA_MAXIMA)
+
+# Prepara uma sessão nova (modo daemon): entra no modo config uma única vez
+def preparar_sessao(shell):
+    shell = SessaoCLI(shell, HUAWEI, ritmo_da_olt())
+    shell.configurar_uma_vez('mmi-mode original-output', HUAWEI_CONFIG)
+    read_output(shell)
+    return shell
+
+# Executa o modo escolhido numa sessão já aberta com a OLT
+def processar_sessao(shell, host, thread_id, modo="delete", manter_sessao=False, candidatos=None):
+    # Sem leitura de modelo na Huawei: o histórico de tempos é por OLT
+    shell.equipamento = shell.equipamento or host
+    if modo == "census":
+        escrever_census(path_census, census_olt(shell, host, thread_id))
+    else:
+        delete_onu(shell, host, thread_id, manter_sessao, candidatos)
 
 # Função principal para processar uma OLT (executada em thread)
-def processar_olt(host, thread_id):
+def processar_olt(host, thread_id, modo="delete"):
     """
     Função principal que processa uma OLT específica
-    Executada em thread separada
+    Executada em thread separada. Retorna o ResultadoOLT (falhas registradas com registrar_erro marcam a OLT com erro)
     """
-    try:
-        print(f"[INFO] Thread-{thread_id}: Iniciando processamento da OLT {host}")
-        
-        # Estabelece conexão
-        conn, shell = ssh(host)
-        
+    resultado = ResultadoOLT(host, thread_id, modo)
+    with resultado.executando():
         try:
-            delete_onu(shell, host, thread_id)
+            print(f"[INFO] Thread-{thread_id}: Iniciando processamento da OLT {host}")
             
-        except Exception as e:
-            write_log(f"[ERRO] Thread-{thread_id}: Falha ao processar OLT {host}: {e}")
-        finally:
-            conn.close()
-            print(f"[INFO] Thread-{thread_id}: Conexão fechada com {host}")
+            if modo == "delete" and BACKEND_DESCOBERTA == "tl1":
+                # Backend TL1: listagem, deleção e save pelo NBI, sem sessão SSH
+                with ClienteTL1() as cliente:
+                    delete_onu_tl1(cliente, host, thread_id)
+                return resultado
             
-        return f"Thread-{thread_id}: OLT {host} processada com sucesso"
-        
-    except Exception as e:
-        write_log(f"[ERRO] Thread-{thread_id}: Falha ao conectar OLT {host}: {e}")
-        return f"Thread-{thread_id}: Erro ao processar OLT {host}: {e}"
+            candidatos = None
+            if modo == "delete" and BACKEND_DESCOBERTA == "snmp":
+                # Descoberta via SNMP: a sessão SSH só é aberta se houver ONUs para deletar
+                candidatos = get_onus_offlines_snmp(host, thread_id)
+                registrar_candidatos(host, candidatos)
+                if not candidatos:
+                    write_log(f"[INFO] Thread-{thread_id}: Nenhuma ONU a ser deletada na OLT {host}.")
+                    return resultado
+            
+            # Estabelece conexão
+            conn, shell = ssh(host)
+            shell = SessaoCLI(shell, HUAWEI, ritmo_da_olt())
+            
+            try:
+                processar_sessao(shell, host, thread_id, modo, candidatos=candidatos)
+                
+            except Exception as e:
+                erro = f"Falha ao processar OLT {host}: {e}"
+                write_log(f"[ERRO] Thread-{thread_id}: {erro}")
+                registrar_erro(erro)
+            finally:
+                conn.close()
+                print(f"[INFO] Thread-{thread_id}: Conexão fechada com {host}")
+            
+        except Exception as e:
+            erro = f"Falha ao conectar OLT {host}: {e}"
+            write_log(f"[ERRO] Thread-{thread_id}: {erro}")
+            registrar_erro(erro)
+    return resultado
+
+# Lê a lista de OLTs do CSV
+def carregar_equipamentos():
+    hosts, descartados = carregar_hosts("olts_huawei.csv")
+    for linha, valor, motivo in descartados:
+        write_log(f"[WARN] olts_huawei.csv linha {linha}: host {valor!r} ignorado ({motivo})")
+    return hosts
 
 # -------------------------
 # Script principal com multithreading
 # -------------------------
 if __name__ == "__main__":
+    args = criar_parser("huawei").parse_args()
+    if args.modo == "merge":
+        # Soma os resultados das partições (--shard) nos totais de uma execução única
+        arquivos = args.resultados or arquivos_resultados(path_resultados)
+        olts_mescladas, totais, avisos = mesclar_resultados(arquivos, "huawei")
+        for aviso in avisos:
+            write_log(f"[WARN] {aviso}")
+        write_log(f"[INFO] Merge de {len(arquivos)} arquivo(s): {len(olts_mescladas)} OLTs, {totais[ERRO]} com erro, {totais[ADIADA]} adiada(s)")
+        resultados = [ResultadoOLT.de_dict(registro) for registro in olts_mescladas.values()]
+        for resultado in resultados:
+            somar_resultado(resultado)
+        salvar_total_no_log()
+        inicio_merge = min((resultado.inicio for resultado in resultados if resultado.inicio), default=datetime.now())
+        escrever_relatorio(path_relatorio, "huawei", "merge", resultados, inicio_merge)
+        write_log(f"[INFO] Relatório das partições gravado em {path_relatorio}")
+        sys.exit(0)
+    
+    BACKEND_DESCOBERTA = args.backend
+    DELECAO_POR_PON = args.por_pon
+    if args.intervalo_minimo is not None:
+        INTERVALO_MINIMO = args.intervalo_minimo
+    if args.janela_maxima is not None:
+        JANELA_MAXIMA = args.janela_maxima
+    POLITICA = carregar_politica(path_politica, qtd_dias)
+    if os.path.exists(path_politica):
+        write_log(f"[INFO] Política de retenção ({path_politica}): {POLITICA}")
+    ativar_gravacao(args.gravar)
+    if args.metricas:
+        iniciar_servidor(args.metricas, "huawei")
+        registrar_contador("delete_onu_onus_deletadas_total", "ONUs deletadas na execução (inclui as OLTs em andamento)", DELETADAS)
+        registrar_contador("delete_onu_onus_consultadas_total", "ONUs offline consultadas na execução (inclui as OLTs em andamento)", CONSULTADAS)
+        registrar_contador("delete_onu_onus_sem_last_down_encontradas_total", "ONUs sem last down time encontradas na execução (deletadas ou mantidas pela política)", SEM_QUEDA)
+    
+    if args.modo == "daemon":
+        executar_daemon(sys.modules[__name__], args)
+        sys.exit(0)
+    
+    if args.modo == "queue":
+        executar_coordenador(sys.modules[__name__], args)
+        sys.exit(0)
+    
+    if args.modo == "worker":
+        executar_worker(sys.modules[__name__], args)
+        sys.exit(0)
+    
     inicio_global = registrar_inicio_rotina()
+    carregar_tempos(path_tempos)
+    if args.profile:
+        write_log(f"[INFO] Perfil de execução em {ativar_perfil(path_02)}")
+    if args.ociosidade:
+        ativar_ociosidade()
     
-    # Lê lista de equipamentos do CSV se necessário
+    # Lê lista de equipamentos do CSV
     try:
         # Lista de OLTs
         #equipamentos = ['10.144.0.10']  # LAB
         
         #equipamentos = ['10.146.204.3'] # Adicione mais IPs aqui 
-        df_hosts = pd.read_csv("olts_huawei.csv")
-        # Descomente a linha abaixo se quiser usar o CSV
-        equipamentos = df_hosts["host"].tolist()
-    except:
-        write_log("[WARN] Não foi possível carregar CSV, usando lista hardcoded")
+        equipamentos = carregar_equipamentos()
+    except (OSError, ValueError) as e:
+        # Sem inventário não há lista de OLTs para processar
+        write_log(f"[ERRO] Não foi possível carregar olts_huawei.csv: {e}")
+        sys.exit(1)
+    
+    if args.agendado:
+        devidos = hosts_devidos(carregar_agenda(path_agenda), equipamentos, dias_varredura=args.varredura_completa)
+        write_log(f"[INFO] Modo agendado: {len(devidos)} de {len(equipamentos)} OLTs devidas")
+        equipamentos = devidos
     
+    if args.shard:
+        indice_particao, total_particoes = args.shard
+        particao = hosts_da_particao(equipamentos, indice_particao, total_particoes)
+        write_log(f"[INFO] Partição {indice_particao}/{total_particoes}: {len(particao)} de {len(equipamentos)} OLTs")
+        equipamentos = particao
+    
+    if args.prazo and args.modo == "delete":
+        # Janela de manutenção: OLTs com as ONUs offline há mais tempo começam primeiro
+        write_log(f"[INFO] Prazo da janela: {definir_prazo(args.prazo).strftime('%Y/%m/%d %H:%M')}")
+        carregar_custos(path_custos)
+        equipamentos = ordenar_por_atraso(equipamentos)
+    
+    registrar_olts(equipamentos)
     print(f"[INFO] Processando {len(equipamentos)} OLTs com máximo de {MAX_THREADS} threads\n")
     
     # Executa processamento multithread
@@ -466,21 +892,24 @@ if __name__ == "__main__":
         
         for i, host in enumerate(equipamentos):
             # Adiciona delay entre submissions para evitar sobrecarga
-            if i > 0:
+            if i > 0 and segundos_restantes() > 0:
                 time.sleep(THREAD_DELAY)
             
-            future = executor.submit(processar_olt, host, i+1)
+            future = executor.submit(perfilar_olt, acompanhar_olt(contabilizar_olt(no_prazo(processar_olt))), host, i+1, args.modo)
             future_to_host[future] = host
         
-        # Coleta resultados conforme completam
+        # Coleta resultados conforme completam (só esta thread soma os contadores)
         for future in as_completed(future_to_host):
             host = future_to_host[future]
             try:
                 resultado = future.result()
-                resultados.append(resultado)
-                print(f"[SUCCESS] {resultado}")
+                print(resultado.linha_log())
             except Exception as e:
                 write_log(f"[ERRO] Falha na thread para OLT {host}: {e}")
+                resultado = ResultadoOLT(host, modo=args.modo)
+                resultado.falhar(f"Falha na thread: {e}")
+            resultados.append(resultado)
+            somar_resultado(resultado)
     
     # Limpa arquivos temporários
     try:
@@ -495,7 +924,38 @@ if __name__ == "__main__":
     for resultado in resultados:
         write_log(f"[INFO] {resultado}")
     
-    salvar_total_no_log()
+    if args.modo == "census":
+        write_log(f"[INFO] Censo salvo em {path_census}")
+    else:
+        salvar_total_no_log()
+        
+        # Atualiza a agenda com a próxima data de deleção de cada OLT visitada
+        total_agendadas = atualizar_agenda(path_agenda)
+        write_log(f"[INFO] Agenda atualizada para {total_agendadas} OLT(s) em {path_agenda}")
+    
+    totais_execucao = escrever_relatorio(path_relatorio, "huawei", args.modo, resultados, inicio_global)
+    write_log(f"[INFO] Relatório gravado em {path_relatorio}: {totais_execucao[SUCESSO]} OLT(s) com sucesso, "
+              f"{totais_execucao[ERRO]} com erro, {totais_execucao[ADIADA]} adiada(s)")
+    
+    if args.shard:
+        path_particao = caminho_resultados(path_resultados, *args.shard)
+        total_resultados = escrever_resultados(path_particao, "huawei", *args.shard, resultados)
+        write_log(f"[INFO] Resultado de {total_resultados} OLT(s) da partição gravado em {path_particao}")
+    
+    # Guarda os tempos de resposta observados para as próximas execuções
+    salvar_tempos(path_tempos)
+    
+    if args.prazo and args.modo == "delete":
+        salvar_custos(path_custos)
+        for linha in resumo_prazo():
+            write_log(linha)
+    
+    if args.profile:
+        write_log(f"[INFO] Perfil da execução gravado em {escrever_perfil_agregado()}")
+    
+    if args.ociosidade:
+        for linha in escrever_ociosidade(path_ociosidade, "huawei"):
+            write_log(linha)
     
     # Final global
     rotina_finalizada(inicio_global, len(equipamentos))
\ No newline at end of file
@@ -1,18 +1,45 @@
 import os
+import sys
 import time
 import re
 from datetime import datetime, date
-import pandas as pd
-from dotenv import load_dotenv
 from connection_ssh import ssh
-import threading
+from gravador import ativar_gravacao
+from perfilador import ativar_perfil, perfilar_olt, escrever_perfil_agregado
+from ociosidade import ativar_ociosidade, contabilizar_olt, escrever_ociosidade, medir, LockMedido, LOG
+from janela import definir_prazo, carregar_custos, salvar_custos, ordenar_por_atraso, no_prazo, lotes_no_prazo, prazo_esgotado, medir_save, registrar_candidatos, segundos_restantes, resumo_prazo
+from metricas import iniciar_servidor, registrar_contador, registrar_olts, acompanhar_olt, fase_atual, somar_olt
+from argumentos import criar_parser
+from particao import hosts_da_particao, caminho_resultados, escrever_resultados, arquivos_resultados, mesclar_resultados
+from resultado_olt import ResultadoOLT, contar, contar_avaliacoes, registrar_erro, registrar_save, escrever_relatorio, CONSULTADAS, DELETADAS, SEM_QUEDA, SUCESSO, ERRO, ADIADA
+from daemon import executar_daemon
+from fila import executar_coordenador, executar_worker
+from pipeline import executar_pipeline
+from tempos_resposta import ler_ate_prompt, aguardar_comando, carregar_tempos, salvar_tempos
+from snmp_backend import coletar_candidatos
+from ritmo import Ritmo
+from sessao_cli import SessaoCLI, ZTE, ZTE_RAIZ, zte_interface
+from census import linha_census, escrever_census
+from registro_onu import CandidatosONU
+from inventario import carregar_hosts
+from politica import Politica, carregar_politica, avaliar, resumo, proxima_delecao
+from verificacao import verificar_delecoes
+from tabela import TabelaFixa, TabelaRegex, registros
+from agendador import registrar_visita, conferir_delecoes, carregar_agenda, hosts_devidos, atualizar_agenda
 from concurrent.futures import ThreadPoolExecutor, as_completed
-import queue
-from threading import Lock
 
 # Configurações
 path_01_base = "onus_state"  # Será usado como prefixo para cada thread
 path_02 = "log_zte.txt"
+path_census = "census_zte.csv"
+path_agenda = "agenda_zte.json"
+path_tempos = "tempos_zte.json"
+path_ociosidade = "ociosidade_zte.csv"
+path_custos = "custos_zte.json"
+path_politica = "politica_zte.json"
+path_resultados = "resultado_zte"  # resultado por OLT de cada partição (--shard)
+path_fila = "fila_zte.db"  # fila de OLTs dos modos queue/worker
+path_relatorio = "relatorio_zte.json"  # status, tempos e contadores de cada OLT da execução
 qtd_dias = 45
 
 # Variáveis que controlam os contadores globais
@@ -22,10 +49,40 @@ total_onus_nunca_online = 0
 # Configurações de threading
 MAX_THREADS = 90  # Número máximo de threads simultâneas
 THREAD_DELAY = 10  # Delay entre inicialização de threads (segundos)
+JANELA_PIPELINE = 8  # Comandos show gpon onu detail-info enviados de uma vez por sessão (inicial; ajustado pelo ritmo da OLT)
+INTERVALO_DELECAO = 0.5  # Segundos entre comandos de deleção (inicial; ajustado pelo ritmo da OLT)
+# Limites do ritmo da OLT (ritmo.py): por padrão o intervalo não desce abaixo do INTERVALO_DELECAO
+INTERVALO_MINIMO = INTERVALO_DELECAO  # Segundos (definido por --intervalo-minimo)
+INTERVALO_MAXIMO = 5.0  # Segundos
+JANELA_MINIMA = 1  # Comandos por janela do pipeline
+JANELA_MAXIMA = 32  # Comandos por janela do pipeline (definido por --janela-maxima)
+BACKEND_DESCOBERTA = "cli"  # "cli" ou "snmp" (definido por --backend)
+DELECAO_POR_PON = False  # deleção em fluxo, PON a PON (definido por --por-pon)
+POLITICA = Politica(qtd_dias)  # limites e exclusões (politica_zte.json, lida no início da rotina)
+
+# show gpon onu state: OnuIndex, Admin State, OMCC State, Phase State (colunas pelo cabeçalho;
+# sem cabeçalho, uma linha "1/2/3:4  enable  enable  working ...")
+COLUNAS_ONU_STATE = (0, 1, 2, 3)
+LAYOUT_ONU_STATE = TabelaRegex(r'^\s*(\d+/\d+/\d+:\d+)\s+(\S+)\s+(\S+)\s+(\S+)')
+COLUNA_INDICE = (0,)
+LAYOUT_INDICE = TabelaRegex(r'^\s*(\d+/\d+/\d+:\d+)\s')
+INDICE_ONU = re.compile(r'^\d+/\d+/\d+:\d+$')  # célula OnuIndex (descarta cabeçalhos repetidos)
+# Resposta do show gpon onu state para um PON sem ONUs
+PON_VAZIO_ZTE = "No related information to show"
+# Histórico do show gpon onu detail-info: índice, AuthPass date/time, Offline date/time, causa (se houver)
+HISTORICO_ONU = re.compile(
+    r'^\s*\d+\s+'                      # índice
+    r'(\d{4}-\d{2}-\d{2})\s+'          # auth date
+    r'(\d{2}:\d{2}:\d{2})\s+'          # auth time
+    r'(\d{4}-\d{2}-\d{2})\s+'          # offline date
+    r'(\d{2}:\d{2}:\d{2})\s*'          # offline time
+    r'(.*\S)?\s*$',                    # cause (opcional)
+    re.MULTILINE
+)
 
 
 # Lock para escrita no arquivo de log (thread-safe)
-log_lock = Lock()
+log_lock = LockMedido()
 
 # -------------------------
 # Funções para controlar contador global
@@ -33,44 +90,49 @@ log_lock = Lock()
 
 def adicionar_onus_deletadas(quantidade):
     """
-    Adiciona ONUs ao contador global usando o log_lock existente
+    Adiciona ONUs deletadas ao resultado da OLT da thread atual
     """
-    global total_onus_deletadas
-    with log_lock:
-        total_onus_deletadas += quantidade
+    contar(DELETADAS, quantidade)
         
 def adicionar_onus_nunca_online(quantidade):
     """
-    Adiciona ONUs nunca online ao contador global
+    Adiciona ONUs nunca online ao resultado da OLT da thread atual
     """
-    global total_onus_nunca_online
-    with log_lock:
-        total_onus_nunca_online += quantidade
+    contar(SEM_QUEDA, quantidade)
+
+def somar_resultado(resultado):
+    """
+    Soma o ResultadoOLT aos contadores globais. Chamada só pela thread principal
+    (ao receber cada OLT), por isso sem lock
+    """
+    global total_onus_deletadas, total_onus_nunca_online
+    total_onus_deletadas += resultado.deletadas
+    total_onus_nunca_online += resultado.sem_queda
+    somar_olt(resultado)
 
 def obter_total_onus_deletadas():
     """
     Retorna o total geral de ONUs deletadas
     """
-    with log_lock:
-        return total_onus_deletadas
+    return total_onus_deletadas
 
 def obter_total_onus_nunca_online():
     """
     Retorna o total geral de ONUs nunca online
     """
-    with log_lock:
-        return total_onus_nunca_online
+    return total_onus_nunca_online
 
 def salvar_total_no_log():
     """
-    Salva o total final de ONUs deletadas e nunca online no log
+    Salva o total final de ONUs deletadas e nunca online no log. As nunca online são as
+    encontradas (a política nunca_online decide se entram nas deletadas)
     """
     total_deletadas = obter_total_onus_deletadas()
     total_nunca_online = obter_total_onus_nunca_online()
     
     write_log("\n" + "="*50)
     write_log(f"TOTAL GERAL DE ONUs DELETADAS: {total_deletadas}")
-    write_log(f"SENDO {total_nunca_online} ONUs NUNCA ONLINE")
+    write_log(f"TOTAL GERAL DE ONUs NUNCA ONLINE ENCONTRADAS: {total_nunca_online}")
     write_log("="*50)
 
 # Função thread-safe para escrita de logs
@@ -78,18 +140,18 @@ def write_log(message, include_print=True):
     """
     Escreve log de forma thread-safe
     """
-    if include_print:
-        print(message)
-    
-    with log_lock:
-        with open(path_02, "a", encoding="utf-8") as log_file:
-            log_file.write(f"{message}\n")
+    with medir(LOG):
+        if include_print:
+            print(message)
+        
+        with log_lock:
+            with open(path_02, "a", encoding="utf-8") as log_file:
+                log_file.write(f"{message}\n")
 
 # Coletar hora Atual da OLT
 def olt_date(shell):
-    shell.send('show clock\n')
-    time.sleep(1)
-    result = read_output(shell)
+    shell.executar('show clock\n', ZTE_RAIZ)
+    result = ler_ate_prompt(shell, 'show clock', 2)
 
     lines = result.splitlines()
     for line in lines:
@@ -114,10 +176,9 @@ def read_output(shell, buffer_size=65535, wait=1):
 
 # Função para coletar status das ONUs (thread-safe)
 def get_onus_state(shell, thread_id):
-    shell.send('terminal length 0\n')
-    shell.send('show gpon onu state\n')
-    time.sleep(15)
-    result = read_output(shell)
+    shell.configurar_uma_vez('terminal length 0', ZTE_RAIZ)
+    shell.executar('show gpon onu state\n', ZTE_RAIZ)
+    result = ler_ate_prompt(shell, 'show gpon onu state', 16)
 
     # Cada thread usa seu próprio arquivo
     path_01 = f'{path_01_base}_{thread_id}.txt'
@@ -128,8 +189,21 @@ def get_onus_state(shell, thread_id):
     print(f"[INFO] Thread-{thread_id}: ONU state salvo em {path_01}")
     return result, path_01
 
+# Posição (chassi, slot, pon, onu) a partir do índice gpon_onu-c/s/p:onu
+def posicao_onu(index):
+    chassi_slot_pon, onu_id = index.replace("gpon_onu-", "").split(":")
+    return (*chassi_slot_pon.split("/"), onu_id)
+
 # Função para obter ONUs offline (thread-safe)
 def get_onus_offlines(shell, host, thread_id):
+    # Um único grupo com a OLT inteira (consome o gerador até o fim: contador, log e agenda)
+    [list_onus_delete] = candidatas_por_pon(shell, host, thread_id, por_pon=False)
+    return list_onus_delete
+
+# Descoberta das ONUs a deletar: com por_pon=True gera uma CandidatosONU por PON assim que o
+# histórico das ONUs do PON é verificado (deleção em fluxo); senão uma única lista com a OLT inteira
+def candidatas_por_pon(shell, host, thread_id, por_pon=True):
+    fase_atual("descoberta")
     # coleta o estado das ONUs já existente
     result, path_01 = get_onus_state(shell, thread_id)
 
@@ -137,18 +211,18 @@ def get_onus_offlines(shell, host, thread_id):
     data_olt = olt_date(shell)
 
     list_onus_offlines = []
-    list_onus_delete = []
-    
-    contador_nunca_online = 0  # Contador local por OLT
+    avaliacoes = []
 
     # lê diretamente do arquivo salvo pelo get_onus_state
     try:
         with open(path_01, 'r', encoding="utf-8") as file_onu_state:
-            for line in file_onu_state:
-                # Pega ONU que não está working e está enable
-                if ('working' not in line) and ('enable' in line):
-                    onu_index = f"gpon_onu-{line.split()[0]}"
-                    list_onus_offlines.append(onu_index)
+            content = file_onu_state.read()
+        
+        # Pega ONU que não está working e está enable. O índice é a primeira coluna e nunca fica
+        # vazio: o split() da linha basta e é mais barato que o leitor de tabelas
+        for line in content.splitlines():
+            if 'working' not in line and 'enable' in line:
+                list_onus_offlines.append(f"gpon_onu-{line.split()[0]}")
 
         # Remove arquivo temporário
         try:
@@ -157,90 +231,140 @@ def get_onus_offlines(shell, host, thread_id):
             pass
             
     except FileNotFoundError:
-        write_log(f"[ERRO] Thread-{thread_id}: Arquivo {path_01} não encontrado")
-        return []
+        erro = f"Arquivo {path_01} não encontrado"
+        write_log(f"[ERRO] Thread-{thread_id}: {erro}")
+        registrar_erro(erro)
+        yield CandidatosONU("zte", host)
+        return
 
     if len(list_onus_offlines) >= 1:
         print(f'[INFO] Thread-{thread_id}: Encontradas {len(list_onus_offlines)} ONUs offline. Verificando histórico...\n')
 
+    # Por PON (chassi/slot/pon), na ordem do show gpon onu state
+    grupos = {}
     for index in list_onus_offlines:
-        shell.send(f'show gpon onu detail-info {index}\n')
-        time.sleep(5)
-        result = read_output(shell)
-
-        # --- Extrair serial ---
-        serial_number = None
-        m_sn = re.search(r'^\s*Serial number:\s*(\S+)', result, re.MULTILINE)
-        if m_sn:
-            serial_number = m_sn.group(1)
-
-        # --- Detectar ONUs que nunca subiram ou extrair histórico ---
-        # Checa flag textual "onu never online"
-        if re.search(r'\bonu never online\b', result, re.IGNORECASE):
-            continue # comente este continue caso queira deletar automaticamente
-            contador_nunca_online += 1
-            print(f"[INFO] Thread-{thread_id}: ONU {index[9:]} nunca online (flag no detail-info). Incluindo na lista de deleção.\n")
-            list_onus_delete.append((index, serial_number))
-            continue
-
-        # Regex que captura: índice, AuthPass date/time, Offline date/time, causa (se houver)
-        hist_re = re.compile(
-            r'^\s*\d+\s+'                      # índice
-            r'(\d{4}-\d{2}-\d{2})\s+'          # auth date
-            r'(\d{2}:\d{2}:\d{2})\s+'          # auth time
-            r'(\d{4}-\d{2}-\d{2})\s+'          # offline date
-            r'(\d{2}:\d{2}:\d{2})\s*'          # offline time
-            r'(.*\S)?\s*$',                    # cause (opcional)
-            re.MULTILINE
-        )
-
-        entries = hist_re.findall(result)  # lista de tuplas (auth_date, auth_time, off_date, off_time, cause)
-
-
-        # Se TODAS as AuthPass dates forem 0000-00-00 => nunca subiu
-        if all(entry[0] == "0000-00-00" for entry in entries):
-            continue # comente este continue caso queira deletar automaticamente
-            contador_nunca_online += 1
-            print(f"[INFO] Thread-{thread_id}: ONU {index[9:]} possui apenas AuthPass 0000-00-00. Incluindo na lista de deleção.\n")
-            list_onus_delete.append((index, serial_number))
-            continue
-
-        # Procura a última entrada com OfflineDate válido != 0000-00-00
-        offline_dt = None
-        offline_cause = None
-        for auth_date, auth_time, off_date, off_time, cause in reversed(entries):
-            if off_date and off_date != "0000-00-00":
-                try:
-                    offline_dt = datetime.strptime(f"{off_date} {off_time}", "%Y-%m-%d %H:%M:%S")
-                    offline_cause = (cause or '').strip()
-                    break
-                except Exception:
-                    continue
-
-        # Se não achou OfflineTime válido -> pula
-        if not offline_dt:
-            print(f"[INFO] Thread-{thread_id}: ONU {index[9:]} sem OfflineTime válido. Ignorando para deleção automática.\n")
-            continue
-
-        # Calcula dias OFF e decide inclusão na lista de deleção
-        try:
-            days_off = (data_olt - offline_dt.date()).days
-            if days_off >= qtd_dias:
-                list_onus_delete.append((index, serial_number))
-            print(f"[INFO] Thread-{thread_id}: ONU {index[9:]} ESTA A {days_off} DIA(S) OFFLINE "
-                  f"(OfflineTime {offline_dt.date()}, Cause: {offline_cause or 'N/A'})\n")
-        except Exception as e:
-            write_log(f"[WARN] Thread-{thread_id}: Não foi possível processar {index}: {e}")
+        grupos.setdefault(index.split(':')[0] if por_pon else None, []).append(index)
+    
+    for indices in grupos.values() or [[]]:
+        offline = CandidatosONU("zte", host)
+        
+        # Consulta as ONUs em janelas de comandos enviados de uma vez (pipeline)
+        comandos = [f'show gpon onu detail-info {index}' for index in indices]
+        saidas = executar_pipeline(shell, comandos, ZTE_RAIZ, JANELA_PIPELINE, timeout_por_comando=6, nome="show gpon onu detail-info")
+    
+        for index, result in zip(indices, saidas):
+
+            # --- Extrair serial ---
+            serial_number = None
+            m_sn = re.search(r'^\s*Serial number:\s*(\S+)', result, re.MULTILINE)
+            if m_sn:
+                serial_number = m_sn.group(1)
+
+            # --- Detectar ONUs que nunca subiram ou extrair histórico ---
+            # Flag textual "onu never online" ou TODAS as AuthPass dates 0000-00-00 => nunca subiu
+            # (sem data de queda: a política decide se deleta)
+            entries = HISTORICO_ONU.findall(result)  # lista de tuplas (auth_date, auth_time, off_date, off_time, cause)
+            if re.search(r'\bonu never online\b', result, re.IGNORECASE) or all(entry[0] == "0000-00-00" for entry in entries):
+                print(f"[INFO] Thread-{thread_id}: ONU {index[9:]} nunca online.\n")
+                offline.adicionar(*posicao_onu(index), serial=serial_number)
+                continue
+
+            # Procura a última entrada com OfflineDate válido != 0000-00-00
+            offline_date = None
+            offline_cause = None
+            for auth_date, auth_time, off_date, off_time, cause in reversed(entries):
+                if off_date and off_date != "0000-00-00":
+                    try:
+                        offline_date = date.fromisoformat(off_date)
+                        offline_cause = (cause or '').strip()
+                        break
+                    except ValueError:
+                        continue
+
+            # Se não achou OfflineTime válido -> pula
+            if not offline_date:
+                print(f"[INFO] Thread-{thread_id}: ONU {index[9:]} sem OfflineTime válido. Ignorando para deleção automática.\n")
+                continue
+
+            # A decisão (limite de dias, exclusões) é da política, sobre a OLT/PON inteiro
+            offline.adicionar(*posicao_onu(index), serial=serial_number, ultima_queda=offline_date)
+            print(f"[INFO] Thread-{thread_id}: ONU {index[9:]} OFFLINE "
+                  f"(OfflineTime {offline_date}, Cause: {offline_cause or 'N/A'})\n")
+        
+        avaliacao = avaliar(offline, data_olt, POLITICA)
+        avaliacoes.append(avaliacao)
+        yield avaliacao.candidatas
 
     # Adiciona ao contador global
+    contador_nunca_online = sum(avaliacao.sem_queda for avaliacao in avaliacoes)
     adicionar_onus_nunca_online(contador_nunca_online)
     
     # Log do total por OLT
+    contar_avaliacoes(avaliacoes)
+    write_log(f"[INFO] Thread-{thread_id}: {resumo(host, avaliacoes, POLITICA)}")
     write_log(f"[INFO] Thread-{thread_id}: OLT {host} - {contador_nunca_online} ONUs nunca online")
     
+    # Descoberta concluída: registra a OLT na agenda
+    registrar_visita(host, proxima_delecao(avaliacoes))
+
+
+# Função para obter ONUs offline via SNMP (sem comandos na sessão SSH)
+def get_onus_offlines_snmp(host, thread_id):
+    fase_atual("descoberta")
+    print(f"[INFO] Thread-{thread_id}: Obtendo ONUs offline da OLT {host} via SNMP...")
+    avaliacao = coletar_candidatos(host, "zte", POLITICA)
     
-    return list_onus_delete
+    # Adiciona ao contador global
+    adicionar_onus_nunca_online(avaliacao.sem_queda)
+    contar_avaliacoes([avaliacao])
+    write_log(f"[INFO] Thread-{thread_id}: {resumo(host, [avaliacao], POLITICA)}")
+    
+    # Descoberta concluída: registra a OLT na agenda
+    registrar_visita(host, avaliacao.proxima_delecao)
+    return avaliacao.candidatas
 
+# Censo rápido de ONUs por PON (somente leitura)
+def census_olt(shell, host, thread_id):
+    """
+    Conta ONUs por PON e por Phase State usando apenas o show gpon onu state,
+    sem consultar o detail-info de cada ONU
+    """
+    fase_atual("census")
+    print(f"[INFO] Thread-{thread_id}: Censo de ONUs offline da OLT {host}...")
+    result, path_01 = get_onus_state(shell, thread_id)
+    
+    # Remove arquivo temporário
+    try:
+        os.remove(path_01)
+    except:
+        pass
+    
+    contagem_por_pon = {}
+    for onu_index, admin_state, _, phase_state in registros(result, COLUNAS_ONU_STATE, LAYOUT_ONU_STATE):
+        # Linhas de ONU: "1/2/3:4  enable  enable  working  1(GPON)"
+        if not INDICE_ONU.match(onu_index):
+            continue
+        
+        pon = tuple(onu_index.split(':')[0].split('/'))
+        
+        contagem = contagem_por_pon.setdefault(pon, {'total': 0, 'online': 0, 'offline': 0, 'estados': {}})
+        contagem['total'] += 1
+        if phase_state == 'working':
+            contagem['online'] += 1
+        elif admin_state == 'enable':
+            # Mesmo critério do get_onus_offlines: não working e enable
+            contagem['offline'] += 1
+            contagem['estados'][phase_state] = contagem['estados'].get(phase_state, 0) + 1
+    
+    linhas = []
+    for (chassi_id, slot_id, pon_id), contagem in sorted(contagem_por_pon.items(), key=lambda item: tuple(int(x) for x in item[0])):
+        detalhe = ";".join(f"{estado}={qtd}" for estado, qtd in sorted(contagem['estados'].items()))
+        linhas.append(linha_census("zte", host, chassi_id, slot_id, pon_id,
+                                   contagem['total'], contagem['online'], contagem['offline'], detalhe))
+    
+    total_offline = sum(c['offline'] for c in contagem_por_pon.values())
+    print(f"[INFO] Thread-{thread_id}: OLT {host} - {total_offline} ONUs offline em {len(contagem_por_pon)} PON(s)")
+    return linhas
 
 # Função para registrar o inicio da rotina
 def registrar_inicio_rotina():
@@ -260,16 +384,15 @@ def rotina_finalizada(start_time, total_hosts):
 
 # Função para salvar configuração da OLT (thread-safe)
 def save_olt(shell, host, thread_id):
+    fase_atual("save")
     try:
         print(f"[INFO] Thread-{thread_id}: Salvando configuração na OLT {host}...")
         # Limpa buffer antes
         while shell.recv_ready():
             shell.recv(1024)
             
-        # Envia comando save
-        shell.send('exit\n')
-        time.sleep(0.1)
-        shell.send('write\n')
+        # Envia comando save (sai dos modos de configuração antes)
+        shell.executar('write\n', ZTE_RAIZ)
         
         # Coleta resposta com timeout inteligente
         full_response = ""
@@ -293,6 +416,7 @@ def save_olt(shell, host, thread_id):
             # Verifica erro ZTE
             if re.search(r'error|fail|invalid|denied', full_response, re.IGNORECASE):
                 shell.send('exit\n')
+                shell.contexto_perdido()
                 raise Exception(f"Erro da ZTE: {full_response.strip()}")
             
         else:
@@ -304,119 +428,308 @@ def save_olt(shell, host, thread_id):
                 print(f"[INFO] Thread-{thread_id}: Assumindo sucesso - resposta: {full_response.strip()}")
             else:
                 raise Exception("Timeout sem confirmação de salvamento")
+        registrar_save(True)
                 
     except Exception as e:
-        write_log(f"[ERROR] Thread-{thread_id}: Erro ao salvar configuração na OLT {host}: {e}")
+        registrar_save(False)
+        erro = f"Erro ao salvar configuração na OLT {host}: {e}"
+        write_log(f"[ERROR] Thread-{thread_id}: {erro}")
+        registrar_erro(erro)
 
 # Função para deletar ONUs offline (thread-safe)
-def delete_onu(shell, host, thread_id):
-    print(f"[INFO] Thread-{thread_id}: Obtendo ONUs offline da OLT {host}...")
-    onu_delete = get_onus_offlines(shell, host, thread_id)
+def delete_onu(shell, host, thread_id, onu_delete=None):
+    # onu_delete pode vir de uma descoberta já feita (ex: via SNMP)
+    if onu_delete is None and DELECAO_POR_PON and BACKEND_DESCOBERTA == "cli":
+        delete_onu_por_pon(shell, host, thread_id)
+        return
+    if onu_delete is None:
+        if BACKEND_DESCOBERTA == "snmp":
+            onu_delete = get_onus_offlines_snmp(host, thread_id)
+        else:
+            print(f"[INFO] Thread-{thread_id}: Obtendo ONUs offline da OLT {host}...")
+            onu_delete = get_onus_offlines(shell, host, thread_id)
 
+    registrar_candidatos(host, onu_delete)
     if not onu_delete:
         log = f"[INFO] Thread-{thread_id}: Nenhuma ONU a ser deletada na OLT {host}."
         #write_log(log)
         print(log)
         return
 
-    total_deletadas = len(onu_delete)
-    
-    print(f"[INFO] Thread-{thread_id}: Deletando {total_deletadas } ONUs offline a {qtd_dias} dia(s) da OLT {host}...\n")
-    conf_t = f'configure terminal\n'
-    shell.send(conf_t)
-    time.sleep(0.5)
-    
+    fase_atual("deleção")
+    print(f"[INFO] Thread-{thread_id}: Deletando {len(onu_delete)} ONUs offline a {POLITICA.limite(host)} dia(s) da OLT {host}...\n")
 
-    for index, serial_number in onu_delete:
-        try:
-            result = index.replace("gpon_onu-", "").replace(":", " ").split()
-            chassi_slot_pon = result[0].split("/")
-            chassi_id = chassi_slot_pon[0]
-            slot_id = chassi_slot_pon[1]
-            pon_id = chassi_slot_pon[2]
-            onu_id = result[1]
-
-            interface_gpon = f'interface gpon_olt-{chassi_id}/{slot_id}/{pon_id}\n'
-            remove_onu = f'no onu {onu_id}\n'
-            comand_exit = f'exit\n'
-
-            shell.send(interface_gpon)
-            time.sleep(0.5)
-            shell.send(remove_onu)
-            time.sleep(0.5)
-            shell.send(comand_exit)
-            time.sleep(0.5)
-
-            now = datetime.now()
-            date_time = now.strftime("%Y/%m/%d, %H:%M:%S")
-            log = f"[INFO] Thread-{thread_id}: CHASSI {chassi_id} SLOT {slot_id} PON {pon_id} ONU {onu_id} SERIAL {serial_number} DELETADO EM {date_time}."
-            #write_log(log)
-            print(log)
-            
-            # Incrementa o contador
-            total_deletadas += 1
-            
-        except Exception as e:
-            log = f"[ERRO] Thread-{thread_id}: Falha ao deletar ONU {index} na OLT {host}: {e}"
-            write_log(log)
-            print(log)
-            
+    total_deletadas = 0
+    try:
+        enviadas = deletar_onus(shell, host, thread_id, onu_delete)
+        total_deletadas = verificar_onus(shell, host, thread_id, enviadas)
+    finally:
+        conferir_delecoes(host, len(onu_delete), total_deletadas)
+    
     # Adiciona ao contador global
     adicionar_onus_deletadas(total_deletadas)
     
     # Log final: total de ONUs deletadas
     write_log(f"[INFO] Thread-{thread_id}: TOTAL DE {total_deletadas} ONUs DELETADAS NA OLT {host}")
-
-    save_olt(shell, host, thread_id)
+    write_log(f"[INFO] Thread-{thread_id}: Ritmo da OLT {host}: {shell.ritmo}")
+
+    with medir_save(host):
+        save_olt(shell, host, thread_id)
+
+# Deleção em fluxo (--por-pon): cada PON é deletado assim que o histórico das suas ONUs é
+# verificado, sem esperar a descoberta da OLT inteira. O save continua único, no fim, e
+# acontece mesmo se a descoberta falhar depois de alguma deleção
+def delete_onu_por_pon(shell, host, thread_id):
+    print(f"[INFO] Thread-{thread_id}: Obtendo ONUs offline da OLT {host} (deleção por PON)...")
+    todas = CandidatosONU("zte", host)
+    enviadas = CandidatosONU("zte", host)
+    try:
+        for candidatos in candidatas_por_pon(shell, host, thread_id):
+            if not candidatos:
+                continue
+            for onu in candidatos:
+                todas.anexar(onu)
+            
+            onu = candidatos[0]
+            fase_atual("deleção")
+            print(f"[INFO] Thread-{thread_id}: Deletando {len(candidatos)} ONUs offline a {POLITICA.limite(host)} dia(s) do PON {onu.chassi}/{onu.slot}/{onu.pon} da OLT {host}...\n")
+            for onu in deletar_onus(shell, host, thread_id, candidatos):
+                enviadas.anexar(onu)
+            if prazo_esgotado(host):
+                break
+            fase_atual("descoberta")
+    finally:
+        registrar_candidatos(host, todas)
+        if todas:
+            total_deletadas = verificar_onus(shell, host, thread_id, enviadas)
+            conferir_delecoes(host, len(todas), total_deletadas)
+            adicionar_onus_deletadas(total_deletadas)
+            write_log(f"[INFO] Thread-{thread_id}: TOTAL DE {total_deletadas} ONUs DELETADAS NA OLT {host}")
+            write_log(f"[INFO] Thread-{thread_id}: Ritmo da OLT {host}: {shell.ritmo}")
+            with medir_save(host):
+                save_olt(shell, host, thread_id)
+    
+    if not todas:
+        print(f"[INFO] Thread-{thread_id}: Nenhuma ONU a ser deletada na OLT {host}.")
+
+# Remove as ONUs da lista (thread-safe). Retorna as ONUs com deleção enviada
+# (as respostas não são lidas; a confirmação é do verificar_onus)
+def deletar_onus(shell, host, thread_id, onu_delete):
+    enviadas = CandidatosONU("zte", host)
+    # Com --prazo: lotes da mais antiga para a mais nova enquanto couberem na janela
+    for lote in lotes_no_prazo(host, onu_delete):
+        for onu in lote:
+            try:
+                # ONUs seguidas do mesmo PON reaproveitam o contexto da interface
+                remove_onu = f'no onu {onu.onu}\n'
+                shell.executar(remove_onu, zte_interface(onu.chassi, onu.slot, onu.pon))
+                aguardar_comando(shell, remove_onu.strip(), "no onu", INTERVALO_DELECAO)
+
+                now = datetime.now()
+                date_time = now.strftime("%Y/%m/%d, %H:%M:%S")
+                log = f"[INFO] Thread-{thread_id}: CHASSI {onu.chassi} SLOT {onu.slot} PON {onu.pon} ONU {onu.onu} SERIAL {onu.serial} DELETADO EM {date_time}."
+                #write_log(log)
+                print(log)
+            
+                enviadas.anexar(onu)
+            
+            except Exception as e:
+                erro = f"Falha ao deletar ONU gpon_onu-{onu.chassi}/{onu.slot}/{onu.pon}:{onu.onu} na OLT {host}: {e}"
+                log = f"[ERRO] Thread-{thread_id}: {erro}"
+                write_log(log)
+                print(log)
+                registrar_erro(erro)
+    return enviadas
+
+# ONU ids do PON que ainda aparecem no show gpon onu state gpon_olt-c/s/p. None quando a
+# saída não traz a tabela (cabeçalho OnuIndex ou linha do PON) nem a mensagem de PON vazio
+def onus_presentes(saida, chassi_id, slot_id, pon_id):
+    tabela, _ = TabelaFixa.detectar(saida)
+    reconhecida = (tabela is not None and "OnuIndex" in tabela.nomes) or PON_VAZIO_ZTE in saida
+    presentes = set()
+    for onu_index, in registros(saida, COLUNA_INDICE, LAYOUT_INDICE):
+        chassi, slot, pon, onu_id = posicao_onu(onu_index)
+        if (int(chassi), int(slot), int(pon)) == (chassi_id, slot_id, pon_id):
+            presentes.add(int(onu_id))
+            reconhecida = True
+    return presentes if reconhecida else None
+
+# Relê uma vez cada PON afetado e confere as ONUs enviadas. Retorna quantas foram de fato
+# deletadas; falhas e PONs sem resposta vão para o log
+def verificar_onus(shell, host, thread_id, enviadas):
+    if not enviadas:
+        return 0
+    fase_atual("verificação")
+    deletadas, falhas, nao_verificadas = verificar_delecoes(
+        shell, enviadas, lambda chassi_id, slot_id, pon_id: f"show gpon onu state gpon_olt-{chassi_id}/{slot_id}/{pon_id}",
+        onus_presentes, ZTE_RAIZ, JANELA_PIPELINE, timeout_por_comando=10, nome="show gpon onu state gpon_olt")
+
+    for onu in falhas:
+        erro = f"OLT {host} - ONU gpon_onu-{onu.chassi}/{onu.slot}/{onu.pon}:{onu.onu} SERIAL {onu.serial} continua no PON após a deleção"
+        write_log(f"[ERRO] Thread-{thread_id}: {erro}")
+        registrar_erro(erro)
+    if nao_verificadas:
+        write_log(f"[WARN] Thread-{thread_id}: OLT {host} - {len(nao_verificadas)} ONUs sem verificação (PON sem resposta), fora do total")
+    write_log(f"[INFO] Thread-{thread_id}: OLT {host} - Verificação: {len(deletadas)} deletadas, {len(falhas)} falhas, {len(nao_verificadas)} não verificadas")
+    return len(deletadas)
+
+# Ritmo de uma sessão nova, nos limites do fabricante
+def ritmo_da_olt():
+    return Ritmo(INTERVALO_MINIMO, INTERVALO_MAXIMO, JANELA_MINIMA, JANELA_MAXIMA)
+
+# Prepara uma sessão nova (modo daemon): desativa a paginação uma única vez
+def preparar_sessao(shell):
+    shell = SessaoCLI(shell, ZTE, ritmo_da_olt())
+    shell.configurar_uma_vez('terminal length 0', ZTE_RAIZ)
+    read_output(shell)
+    return shell
+
+# Executa o modo escolhido numa sessão já aberta com a OLT
+def processar_sessao(shell, host, thread_id, modo="delete", manter_sessao=False, candidatos=None):
+    # A ZTE não faz logout no save_olt, então manter_sessao não altera o fluxo
+    # Sem leitura de modelo na ZTE: o histórico de tempos é por OLT
+    shell.equipamento = shell.equipamento or host
+    if modo == "census":
+        escrever_census(path_census, census_olt(shell, host, thread_id))
+    else:
+        # Processa deleção de ONUs
+        delete_onu(shell, host, thread_id, candidatos)
 
 # Função principal para processar uma OLT (executada em thread)
-def processar_olt(host, thread_id):
+def processar_olt(host, thread_id, modo="delete"):
     """
     Função principal que processa uma OLT específica
-    Executada em thread separada
+    Executada em thread separada. Retorna o ResultadoOLT (falhas registradas com registrar_erro marcam a OLT com erro)
     """
-    try:
-        print(f"[INFO] Thread-{thread_id}: Iniciando processamento da OLT {host}\n")
-        
-        # Estabelece conexão
-        conn, shell = ssh(host)
-        
+    resultado = ResultadoOLT(host, thread_id, modo)
+    with resultado.executando():
         try:
-            # Processa deleção de ONUs
-            delete_onu(shell, host, thread_id)
+            print(f"[INFO] Thread-{thread_id}: Iniciando processamento da OLT {host}\n")
             
-        except Exception as e:
-            write_log(f"[ERRO] Thread-{thread_id}: Falha ao processar OLT {host}: {e}")
-            return f"Thread-{thread_id}: Erro ao processar OLT {host}: {e}"
-        finally:
-            conn.close()
-            print(f"[INFO] Thread-{thread_id}: Conexão fechada com {host}\n")
+            candidatos = None
+            if modo == "delete" and BACKEND_DESCOBERTA == "snmp":
+                # Descoberta via SNMP: a sessão SSH só é aberta se houver ONUs para deletar
+                candidatos = get_onus_offlines_snmp(host, thread_id)
+                registrar_candidatos(host, candidatos)
+                if not candidatos:
+                    print(f"[INFO] Thread-{thread_id}: Nenhuma ONU a ser deletada na OLT {host}.")
+                    return resultado
             
-        return f"Thread-{thread_id}: OLT {host} processada com sucesso"
-        
-    except Exception as e:
-        write_log(f"[ERRO] Thread-{thread_id}: Falha ao conectar OLT {host}: {e}")
-        return f"Thread-{thread_id}: Erro ao conectar OLT {host}: {e}"
+            # Estabelece conexão
+            conn, shell = ssh(host)
+            shell = SessaoCLI(shell, ZTE, ritmo_da_olt())
+            
+            try:
+                processar_sessao(shell, host, thread_id, modo, candidatos=candidatos)
+                
+            except Exception as e:
+                erro = f"Falha ao processar OLT {host}: {e}"
+                write_log(f"[ERRO] Thread-{thread_id}: {erro}")
+                registrar_erro(erro)
+            finally:
+                conn.close()
+                print(f"[INFO] Thread-{thread_id}: Conexão fechada com {host}\n")
+            
+        except Exception as e:
+            erro = f"Falha ao conectar OLT {host}: {e}"
+            write_log(f"[ERRO] Thread-{thread_id}: {erro}")
+            registrar_erro(erro)
+    return resultado
+
+# Lê a lista de OLTs do CSV
+def carregar_equipamentos():
+    hosts, descartados = carregar_hosts("olts_zte.csv")
+    for linha, valor, motivo in descartados:
+        write_log(f"[WARN] olts_zte.csv linha {linha}: host {valor!r} ignorado ({motivo})")
+    return hosts
 
 # -------------------------
 # Script principal com multithreading
 # -------------------------
 if __name__ == "__main__":
+    args = criar_parser("zte").parse_args()
+    if args.modo == "merge":
+        # Soma os resultados das partições (--shard) nos totais de uma execução única
+        arquivos = args.resultados or arquivos_resultados(path_resultados)
+        olts_mescladas, totais, avisos = mesclar_resultados(arquivos, "zte")
+        for aviso in avisos:
+            write_log(f"[WARN] {aviso}")
+        write_log(f"[INFO] Merge de {len(arquivos)} arquivo(s): {len(olts_mescladas)} OLTs, {totais[ERRO]} com erro, {totais[ADIADA]} adiada(s)")
+        resultados = [ResultadoOLT.de_dict(registro) for registro in olts_mescladas.values()]
+        for resultado in resultados:
+            somar_resultado(resultado)
+        salvar_total_no_log()
+        inicio_merge = min((resultado.inicio for resultado in resultados if resultado.inicio), default=datetime.now())
+        escrever_relatorio(path_relatorio, "zte", "merge", resultados, inicio_merge)
+        write_log(f"[INFO] Relatório das partições gravado em {path_relatorio}")
+        sys.exit(0)
+    
+    BACKEND_DESCOBERTA = args.backend
+    DELECAO_POR_PON = args.por_pon
+    if args.intervalo_minimo is not None:
+        INTERVALO_MINIMO = args.intervalo_minimo
+    if args.janela_maxima is not None:
+        JANELA_MAXIMA = args.janela_maxima
+    POLITICA = carregar_politica(path_politica, qtd_dias)
+    if os.path.exists(path_politica):
+        write_log(f"[INFO] Política de retenção ({path_politica}): {POLITICA}")
+    ativar_gravacao(args.gravar)
+    if args.metricas:
+        iniciar_servidor(args.metricas, "zte")
+        registrar_contador("delete_onu_onus_deletadas_total", "ONUs deletadas na execução (inclui as OLTs em andamento)", DELETADAS)
+        registrar_contador("delete_onu_onus_consultadas_total", "ONUs offline consultadas na execução (inclui as OLTs em andamento)", CONSULTADAS)
+        registrar_contador("delete_onu_onus_nunca_online_encontradas_total", "ONUs nunca online encontradas na execução (deletadas ou mantidas pela política)", SEM_QUEDA)
+    
+    if args.modo == "daemon":
+        executar_daemon(sys.modules[__name__], args)
+        sys.exit(0)
+    
+    if args.modo == "queue":
+        executar_coordenador(sys.modules[__name__], args)
+        sys.exit(0)
+    
+    if args.modo == "worker":
+        executar_worker(sys.modules[__name__], args)
+        sys.exit(0)
+    
     inicio_global = registrar_inicio_rotina()
+    carregar_tempos(path_tempos)
+    if args.profile:
+        write_log(f"[INFO] Perfil de execução em {ativar_perfil(path_02)}")
+    if args.ociosidade:
+        ativar_ociosidade()
     
-    # Lê lista de equipamentos do CSV se necessário
+    # Lê lista de equipamentos do CSV
     try:
         
         # Lista de OLTs
         #equipamentos = ['']  # lab
         #equipamentos = ['10.145.233.30']  # Adicione todas as OLTs que precisa processar
 
-        df_hosts = pd.read_csv("olts_zte.csv")
-        # Descomente a linha abaixo se quiser usar o CSV
-        equipamentos = df_hosts["host"].tolist()
-    except:
-        write_log("[WARN] Não foi possível carregar CSV, usando lista hardcoded")
+        equipamentos = carregar_equipamentos()
+    except (OSError, ValueError) as e:
+        # Sem inventário não há lista de OLTs para processar
+        write_log(f"[ERRO] Não foi possível carregar olts_zte.csv: {e}")
+        sys.exit(1)
+    
+    if args.agendado:
+        devidos = hosts_devidos(carregar_agenda(path_agenda), equipamentos, dias_varredura=args.varredura_completa)
+        write_log(f"[INFO] Modo agendado: {len(devidos)} de {len(equipamentos)} OLTs devidas")
+        equipamentos = devidos
+    
+    if args.shard:
+        indice_particao, total_particoes = args.shard
+        particao = hosts_da_particao(equipamentos, indice_particao, total_particoes)
+        write_log(f"[INFO] Partição {indice_particao}/{total_particoes}: {len(particao)} de {len(equipamentos)} OLTs")
+        equipamentos = particao
     
+    if args.prazo and args.modo == "delete":
+        # Janela de manutenção: OLTs com as ONUs offline há mais tempo começam primeiro
+        write_log(f"[INFO] Prazo da janela: {definir_prazo(args.prazo).strftime('%Y/%m/%d %H:%M')}")
+        carregar_custos(path_custos)
+        equipamentos = ordenar_por_atraso(equipamentos)
+    
+    registrar_olts(equipamentos)
     print(f"[INFO] Processando {len(equipamentos)} OLTs com máximo de {MAX_THREADS} threads\n")
     
     # Executa processamento multithread
@@ -428,21 +741,24 @@ if __name__ == "__main__":
         
         for i, host in enumerate(equipamentos):
             # Adiciona delay entre submissions para evitar sobrecarga
-            if i > 0:
+            if i > 0 and segundos_restantes() > 0:
                 time.sleep(THREAD_DELAY)
             
-            future = executor.submit(processar_olt, host, i+1)
+            future = executor.submit(perfilar_olt, acompanhar_olt(contabilizar_olt(no_prazo(processar_olt))), host, i+1, args.modo)
             future_to_host[future] = host
         
-        # Coleta resultados conforme completam
+        # Coleta resultados conforme completam (só esta thread soma os contadores)
         for future in as_completed(future_to_host):
             host = future_to_host[future]
             try:
                 resultado = future.result()
-                resultados.append(resultado)
-                print(f"[SUCCESS] {resultado}")
+                print(resultado.linha_log())
             except Exception as e:
                 write_log(f"[ERRO] Falha na thread para OLT {host}: {e}")
+                resultado = ResultadoOLT(host, modo=args.modo)
+                resultado.falhar(f"Falha na thread: {e}")
+            resultados.append(resultado)
+            somar_resultado(resultado)
     
     # Limpa arquivos temporários
     try:
@@ -458,7 +774,38 @@ if __name__ == "__main__":
         write_log(f"[INFO] {resultado}")
         
     # Salva totais finais no log
-    salvar_total_no_log()
+    if args.modo == "census":
+        write_log(f"[INFO] Censo salvo em {path_census}")
+    else:
+        salvar_total_no_log()
+        
+        # Atualiza a agenda com a próxima data de deleção de cada OLT visitada
+        total_agendadas = atualizar_agenda(path_agenda)
+        write_log(f"[INFO] Agenda atualizada para {total_agendadas} OLT(s) em {path_agenda}")
+    
+    totais_execucao = escrever_relatorio(path_relatorio, "zte", args.modo, resultados, inicio_global)
+    write_log(f"[INFO] Relatório gravado em {path_relatorio}: {totais_execucao[SUCESSO]} OLT(s) com sucesso, "
+              f"{totais_execucao[ERRO]} com erro, {totais_execucao[ADIADA]} adiada(s)")
+    
+    if args.shard:
+        path_particao = caminho_resultados(path_resultados, *args.shard)
+        total_resultados = escrever_resultados(path_particao, "zte", *args.shard, resultados)
+        write_log(f"[INFO] Resultado de {total_resultados} OLT(s) da partição gravado em {path_particao}")
+    
+    # Guarda os tempos de resposta observados para as próximas execuções
+    salvar_tempos(path_tempos)
+    
+    if args.prazo and args.modo == "delete":
+        salvar_custos(path_custos)
+        for linha in resumo_prazo():
+            write_log(linha)
+    
+    if args.profile:
+        write_log(f"[INFO] Perfil da execução gravado em {escrever_perfil_agregado()}")
+    
+    if args.ociosidade:
+        for linha in escrever_ociosidade(path_ociosidade, "zte"):
+            write_log(linha)
     
     # Final global
     rotina_finalizada(inicio_global, len(equipamentos))
\ No newline at end of file
@@ -0,0 +1,333 @@
+import json
+import os
+import signal
+import socket
+import sqlite3
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from datetime import date, datetime
+from itertools import count
+from queue import Empty, SimpleQueue
+from threading import Event, Lock, Thread
+
+from agendador import visitas, agenda_lock, registrar_visita, carregar_agenda, hosts_devidos, atualizar_agenda
+from tempos_resposta import carregar_tempos, salvar_tempos
+from metricas import acompanhar_olt
+from ociosidade import contabilizar_olt
+from resultado_olt import ResultadoOLT, escrever_relatorio, DELETADAS, SUCESSO, ERRO
+
+# Fila de trabalho (modos queue e worker): o coordenador grava um job por OLT em uma fila
+# SQLite local (fila_<fabricante>.db) e os workers, processos independentes, puxam os jobs
+# com lease: cada OLT fica com um worker por até LEASE segundos, renovados por heartbeat
+# enquanto a OLT é processada. Um worker travado numa OLT lenta não segura as demais, novos
+# workers podem entrar no meio da execução e, se um worker morrer, o lease vence e a OLT
+# volta para a fila (até MAX_TENTATIVAS). A fila sobrevive ao coordenador: rodar o modo queue
+# de novo retoma os jobs não terminados
+
+PENDENTE = "pendente"
+EM_ANDAMENTO = "em_andamento"
+CONCLUIDA = "concluida"
+FALHA = "falha"
+ESTADOS = (PENDENTE, EM_ANDAMENTO, CONCLUIDA, FALHA)
+
+LEASE = 600             # segundos que um worker segura a OLT sem heartbeat
+MAX_TENTATIVAS = 3      # leases vencidos (worker morto/travado) antes de desistir da OLT
+ESPERA_FILA = 5         # segundos entre consultas à fila sem jobs livres
+INTERVALO_COORDENADOR = 15  # segundos entre verificações do coordenador
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    host TEXT PRIMARY KEY,
+    ordem INTEGER NOT NULL,
+    modo TEXT NOT NULL,
+    estado TEXT NOT NULL,
+    worker TEXT,
+    lease_ate REAL,
+    tentativas INTEGER NOT NULL DEFAULT 0,
+    resultado TEXT
+)
+"""
+
+class FilaOLTs:
+    """
+    Fila durável de jobs por OLT. Cada operação abre a sua conexão (threads e processos)
+    e as que mudam estado rodam em transação BEGIN IMMEDIATE
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with self._transacao() as conexao:
+            conexao.execute(_SCHEMA)
+
+    @contextmanager
+    def _transacao(self):
+        conexao = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        try:
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.execute("BEGIN IMMEDIATE")
+            try:
+                yield conexao
+            except BaseException:
+                conexao.execute("ROLLBACK")
+                raise
+            conexao.execute("COMMIT")
+        finally:
+            conexao.close()
+
+    def enfileirar(self, hosts, modo="delete"):
+        """
+        Começa uma fila nova com um job por OLT (descarta a execução anterior)
+        """
+        with self._transacao() as conexao:
+            conexao.execute("DELETE FROM jobs")
+            conexao.executemany("INSERT INTO jobs (host, ordem, modo, estado) VALUES (?, ?, ?, ?)",
+                                [(host, ordem, modo, PENDENTE) for ordem, host in enumerate(hosts)])
+
+    def _devolver_expirados(self, conexao, agora):
+        # Lease vencido: worker morto ou travado. A OLT volta para a fila ou, depois de
+        # MAX_TENTATIVAS, é dada como falha
+        conexao.execute(
+            "UPDATE jobs SET estado = ?, resultado = ? WHERE estado = ? AND lease_ate < ? AND tentativas >= ?",
+            (FALHA, json.dumps({"status": ERRO, "mensagem": f"lease vencido {MAX_TENTATIVAS} vezes"}),
+             EM_ANDAMENTO, agora, MAX_TENTATIVAS))
+        return conexao.execute(
+            "UPDATE jobs SET estado = ?, worker = NULL, lease_ate = NULL WHERE estado = ? AND lease_ate < ?",
+            (PENDENTE, EM_ANDAMENTO, agora)).rowcount
+
+    def devolver_expirados(self):
+        with self._transacao() as conexao:
+            return self._devolver_expirados(conexao, time.time())
+
+    def pegar(self, worker, lease=LEASE):
+        """
+        Reserva o próximo job livre para o worker. Retorna (host, modo) ou None
+        """
+        agora = time.time()
+        with self._transacao() as conexao:
+            self._devolver_expirados(conexao, agora)
+            linha = conexao.execute("SELECT host, modo FROM jobs WHERE estado = ? ORDER BY ordem LIMIT 1",
+                                    (PENDENTE,)).fetchone()
+            if linha is None:
+                return None
+            conexao.execute("UPDATE jobs SET estado = ?, worker = ?, lease_ate = ?, tentativas = tentativas + 1 "
+                            "WHERE host = ?", (EM_ANDAMENTO, worker, agora + lease, linha[0]))
+            return linha
+
+    def renovar(self, worker, hosts, lease=LEASE):
+        """
+        Heartbeat: estende o lease das OLTs que ainda são do worker. Retorna as que não são mais
+        """
+        perdidos = []
+        with self._transacao() as conexao:
+            for host in hosts:
+                alterados = conexao.execute(
+                    "UPDATE jobs SET lease_ate = ? WHERE host = ? AND worker = ? AND estado = ?",
+                    (time.time() + lease, host, worker, EM_ANDAMENTO)).rowcount
+                if not alterados:
+                    perdidos.append(host)
+        return perdidos
+
+    def concluir(self, host, worker, resultado):
+        """
+        Ack do worker com o resultado da OLT. Retorna False se o lease já não era dele
+        """
+        estado = CONCLUIDA if resultado.get("status") == SUCESSO else FALHA
+        with self._transacao() as conexao:
+            return conexao.execute(
+                "UPDATE jobs SET estado = ?, resultado = ?, lease_ate = NULL WHERE host = ? AND worker = ? AND estado = ?",
+                (estado, json.dumps(resultado, ensure_ascii=False), host, worker, EM_ANDAMENTO)).rowcount == 1
+
+    def contagem(self):
+        """
+        Jobs por estado e workers com OLT em andamento
+        """
+        with self._transacao() as conexao:
+            contagem = dict.fromkeys(ESTADOS, 0)
+            contagem.update(conexao.execute("SELECT estado, COUNT(*) FROM jobs GROUP BY estado").fetchall())
+            workers = conexao.execute("SELECT COUNT(DISTINCT worker) FROM jobs WHERE estado = ?",
+                                      (EM_ANDAMENTO,)).fetchone()[0]
+        return contagem, workers
+
+    def terminada(self):
+        contagem, _ = self.contagem()
+        return contagem[PENDENTE] == 0 and contagem[EM_ANDAMENTO] == 0
+
+    def resultados(self):
+        """
+        [(host, estado, resultado)] na ordem da fila
+        """
+        with self._transacao() as conexao:
+            linhas = conexao.execute("SELECT host, estado, resultado FROM jobs ORDER BY ordem").fetchall()
+        return [(host, estado, json.loads(resultado) if resultado else {}) for host, estado, resultado in linhas]
+
+def _texto_contagem(contagem, workers):
+    return (f"{contagem[PENDENTE]} pendentes, {contagem[EM_ANDAMENTO]} em andamento, "
+            f"{contagem[CONCLUIDA]} concluídas, {contagem[FALHA]} com falha ({workers} worker(s) ativos)")
+
+def executar_coordenador(modulo, args):
+    """
+    Modo queue: enfileira as OLTs do inventário (ou retoma a fila anterior não terminada),
+    opcionalmente sobe workers locais, acompanha a fila devolvendo leases vencidos e,
+    com todas as OLTs terminadas, grava os totais no log, o relatório e atualiza a agenda
+    """
+    path = args.fila or modulo.path_fila
+    fila = FilaOLTs(path)
+    contagem, _ = fila.contagem()
+    if contagem[PENDENTE] or contagem[EM_ANDAMENTO]:
+        modulo.write_log(f"[INFO] Retomando a fila {path}: {_texto_contagem(*fila.contagem())}")
+    else:
+        try:
+            equipamentos = modulo.carregar_equipamentos()
+        except (OSError, ValueError) as e:
+            modulo.write_log(f"[ERRO] Não foi possível carregar o inventário: {e}")
+            sys.exit(1)
+        if args.agendado:
+            equipamentos = hosts_devidos(carregar_agenda(modulo.path_agenda), equipamentos,
+                                         dias_varredura=args.varredura_completa)
+        fila.enfileirar(equipamentos)
+        modulo.write_log(f"[INFO] Fila {path}: {len(equipamentos)} OLTs enfileiradas")
+
+    inicio_global = modulo.registrar_inicio_rotina()
+    comando = [sys.executable, os.path.abspath(modulo.__file__), "worker", "--fila", path, "--lease", str(args.lease)]
+    if args.threads:
+        comando += ["--threads", str(args.threads)]
+    if args.intervalo_minimo is not None:
+        comando += ["--intervalo-minimo", str(args.intervalo_minimo)]
+    if args.janela_maxima is not None:
+        comando += ["--janela-maxima", str(args.janela_maxima)]
+    workers = [subprocess.Popen(comando) for _ in range(args.workers)]
+    if workers:
+        modulo.write_log(f"[INFO] {len(workers)} worker(s) locais iniciados")
+
+    ultimo_texto = None
+    while True:
+        devolvidos = fila.devolver_expirados()
+        if devolvidos:
+            modulo.write_log(f"[WARN] {devolvidos} OLT(s) com lease vencido devolvidas à fila")
+        contagem, ativos = fila.contagem()
+        texto = _texto_contagem(contagem, ativos)
+        if texto != ultimo_texto:
+            modulo.write_log(f"[INFO] Fila: {texto}")
+            ultimo_texto = texto
+        if not contagem[PENDENTE] and not contagem[EM_ANDAMENTO]:
+            break
+        time.sleep(INTERVALO_COORDENADOR)
+
+    for worker in workers:
+        worker.wait()
+
+    resultados = []
+    for host, _, registro in fila.resultados():
+        resultado = ResultadoOLT.de_dict(dict(registro, host=host))
+        modulo.write_log(resultado.linha_log())
+        resultados.append(resultado)
+        modulo.somar_resultado(resultado)
+        if registro.get("visitada"):
+            proxima = registro.get("proxima")
+            registrar_visita(host, date.fromisoformat(proxima) if proxima else None)
+    modulo.salvar_total_no_log()
+    escrever_relatorio(modulo.path_relatorio, args.fabricante, "queue", resultados, inicio_global)
+    modulo.write_log(f"[INFO] Relatório da fila gravado em {modulo.path_relatorio}")
+    total_agendadas = atualizar_agenda(modulo.path_agenda)
+    modulo.write_log(f"[INFO] Agenda atualizada para {total_agendadas} OLT(s) em {modulo.path_agenda}")
+    modulo.rotina_finalizada(inicio_global, len(resultados))
+
+def executar_worker(modulo, args):
+    """
+    Modo worker: threads que puxam OLTs da fila até ela terminar, com heartbeat dos leases.
+    SIGTERM/SIGINT: não pega novas OLTs e termina as em andamento
+    """
+    path = args.fila or modulo.path_fila
+    fila = FilaOLTs(path)
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    threads = args.threads or modulo.MAX_THREADS
+    parar = Event()
+    heartbeat_parar = Event()
+    em_andamento = set()
+    andamento_lock = Lock()
+    ids = count(1)
+    # Resultados das threads, somados pela thread principal (contadores do /metrics do worker)
+    concluidos = SimpleQueue()
+
+    def sinal_parada(signum, frame):
+        modulo.write_log(f"[INFO] Worker {worker}: sinal {signum} recebido, terminando as OLTs em andamento...")
+        parar.set()
+
+    signal.signal(signal.SIGTERM, sinal_parada)
+    signal.signal(signal.SIGINT, sinal_parada)
+
+    carregar_tempos(modulo.path_tempos)
+    processar = acompanhar_olt(contabilizar_olt(modulo.processar_olt))
+    temporarios = [getattr(modulo, nome) for nome in ("path_01_base", "path_04_base") if hasattr(modulo, nome)]
+
+    def heartbeat():
+        while not heartbeat_parar.wait(args.lease / 3):
+            with andamento_lock:
+                hosts = list(em_andamento)
+            for host in fila.renovar(worker, hosts, args.lease):
+                modulo.write_log(f"[WARN] Worker {worker}: lease da OLT {host} perdido")
+
+    def puxar(atraso):
+        # Conexões escalonadas como no modo delete (THREAD_DELAY entre threads)
+        if parar.wait(atraso):
+            return
+        while not parar.is_set():
+            job = fila.pegar(worker, args.lease)
+            if job is None:
+                if fila.terminada():
+                    return
+                parar.wait(ESPERA_FILA)
+                continue
+
+            host, modo = job
+            # Id único entre workers: os arquivos temporários por thread ficam no mesmo diretório
+            thread_id = f"{os.getpid()}.{next(ids)}"
+            with andamento_lock:
+                em_andamento.add(host)
+            try:
+                resultado = processar(host, thread_id, modo)
+            except Exception as e:
+                resultado = ResultadoOLT(host, thread_id, modo)
+                resultado.falhar(str(e))
+            finally:
+                with andamento_lock:
+                    em_andamento.discard(host)
+                for base in temporarios:
+                    if os.path.exists(f"{base}_{thread_id}.txt"):
+                        os.remove(f"{base}_{thread_id}.txt")
+
+            concluidos.put(resultado)
+            registro = resultado.como_dict()
+            with agenda_lock:
+                registro["visitada"] = host in visitas
+                proxima = visitas.get(host)
+            registro["proxima"] = proxima.isoformat() if proxima else None
+            if not fila.concluir(host, worker, registro):
+                modulo.write_log(f"[WARN] Worker {worker}: lease da OLT {host} vencido antes do fim; resultado "
+                                 f"não registrado na fila ({registro[DELETADAS]} ONUs deletadas)")
+
+    modulo.write_log(f"[INFO] Worker {worker} iniciado em {datetime.now().strftime('%Y/%m/%d %H:%M:%S')} "
+                     f"com {threads} threads ({path})")
+    Thread(target=heartbeat, name="heartbeat", daemon=True).start()
+    trabalhadores = [Thread(target=puxar, args=(i * modulo.THREAD_DELAY,), name=f"worker-{i + 1}")
+                     for i in range(threads)]
+    for trabalhador in trabalhadores:
+        trabalhador.start()
+    def somar_concluidos():
+        while True:
+            try:
+                modulo.somar_resultado(concluidos.get_nowait())
+            except Empty:
+                return
+
+    # join com timeout: o sinal é tratado na thread principal
+    for trabalhador in trabalhadores:
+        while trabalhador.is_alive():
+            trabalhador.join(1)
+            somar_concluidos()
+    somar_concluidos()
+    heartbeat_parar.set()
+    salvar_tempos(modulo.path_tempos)
+    modulo.write_log(f"[INFO] Worker {worker} finalizado. Fila: {_texto_contagem(*fila.contagem())}")
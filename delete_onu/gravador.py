@@ -0,0 +1,241 @@
+import json
+import mmap
+import os
+import re
+import struct
+import time
+import zlib
+from datetime import datetime
+from threading import Lock
+
+# Gravação opcional do canal SSH (tudo o que foi enviado e recebido) em uma transcrição
+# comprimida por OLT, e reprodução da transcrição sem rede e sem esperas.
+#
+# Formato (descomprimido): cabeçalho MAGICO + uma linha JSON com os metadados, seguido de
+# registros "<tipo:1><timestamp:f64><tamanho:u32><dados>", tipo b'E' (enviado) ou b'R' (recebido).
+# O arquivo .gz é um fluxo gzip com flush a cada registro: continua legível mesmo se a
+# sessão cair sem fechar a transcrição
+
+MAGICO = b"ONUTRX1\n"
+CABECALHO_REGISTRO = struct.Struct("<cdI")
+ENVIADO = b"E"
+RECEBIDO = b"R"
+BLOCO_DESCOMPRESSAO = 1024 * 1024
+
+# Diretório das transcrições (definido por --gravar); None desativa a gravação
+DIRETORIO_GRAVACAO = None
+
+def ativar_gravacao(diretorio):
+    """
+    Ativa (diretório) ou desativa (None) a gravação das sessões abertas a partir de agora
+    """
+    global DIRETORIO_GRAVACAO
+    DIRETORIO_GRAVACAO = diretorio
+
+def caminho_transcricao(diretorio, host):
+    nome_host = re.sub(r'[^\w.\-]', '_', host)
+    return os.path.join(diretorio, f"{nome_host}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.trx.gz")
+
+class ShellGravado:
+    """
+    Envolve o canal do paramiko gravando cada send/recv na transcrição. Mantém a interface
+    do canal (send, recv, recv_ready, close, ...)
+    """
+
+    def __init__(self, shell, path, host):
+        self.shell = shell
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._arquivo = open(path, "wb")
+        self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # 31: formato gzip
+        self._lock = Lock()
+        metadados = {"host": host, "inicio": datetime.now().isoformat(timespec="seconds")}
+        self._escrever(MAGICO + json.dumps(metadados).encode("utf-8") + b"\n")
+
+    def __getattr__(self, nome):
+        return getattr(self.shell, nome)
+
+    def _escrever(self, dados):
+        with self._lock:
+            if self._compressor is None:
+                return
+            self._arquivo.write(self._compressor.compress(dados) + self._compressor.flush(zlib.Z_SYNC_FLUSH))
+            self._arquivo.flush()
+
+    def _registrar(self, tipo, dados):
+        self._escrever(CABECALHO_REGISTRO.pack(tipo, time.time(), len(dados)) + dados)
+
+    def send(self, data):
+        enviado = self.shell.send(data)
+        dados = data.encode("utf-8") if isinstance(data, str) else bytes(data)
+        self._registrar(ENVIADO, dados[:enviado] if isinstance(enviado, int) else dados)
+        return enviado
+
+    def recv_ready(self):
+        return self.shell.recv_ready()
+
+    def recv(self, nbytes):
+        data = self.shell.recv(nbytes)
+        if data:
+            self._registrar(RECEBIDO, data)
+        return data
+
+    def fechar_transcricao(self):
+        with self._lock:
+            if self._compressor is None:
+                return
+            self._arquivo.write(self._compressor.flush(zlib.Z_FINISH))
+            self._arquivo.close()
+            self._compressor = None
+
+    def close(self):
+        try:
+            return self.shell.close()
+        finally:
+            self.fechar_transcricao()
+
+def gravar_se_ativo(shell, host):
+    """
+    Com a gravação ativa, devolve o canal envolvido pelo gravador; senão o próprio canal
+    """
+    if not DIRETORIO_GRAVACAO:
+        return shell
+    return ShellGravado(shell, caminho_transcricao(DIRETORIO_GRAVACAO, host), host)
+
+def descomprimir(path_gz, path_saida=None):
+    """
+    Descomprime a transcrição em blocos (aceita arquivo truncado) para um arquivo ao lado.
+    Reaproveita o arquivo já descomprimido se for mais novo que o .gz
+    """
+    path_saida = path_saida or re.sub(r'\.gz$', '', path_gz)
+    if os.path.exists(path_saida) and os.path.getmtime(path_saida) >= os.path.getmtime(path_gz):
+        return path_saida
+
+    descompressor = zlib.decompressobj(31)
+    path_tmp = f"{path_saida}.tmp"
+    with open(path_gz, "rb") as entrada, open(path_tmp, "wb") as saida:
+        while True:
+            bloco = entrada.read(BLOCO_DESCOMPRESSAO)
+            if not bloco:
+                break
+            saida.write(descompressor.decompress(bloco))
+        saida.write(descompressor.flush())
+    os.replace(path_tmp, path_saida)
+    return path_saida
+
+class Transcricao:
+    """
+    Transcrição aberta por mmap (somente leitura). Os registros são lidos direto do mapa,
+    sem copiar a transcrição inteira para a memória
+    """
+
+    def __init__(self, path):
+        if path.endswith(".gz"):
+            path = descomprimir(path)
+        self.path = path
+        self._arquivo = open(path, "rb")
+        self.mapa = mmap.mmap(self._arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.mapa[:len(MAGICO)] != MAGICO:
+            self.fechar()
+            raise ValueError(f"{path} não é uma transcrição de sessão")
+        fim_metadados = self.mapa.find(b"\n", len(MAGICO))
+        self.metadados = json.loads(self.mapa[len(MAGICO):fim_metadados])
+        self.inicio_registros = fim_metadados + 1
+
+    def registros(self):
+        """
+        Gera (tipo, timestamp, dados) lendo cada registro do mapa. Um registro incompleto
+        no fim (gravação interrompida) é ignorado
+        """
+        mapa = self.mapa
+        posicao = self.inicio_registros
+        tamanho_total = len(mapa)
+        while posicao + CABECALHO_REGISTRO.size <= tamanho_total:
+            tipo, timestamp, tamanho = CABECALHO_REGISTRO.unpack_from(mapa, posicao)
+            posicao += CABECALHO_REGISTRO.size
+            if posicao + tamanho > tamanho_total:
+                break
+            yield tipo, timestamp, mapa[posicao:posicao + tamanho]
+            posicao += tamanho
+
+    def fechar(self):
+        self.mapa.close()
+        self._arquivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+class ShellReproducao:
+    """
+    Canal falso que devolve as respostas gravadas. Cada send avança até o próximo envio
+    gravado e libera as respostas recebidas depois dele (até o envio seguinte).
+    Envios diferentes do gravado são contados em divergencias
+    """
+
+    def __init__(self, transcricao):
+        self._registros = transcricao.registros()
+        self._proximo = next(self._registros, None)
+        self._pendente = bytearray()
+        self.closed = False
+        self.enviados = 0
+        self.divergencias = []
+        self._liberar_respostas()
+
+    def _liberar_respostas(self):
+        while self._proximo is not None and self._proximo[0] == RECEBIDO:
+            self._pendente += self._proximo[2]
+            self._proximo = next(self._registros, None)
+
+    def send(self, data):
+        dados = data.encode("utf-8") if isinstance(data, str) else bytes(data)
+        self.enviados += 1
+        if self._proximo is None:
+            self.divergencias.append((self.enviados, dados, b""))
+        else:
+            gravado = self._proximo[2]
+            if gravado != dados:
+                self.divergencias.append((self.enviados, dados, gravado))
+            self._proximo = next(self._registros, None)
+            self._liberar_respostas()
+        return len(dados)
+
+    def recv_ready(self):
+        return bool(self._pendente)
+
+    def recv(self, nbytes):
+        dados = bytes(self._pendente[:nbytes])
+        del self._pendente[:nbytes]
+        return dados
+
+    def settimeout(self, timeout):
+        pass
+
+    def close(self):
+        self.closed = True
+
+class RelogioVirtual:
+    """
+    Substitui time.sleep/time.monotonic/time.time durante a reprodução: sleep só avança o
+    relógio, então esperas e timeouts dos scripts passam sem tempo real
+    """
+
+    def __init__(self):
+        self.avanco = 0.0
+        self._originais = None
+
+    def sleep(self, segundos):
+        self.avanco += max(0.0, segundos)
+
+    def __enter__(self):
+        self._originais = (time.sleep, time.monotonic, time.time)
+        _, monotonic, tempo = self._originais
+        time.sleep = self.sleep
+        time.monotonic = lambda: monotonic() + self.avanco
+        time.time = lambda: tempo() + self.avanco
+        return self
+
+    def __exit__(self, *exc):
+        time.sleep, time.monotonic, time.time = self._originais
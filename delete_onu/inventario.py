@@ -0,0 +1,58 @@
+import csv
+import ipaddress
+import re
+
+# Inventário de OLTs (olts_<fabricante>.csv) lido com o módulo csv, linha a linha: a coluna
+# host é obrigatória, as demais são ignoradas. Hosts repetidos entram uma única vez (na
+# ordem da primeira ocorrência). Valores com cara de IPv4 precisam ser um IP válido; os
+# demais, um nome de host válido (ex: DEV do U2000 no backend TL1)
+
+COLUNA_HOST = "host"
+
+_PARECE_IPV4 = re.compile(r'^[\d.]+$')
+_NOME_HOST = re.compile(r'^(?=.{1,253}$)[A-Za-z0-9_](?:[A-Za-z0-9_\-]{0,62})(?:\.[A-Za-z0-9_](?:[A-Za-z0-9_\-]{0,62}))*$')
+
+def validar_host(valor):
+    """
+    Retorna None se o host é válido, senão o motivo
+    """
+    if not valor:
+        return "vazio"
+    if _PARECE_IPV4.match(valor) or ":" in valor:
+        try:
+            ipaddress.ip_address(valor)
+        except ValueError:
+            return "IP inválido"
+        return None
+    if not _NOME_HOST.match(valor):
+        return "nome de host inválido"
+    return None
+
+def carregar_hosts(path):
+    """
+    Lê os hosts do inventário. Retorna (hosts, descartados), com descartados como
+    [(linha do arquivo, valor, motivo)] para o log
+    """
+    hosts = []
+    vistos = set()
+    descartados = []
+    with open(path, "r", encoding="utf-8-sig", newline="") as arquivo:
+        leitor = csv.reader(arquivo)
+        cabecalho = [coluna.strip().lower() for coluna in next(leitor, [])]
+        if COLUNA_HOST not in cabecalho:
+            raise ValueError(f"{path}: coluna '{COLUNA_HOST}' não encontrada no cabeçalho")
+        indice = cabecalho.index(COLUNA_HOST)
+
+        for linha in leitor:
+            if not any(campo.strip() for campo in linha):
+                continue
+            valor = linha[indice].strip() if indice < len(linha) else ""
+            motivo = validar_host(valor)
+            if motivo is None and valor in vistos:
+                motivo = "repetido"
+            if motivo:
+                descartados.append((leitor.line_num, valor, motivo))
+                continue
+            vistos.add(valor)
+            hosts.append(valor)
+    return hosts, descartados
@@ -0,0 +1,214 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from statistics import median
+
+from agendador import manter_devida
+from ociosidade import LockMedido
+from resultado_olt import ResultadoOLT
+
+# Modo com prazo (--prazo HH:MM): a rotina precisa terminar dentro da janela de manutenção.
+# O custo de cada OLT vem das execuções anteriores (segundos fixos por OLT: conexão e
+# descoberta; segundos por ONU deletada; segundos do save). As OLTs começam pela ONU
+# offline há mais tempo, as ONUs de cada OLT são deletadas da mais antiga para a mais nova
+# em lotes, e nenhuma OLT ou lote começa se o tempo restante não cobrir o lote e o save.
+# O save de toda OLT em que algo foi deletado acontece sempre (o lote é que é cortado)
+
+MARGEM = 1.2            # folga sobre as estimativas
+LOTE_PRAZO = 20         # ONUs por lote entre verificações do prazo
+SUAVIZACAO = 0.3        # peso da execução atual na média dos custos
+CUSTO_PADRAO = {"fixo": 300.0, "onu": 1.5, "save": 60.0}  # segundos, OLT sem histórico
+
+# Fim da janela (None = sem prazo)
+PRAZO = None
+
+# host -> {"fixo", "onu", "save": segundos, "mais_antiga": "YYYY-MM-DD" | None}
+custos = {}
+# Execução atual: host -> segundos gastos em deleção/save; OLTs e ONUs adiadas pelo prazo
+gastos = {}
+olts_adiadas = []
+onus_adiadas = {}
+
+# Lock para os custos (thread-safe)
+janela_lock = LockMedido()
+
+def definir_prazo(horario, agora=None):
+    """
+    Fim da janela a partir de "HH:MM": hoje, ou amanhã se o horário já passou
+    (ex: rotina iniciada 23:50 com prazo 05:00)
+    """
+    agora = agora or datetime.now()
+    hora, minuto = (int(parte) for parte in horario.split(":"))
+    prazo = agora.replace(hour=hora, minute=minuto, second=0, microsecond=0)
+    if prazo <= agora:
+        prazo += timedelta(days=1)
+
+    global PRAZO
+    PRAZO = prazo
+    return prazo
+
+def segundos_restantes():
+    if PRAZO is None:
+        return float("inf")
+    return (PRAZO - datetime.now()).total_seconds()
+
+def carregar_custos(path):
+    if not os.path.exists(path):
+        return
+    try:
+        with open(path, "r", encoding="utf-8") as arquivo:
+            salvo = json.load(arquivo)
+    except (OSError, ValueError):
+        return
+    with janela_lock:
+        for host, custo in salvo.items():
+            custos.setdefault(host, {}).update(custo)
+
+def salvar_custos(path):
+    """
+    Grava os custos de forma atômica (arquivo temporário + rename)
+    """
+    with janela_lock:
+        copia = {host: dict(custo) for host, custo in custos.items()}
+    path_tmp = f"{path}.tmp"
+    with open(path_tmp, "w", encoding="utf-8") as arquivo:
+        json.dump(copia, arquivo, indent=2, sort_keys=True)
+    os.replace(path_tmp, path)
+
+def _registrar(host, item, segundos):
+    # Média móvel exponencial (chamado com janela_lock)
+    custo = custos.setdefault(host, {})
+    anterior = custo.get(item)
+    custo[item] = round(segundos if anterior is None else (1 - SUAVIZACAO) * anterior + SUAVIZACAO * segundos, 3)
+
+def estimativa(host, item):
+    """
+    Custo do host; sem histórico, a mediana das OLTs conhecidas ou o padrão
+    """
+    with janela_lock:
+        custo = custos.get(host, {}).get(item)
+        if custo is not None:
+            return custo
+        conhecidos = [c[item] for c in custos.values() if c.get(item) is not None]
+    return median(conhecidos) if conhecidos else CUSTO_PADRAO[item]
+
+def _cabe(segundos):
+    return segundos_restantes() >= segundos * MARGEM
+
+def registrar_candidatos(host, candidatos):
+    """
+    Guarda a data de queda da ONU offline há mais tempo (prioridade da OLT na próxima execução)
+    """
+    dias = [onu.dias_offline for onu in candidatos or () if onu.dias_offline is not None]
+    mais_antiga = (date.today() - timedelta(days=max(dias))).isoformat() if dias else None
+    with janela_lock:
+        custos.setdefault(host, {})["mais_antiga"] = mais_antiga
+
+def ordenar_por_atraso(hosts):
+    """
+    Ordena as OLTs pela ONU offline há mais tempo (da mais antiga para a mais nova).
+    OLTs sem histórico vêm primeiro; OLTs sem candidatas conhecidas, por último
+    """
+    with janela_lock:
+        atraso = {host: custos[host].get("mais_antiga", "") if host in custos else "" for host in hosts}
+    return sorted(hosts, key=lambda host: (atraso[host] is None, atraso[host] or ""))
+
+def no_prazo(funcao):
+    """
+    Envolve processar_olt: a OLT só começa se o tempo restante cobre conexão, descoberta,
+    um lote mínimo e o save. Ao fim, o custo fixo observado (total menos deleção e save)
+    alimenta o histórico
+    """
+    def executar(host, *args, **kwargs):
+        if PRAZO is None:
+            return funcao(host, *args, **kwargs)
+
+        if not _cabe(estimativa(host, "fixo") + estimativa(host, "onu") + estimativa(host, "save")):
+            with janela_lock:
+                olts_adiadas.append(host)
+            resultado = ResultadoOLT(host, *args, **kwargs)
+            resultado.adiar(f"OLT {host} adiada: fora do prazo ({PRAZO.strftime('%H:%M')})")
+            return resultado
+
+        inicio = time.monotonic()
+        resultado = funcao(host, *args, **kwargs)
+        total = time.monotonic() - inicio
+        with janela_lock:
+            if resultado.sucesso:
+                _registrar(host, "fixo", max(0.0, total - gastos.pop(host, 0.0)))
+            else:
+                gastos.pop(host, None)
+        return resultado
+    return executar
+
+def lotes_no_prazo(host, candidatos, tamanho=LOTE_PRAZO):
+    """
+    Sem prazo, um único lote com os candidatos na ordem da descoberta. Com prazo, lotes
+    da ONU offline há mais tempo para a mais nova; cada lote só começa se o tempo restante
+    cobre o lote e o save (o lote encolhe até caber, ou a deleção para ali)
+    """
+    if PRAZO is None:
+        yield candidatos
+        return
+
+    ordenadas = sorted(candidatos, key=lambda onu: -1 if onu.dias_offline is None else onu.dias_offline, reverse=True)
+    por_onu = estimativa(host, "onu")
+    save = estimativa(host, "save")
+    inicio = 0
+    while inicio < len(ordenadas):
+        cabem = int((segundos_restantes() / MARGEM - save) // por_onu) if por_onu > 0 else tamanho
+        if cabem < 1:
+            with janela_lock:
+                onus_adiadas[host] = onus_adiadas.get(host, 0) + len(ordenadas) - inicio
+            # ONUs já vencidas ficaram para trás: a OLT continua devida na próxima execução
+            manter_devida(host)
+            return
+        lote = ordenadas[inicio:inicio + min(tamanho, cabem)]
+        comeco = time.monotonic()
+        yield lote
+        decorrido = time.monotonic() - comeco
+        with janela_lock:
+            _registrar(host, "onu", decorrido / len(lote))
+            gastos[host] = gastos.get(host, 0.0) + decorrido
+        inicio += len(lote)
+
+def prazo_esgotado(host):
+    """
+    True se a deleção da OLT já foi cortada pelo prazo (encerra a deleção em fluxo)
+    """
+    with janela_lock:
+        return host in onus_adiadas
+
+@contextmanager
+def medir_save(host):
+    """
+    Mede o save da OLT (histórico usado para reservar o tempo do save antes de cada lote)
+    """
+    if PRAZO is None:
+        yield
+        return
+    comeco = time.monotonic()
+    try:
+        yield
+    finally:
+        decorrido = time.monotonic() - comeco
+        with janela_lock:
+            _registrar(host, "save", decorrido)
+            gastos[host] = gastos.get(host, 0.0) + decorrido
+
+def resumo_prazo():
+    """
+    Linhas para o log: OLTs não iniciadas e ONUs deixadas para a próxima janela
+    """
+    if PRAZO is None:
+        return []
+    with janela_lock:
+        adiadas = list(olts_adiadas)
+        onus = dict(onus_adiadas)
+    linhas = [f"[INFO] Prazo {PRAZO.strftime('%Y/%m/%d %H:%M')}: {len(adiadas)} OLT(s) não iniciadas, "
+              f"{sum(onus.values())} ONU(s) vencidas adiadas em {len(onus)} OLT(s)"]
+    linhas += [f"[INFO] OLT {host} adiada pelo prazo" for host in adiadas]
+    linhas += [f"[INFO] OLT {host}: {quantidade} ONU(s) adiadas pelo prazo (save executado)" for host, quantidade in sorted(onus.items())]
+    return linhas
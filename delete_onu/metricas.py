@@ -0,0 +1,234 @@
+import threading
+import time
+from collections import deque
+from threading import Lock
+
+from resultado_olt import ERRO, CONTADORES, resultado_atual
+
+# Métricas ao vivo da rotina em formato Prometheus (opcional, --metricas PORTA): estado de
+# cada OLT, fase atual das OLTs em andamento, concorrência, totais de ONUs e latência
+# recente dos comandos. O servidor roda em uma thread daemon do próprio processo;
+# http.server só é importado quando o endpoint é ligado
+
+JANELA_LATENCIA = 200          # amostras recentes por comando
+QUANTIS = (50, 95, 99)
+PENDENTE = "pendente"
+EM_ANDAMENTO = "em_andamento"
+CONCLUIDA = "concluida"
+FALHA = "falha"
+ESTADOS = (PENDENTE, EM_ANDAMENTO, CONCLUIDA, FALHA)
+
+# host -> {"estado", "fase", "desde"}
+olts = {}
+# comando -> deque de segundos (janela móvel) e [quantidade, soma] acumulados
+latencias = {}
+totais_latencia = {}
+# comando -> quantidade enviada (ex: consultas por ONU no pipeline)
+consultas = {}
+# nome da métrica -> (ajuda, campo do ResultadoOLT), ex: deletadas. O valor soma as OLTs já
+# somadas pelo script (somar_olt) e as em andamento, para o total subir durante cada OLT
+contadores = {}
+totais_olt = dict.fromkeys(CONTADORES, 0)
+# host -> ResultadoOLT da OLT em andamento (registrado na primeira fase_atual)
+andamento = {}
+fabricante_atual = ""
+servidor = None
+
+# Lock para as métricas (thread-safe)
+metricas_lock = Lock()
+
+# OLT processada pela thread atual (para fase_atual sem passar o host adiante)
+_thread_atual = threading.local()
+
+def iniciar_servidor(porta, fabricante):
+    """
+    Sobe o endpoint /metrics na porta informada (thread daemon). Retorna o servidor
+    """
+    from http.server import ThreadingHTTPServer
+
+    global servidor, fabricante_atual
+    fabricante_atual = fabricante
+    servidor = ThreadingHTTPServer(("", porta), _manipulador())
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, name="metricas", daemon=True).start()
+    return servidor
+
+def registrar_contador(nome, ajuda, campo):
+    """
+    Expõe um contador do ResultadoOLT (DELETADAS, CONSULTADAS, SEM_QUEDA, ...) somado nas OLTs
+    """
+    with metricas_lock:
+        contadores[nome] = (ajuda, campo)
+
+def somar_olt(resultado):
+    """
+    Chamada pelo somar_resultado do script: a OLT sai de andamento e entra nos totais no mesmo
+    passo (o contador não recua entre o fim da thread e a soma na thread principal)
+    """
+    if servidor is None:
+        return
+    with metricas_lock:
+        if andamento.get(resultado.host) is resultado:
+            del andamento[resultado.host]
+        for campo in CONTADORES:
+            totais_olt[campo] += getattr(resultado, campo)
+
+def registrar_olts(hosts):
+    with metricas_lock:
+        for host in hosts:
+            olts.setdefault(host, {"estado": PENDENTE, "fase": "", "desde": time.time()})
+
+def fase_atual(fase, host=None):
+    """
+    Marca a fase da OLT (descoberta, deleção, save, ...). Sem host, vale a OLT da thread atual.
+    A fase também fica no ResultadoOLT da thread (com ou sem servidor de métricas)
+    """
+    resultado = resultado_atual()
+    if resultado is not None and host is None:
+        resultado.fases.append(fase)
+    host = host or getattr(_thread_atual, "host", None)
+    if servidor is None or host is None:
+        return
+    with metricas_lock:
+        olt = olts.setdefault(host, {"estado": EM_ANDAMENTO, "fase": "", "desde": time.time()})
+        olt["fase"] = fase
+        if resultado is not None and resultado.host == host:
+            andamento[host] = resultado
+
+def acompanhar_olt(funcao):
+    """
+    Envolve processar_olt: marca a OLT em andamento e, ao fim, concluída ou com falha
+    (exceção ou ResultadoOLT com erro)
+    """
+    def executar(host, *args, **kwargs):
+        if servidor is None:
+            return funcao(host, *args, **kwargs)
+
+        with metricas_lock:
+            olts[host] = {"estado": EM_ANDAMENTO, "fase": "conectando", "desde": time.time()}
+        _thread_atual.host = host
+        estado = FALHA
+        retornou = False
+        try:
+            resultado = funcao(host, *args, **kwargs)
+            retornou = True
+            if resultado.status != ERRO:
+                estado = CONCLUIDA
+            return resultado
+        finally:
+            _thread_atual.host = None
+            with metricas_lock:
+                olts[host] = {"estado": estado, "fase": "", "desde": time.time()}
+                # Exceção: o ResultadoOLT não chega ao somar_resultado, o parcial vai para os totais
+                parcial = andamento.pop(host, None) if not retornou else None
+                if parcial is not None:
+                    for campo in CONTADORES:
+                        totais_olt[campo] += getattr(parcial, campo)
+    return executar
+
+def observar_latencia(comando, segundos):
+    if servidor is None:
+        return
+    with metricas_lock:
+        janela = latencias.get(comando)
+        if janela is None:
+            janela = latencias[comando] = deque(maxlen=JANELA_LATENCIA)
+            totais_latencia[comando] = [0, 0.0]
+        janela.append(segundos)
+        totais_latencia[comando][0] += 1
+        totais_latencia[comando][1] += segundos
+
+def contar_consultas(comando, quantidade=1):
+    if servidor is None:
+        return
+    with metricas_lock:
+        consultas[comando] = consultas.get(comando, 0) + quantidade
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _rotulos(**rotulos):
+    return "{" + ",".join(f'{nome}="{_escapar(valor)}"' for nome, valor in rotulos.items()) + "}"
+
+def _quantil(ordenadas, quantil):
+    indice = min(len(ordenadas) - 1, max(0, int(round(quantil / 100 * len(ordenadas))) - 1))
+    return ordenadas[indice]
+
+def exportar():
+    """
+    Texto no formato de exposição do Prometheus
+    """
+    fabricante = fabricante_atual
+    agora = time.time()
+    with metricas_lock:
+        copia_olts = {host: dict(olt) for host, olt in olts.items()}
+        copia_latencias = {comando: list(janela) for comando, janela in latencias.items()}
+        copia_totais = {comando: list(total) for comando, total in totais_latencia.items()}
+        copia_consultas = dict(consultas)
+        copia_contadores = dict(contadores)
+        copia_totais_olt = dict(totais_olt)
+        copia_andamento = list(andamento.values())
+
+    linhas = ["# HELP delete_onu_olts OLTs da rotina por estado",
+              "# TYPE delete_onu_olts gauge"]
+    por_estado = {estado: 0 for estado in ESTADOS}
+    for olt in copia_olts.values():
+        por_estado[olt["estado"]] += 1
+    for estado, quantidade in por_estado.items():
+        linhas.append(f"delete_onu_olts{_rotulos(fabricante=fabricante, estado=estado)} {quantidade}")
+
+    linhas += ["# HELP delete_onu_concorrencia OLTs em processamento agora",
+               "# TYPE delete_onu_concorrencia gauge",
+               f"delete_onu_concorrencia{_rotulos(fabricante=fabricante)} {por_estado[EM_ANDAMENTO]}"]
+
+    linhas += ["# HELP delete_onu_olt_fase_segundos Tempo desde o início do processamento, por OLT em andamento e fase atual",
+               "# TYPE delete_onu_olt_fase_segundos gauge"]
+    for host, olt in sorted(copia_olts.items()):
+        if olt["estado"] == EM_ANDAMENTO:
+            linhas.append(f"delete_onu_olt_fase_segundos{_rotulos(fabricante=fabricante, host=host, fase=olt['fase'])} "
+                          f"{agora - olt['desde']:.1f}")
+
+    for nome, (ajuda, campo) in sorted(copia_contadores.items()):
+        valor = copia_totais_olt[campo] + sum(getattr(resultado, campo) for resultado in copia_andamento)
+        linhas += [f"# HELP {nome} {ajuda}", f"# TYPE {nome} counter",
+                   f"{nome}{_rotulos(fabricante=fabricante)} {valor}"]
+
+    linhas += ["# HELP delete_onu_consultas_total Comandos de consulta enviados (pipeline), por comando",
+               "# TYPE delete_onu_consultas_total counter"]
+    for comando, quantidade in sorted(copia_consultas.items()):
+        linhas.append(f"delete_onu_consultas_total{_rotulos(fabricante=fabricante, comando=comando)} {quantidade}")
+
+    linhas += [f"# HELP delete_onu_latencia_comando_segundos Tempo de resposta por comando (quantis das últimas {JANELA_LATENCIA} amostras)",
+               "# TYPE delete_onu_latencia_comando_segundos summary"]
+    for comando, amostras in sorted(copia_latencias.items()):
+        amostras.sort()
+        for quantil in QUANTIS:
+            linhas.append(f"delete_onu_latencia_comando_segundos"
+                          f"{_rotulos(fabricante=fabricante, comando=comando, quantile=quantil / 100)} "
+                          f"{_quantil(amostras, quantil):.3f}")
+        quantidade, soma = copia_totais[comando]
+        linhas.append(f"delete_onu_latencia_comando_segundos_sum{_rotulos(fabricante=fabricante, comando=comando)} {soma:.3f}")
+        linhas.append(f"delete_onu_latencia_comando_segundos_count{_rotulos(fabricante=fabricante, comando=comando)} {quantidade}")
+
+    return "\n".join(linhas) + "\n"
+
+def _manipulador():
+    from http.server import BaseHTTPRequestHandler
+
+    class _Manipulador(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            corpo = exportar().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def log_message(self, formato, *args):
+            # Sem log de acesso no console (já ocupado pelas threads das OLTs)
+            pass
+
+    return _Manipulador
@@ -0,0 +1,218 @@
+import time
+import threading
+from contextlib import contextmanager
+from threading import Lock
+
+# Contabilidade do tempo de parede de cada OLT (opcional, --ociosidade). Todo segundo da
+# thread que processa a OLT vai para uma categoria:
+#   sono           time.sleep com dados já disponíveis no canal (ou sem canal): espera evitável
+#   espera_dados   time.sleep enquanto o canal ainda não tem nada para ler
+#   recepcao       send/recv/recv_ready no canal SSH
+#   log            write_log (print + escrita no arquivo), sem a espera pelo lock
+#   espera_lock    espera para adquirir os locks compartilhados (log, tempos, agenda, census)
+#   processamento  o restante: parsing das telas e demais trabalho em Python
+# Os sleeps são medidos em passos de PASSO segundos consultando recv_ready, então a
+# fronteira entre espera_dados e sono tem essa resolução. Dados disponíveis não são
+# necessariamente a resposta esperada (ex: eco do save), logo o sono é um limite superior
+# do que dá para economizar. Nos backends SNMP/TL1 a espera nos sockets conta como processamento
+
+PASSO = 0.05
+SONO = "sono"
+ESPERA_DADOS = "espera_dados"
+RECEPCAO = "recepcao"
+LOG = "log"
+ESPERA_LOCK = "espera_lock"
+PROCESSAMENTO = "processamento"
+CATEGORIAS = (SONO, ESPERA_DADOS, RECEPCAO, LOG, ESPERA_LOCK, PROCESSAMENTO)
+
+ATIVO = False
+
+# [(host, segundos de parede, {categoria: segundos})]
+medidas = []
+
+# Lock para as medidas (thread-safe)
+ociosidade_lock = Lock()
+
+# Conta da OLT processada pela thread atual, pilha de medições aninhadas e último canal usado
+_thread_atual = threading.local()
+_sleep_original = time.sleep
+
+def ativar_ociosidade():
+    """
+    Liga a contabilidade: time.sleep passa a ser medido nas threads das OLTs
+    """
+    global ATIVO
+    ATIVO = True
+    time.sleep = _sono_medido
+
+def _conta():
+    return getattr(_thread_atual, "conta", None)
+
+def _somar(conta, categoria, segundos):
+    conta[categoria] += segundos
+    pilha = _thread_atual.pilha
+    if pilha:
+        pilha[-1] += segundos
+
+@contextmanager
+def medir(categoria):
+    """
+    Atribui o tempo do bloco à categoria (descontando medições aninhadas nele)
+    """
+    conta = _conta()
+    if conta is None:
+        yield
+        return
+    pilha = _thread_atual.pilha
+    pilha.append(0.0)
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        decorrido = time.perf_counter() - inicio
+        conta[categoria] += decorrido - pilha.pop()
+        if pilha:
+            pilha[-1] += decorrido
+
+def _sono_medido(segundos):
+    conta = _conta()
+    if conta is None:
+        return _sleep_original(segundos)
+
+    canal = getattr(_thread_atual, "canal", None)
+    fim = time.perf_counter() + max(0.0, segundos)
+    while True:
+        inicio = time.perf_counter()
+        restante = fim - inicio
+        if restante <= 0:
+            return
+        if canal is None or canal.recv_ready():
+            # Já há o que ler: o resto do sleep é espera evitável
+            _sleep_original(restante)
+            _somar(conta, SONO, time.perf_counter() - inicio)
+            return
+        _sleep_original(min(restante, PASSO))
+        _somar(conta, ESPERA_DADOS, time.perf_counter() - inicio)
+
+class CanalMedido:
+    """
+    Envolve o canal SSH medindo send/recv/recv_ready como recepção e guardando o canal
+    da thread (consultado pelos sleeps). Mantém a interface do canal
+    """
+
+    def __init__(self, shell):
+        self.shell = shell
+
+    def __getattr__(self, nome):
+        return getattr(self.shell, nome)
+
+    def send(self, data):
+        _thread_atual.canal = self.shell
+        with medir(RECEPCAO):
+            return self.shell.send(data)
+
+    def recv_ready(self):
+        _thread_atual.canal = self.shell
+        with medir(RECEPCAO):
+            return self.shell.recv_ready()
+
+    def recv(self, nbytes):
+        _thread_atual.canal = self.shell
+        with medir(RECEPCAO):
+            return self.shell.recv(nbytes)
+
+def contabilizar_se_ativo(shell):
+    """
+    Com a contabilidade ativa, devolve o canal envolvido pela medição; senão o próprio canal
+    """
+    return CanalMedido(shell) if ATIVO else shell
+
+class LockMedido:
+    """
+    Lock em que o tempo bloqueado esperando outra thread conta como espera_lock
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+
+    def acquire(self, blocking=True, timeout=-1):
+        if self._lock.acquire(blocking=False):
+            return True
+        if not blocking:
+            return False
+        with medir(ESPERA_LOCK):
+            return self._lock.acquire(True, timeout)
+
+    def release(self):
+        self._lock.release()
+
+    def locked(self):
+        return self._lock.locked()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+def contabilizar_olt(funcao):
+    """
+    Envolve processar_olt: mede o tempo de parede da OLT e sua divisão por categoria
+    """
+    def executar(host, *args, **kwargs):
+        if not ATIVO:
+            return funcao(host, *args, **kwargs)
+
+        _thread_atual.conta = dict.fromkeys(CATEGORIAS, 0.0)
+        _thread_atual.pilha = []
+        _thread_atual.canal = None
+        inicio = time.perf_counter()
+        try:
+            return funcao(host, *args, **kwargs)
+        finally:
+            parede = time.perf_counter() - inicio
+            conta = _thread_atual.conta
+            _thread_atual.conta = None
+            _thread_atual.canal = None
+            conta[PROCESSAMENTO] = max(0.0, parede - sum(conta.values()))
+            with ociosidade_lock:
+                medidas.append((host, parede, conta))
+    return executar
+
+def _duracao(segundos):
+    horas, resto = divmod(int(round(segundos)), 3600)
+    return f"{horas}h{resto // 60:02d}m{resto % 60:02d}s"
+
+def _percentual(parte, total):
+    return f"{100 * parte / total:.0f}%" if total else "0%"
+
+def escrever_ociosidade(path, fabricante):
+    """
+    Grava o CSV por OLT (com a linha total do fabricante) e devolve as linhas do resumo para o log
+    """
+    with ociosidade_lock:
+        copia = sorted(medidas, key=lambda medida: -medida[1])
+
+    total_parede = sum(parede for _, parede, _ in copia)
+    totais = {categoria: sum(conta[categoria] for _, _, conta in copia) for categoria in CATEGORIAS}
+
+    with open(path, "w", encoding="utf-8") as arquivo:
+        arquivo.write(";".join(["host", "fabricante", "parede_s"] + [f"{c}_s" for c in CATEGORIAS] + ["evitavel_pct"]) + "\n")
+        for host, parede, conta in copia + [("TOTAL", total_parede, totais)]:
+            valores = [f"{conta[categoria]:.2f}" for categoria in CATEGORIAS]
+            arquivo.write(";".join([host, fabricante, f"{parede:.2f}"] + valores +
+                                   [f"{100 * conta[SONO] / parede:.1f}" if parede else "0.0"]) + "\n")
+
+    if not copia:
+        return [f"[INFO] Ociosidade ({fabricante}): nenhuma OLT medida"]
+
+    divisao = ", ".join(f"{categoria} {_percentual(totais[categoria], total_parede)}" for categoria in CATEGORIAS)
+    host_maior, parede_maior, conta_maior = copia[0]
+    return [
+        f"[INFO] Ociosidade ({fabricante}): {len(copia)} OLTs, {_duracao(total_parede)} de trabalho das threads: {divisao}",
+        f"[INFO] Espera evitável (sono com dados já disponíveis): {_duracao(totais[SONO])} "
+        f"({_percentual(totais[SONO], total_parede)} do trabalho); espera por dados {_duracao(totais[ESPERA_DADOS])}",
+        f"[INFO] OLT mais longa {host_maior}: {_duracao(parede_maior)}, dos quais {_duracao(conta_maior[SONO])} evitáveis",
+        f"[INFO] Ociosidade por OLT salva em {path}",
+    ]
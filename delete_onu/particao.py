@@ -0,0 +1,112 @@
+import argparse
+import glob
+import hashlib
+import json
+
+from resultado_olt import SUCESSO, ERRO, ADIADA, DELETADAS, SEM_QUEDA
+
+# Execução particionada (--shard i/N): a frota é dividida entre N processos/servidores, cada
+# um com a sua fatia do olts_<fabricante>.csv. A OLT vai para a partição de maior peso
+# hash(partição, host) (rendezvous hashing): a divisão é a mesma em qualquer máquina, não
+# depende da ordem do CSV e, ao mudar N, só as OLTs da partição criada/removida mudam de
+# lugar. Cada partição grava o ResultadoOLT de cada OLT (JSON lines) e o modo merge soma as
+# partições nos mesmos totais de salvar_total_no_log
+# resultado_<fabricante>_<i>de<N>.jsonl, uma linha por OLT:
+#   {"fabricante": "zte", "particao": "1/4", "host": "10.0.0.1", "status": "sucesso",
+#    "deletadas": 12, "sem_queda": 3, "segundos": 81.2, "mensagem": "Thread-1: OLT ...", ...}
+
+def ler_particao(texto):
+    """
+    Converte "i/N" em (i, N), com 1 <= i <= N (type do argparse)
+    """
+    try:
+        indice, total = (int(parte) for parte in texto.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"partição deve ser i/N (ex: 1/4): {texto!r}")
+    if total < 1 or not 1 <= indice <= total:
+        raise argparse.ArgumentTypeError(f"partição fora do intervalo 1..N: {texto!r}")
+    return indice, total
+
+def _peso(host, particao):
+    resumo_hash = hashlib.blake2b(f"{particao}/{host}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(resumo_hash, "big")
+
+def particao_do_host(host, total):
+    """
+    Partição (1..total) responsável pela OLT
+    """
+    return max(range(1, total + 1), key=lambda particao: _peso(host, particao))
+
+def hosts_da_particao(hosts, indice, total):
+    """
+    OLTs da partição indice/total, na ordem do inventário
+    """
+    return [host for host in hosts if particao_do_host(host, total) == indice]
+
+def caminho_resultados(base, indice, total):
+    return f"{base}_{indice}de{total}.jsonl"
+
+def arquivos_resultados(base):
+    """
+    Arquivos de resultado das partições no diretório atual (padrão do modo merge)
+    """
+    return sorted(glob.glob(f"{base}_*de*.jsonl"))
+
+def escrever_resultados(path, fabricante, indice, total, resultados):
+    """
+    Grava o ResultadoOLT de cada OLT da partição (uma linha JSON por OLT). Retorna a quantidade
+    """
+    with open(path, "w", encoding="utf-8") as arquivo:
+        for resultado in sorted(resultados, key=lambda resultado: resultado.host):
+            registro = {"fabricante": fabricante, "particao": f"{indice}/{total}"}
+            registro.update(resultado.como_dict())
+            arquivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+    return len(resultados)
+
+def mesclar_resultados(paths, fabricante):
+    """
+    Junta os resultados das partições. Retorna (resultados por OLT, totais, avisos), com os
+    avisos para o log: partições faltando ou repetidas, OLTs em mais de uma partição,
+    arquivos de outro fabricante, OLTs com erro e OLTs adiadas (prazo da janela)
+    """
+    olts = {}
+    avisos = [] if paths else ["Nenhum arquivo de resultado de partição"]
+    particoes = {}
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as arquivo:
+            for numero, linha in enumerate(arquivo, 1):
+                if not linha.strip():
+                    continue
+                registro = json.loads(linha)
+                if registro.get("fabricante") != fabricante:
+                    avisos.append(f"{path}:{numero}: resultado de {registro.get('fabricante')}, ignorado")
+                    continue
+                particoes.setdefault(registro["particao"], set()).add(path)
+                anterior = olts.get(registro["host"])
+                if anterior is not None:
+                    avisos.append(f"OLT {registro['host']} nas partições {anterior['particao']} e "
+                                  f"{registro['particao']}; vale a de {path}")
+                olts[registro["host"]] = registro
+
+    for particao, arquivos in sorted(particoes.items()):
+        if len(arquivos) > 1:
+            avisos.append(f"Partição {particao} em mais de um arquivo: {', '.join(sorted(arquivos))}")
+    totais_particoes = {int(particao.split("/")[1]) for particao in particoes}
+    if len(totais_particoes) > 1:
+        avisos.append(f"Arquivos de divisões diferentes da frota (N = {', '.join(map(str, sorted(totais_particoes)))})")
+    for total in totais_particoes:
+        faltando = [f"{indice}/{total}" for indice in range(1, total + 1) if f"{indice}/{total}" not in particoes]
+        if faltando:
+            avisos.append(f"Partições sem resultado: {', '.join(faltando)}")
+
+    totais = {DELETADAS: 0, SEM_QUEDA: 0, ERRO: 0, ADIADA: 0}
+    for host, registro in sorted(olts.items()):
+        totais[DELETADAS] += registro[DELETADAS]
+        totais[SEM_QUEDA] += registro[SEM_QUEDA]
+        if registro["status"] == ADIADA:
+            totais[ADIADA] += 1
+            avisos.append(f"OLT {host} adiada na partição {registro['particao']}: {registro['mensagem']}")
+        elif registro["status"] != SUCESSO:
+            totais[ERRO] += 1
+            avisos.append(f"OLT {host} com erro na partição {registro['particao']}: {registro['mensagem']}")
+    return olts, totais, avisos
@@ -0,0 +1,224 @@
+import os
+import re
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from threading import Lock
+
+# Perfil de execução opcional (--profile). Cada OLT roda em uma thread do pool, então um
+# cProfile ligado dentro da thread mede só aquela OLT (tempo de parede: inclui esperas de
+# rede e sleeps). O tempo de CPU da thread vem de time.thread_time; CPU bem menor que a
+# parede indica espera (rede, sleep ou GIL). Memória: tracemalloc com 1 quadro por alocação.
+# cProfile e pstats só são importados com o perfil ativo.
+# A partir do Python 3.12 o cProfile usa o sys.monitoring, que é do processo: só um perfil
+# pode estar ligado por vez e ele registra as chamadas de todas as threads. Nessas versões não
+# há divisão por OLT: um único cProfile cobre a execução inteira (total.pstats/total.folded) e
+# cada OLT fica só com parede, CPU e memória (resumo.csv, <host>_memoria.txt)
+
+FRAMES_TRACEMALLOC = 1
+PROFUNDIDADE_MAXIMA = 64   # níveis nas pilhas colapsadas
+PESO_MINIMO = 1e-5         # segundos; ramos menores são descartados nas pilhas colapsadas
+TOP_MEMORIA = 30           # linhas nos relatórios de memória
+
+# Diretório do perfil da execução atual (None = perfil desativado)
+DIRETORIO_PERFIL = None
+
+# Agregado de todas as OLTs
+perfil_total = None
+pilhas_total = Counter()
+resumo_olts = []
+memoria_inicial = None
+
+# Lock para o agregado (thread-safe)
+perfil_lock = Lock()
+
+# Python 3.12+: um cProfile para o processo todo, ligado em ativar_perfil
+PERFIL_DO_PROCESSO = sys.version_info >= (3, 12)
+perfil_processo = None
+
+def ativar_perfil(path_log):
+    """
+    Liga o perfil da execução. Os arquivos ficam em <log>_perfil_<data>/ ao lado do log.
+    Retorna o diretório
+    """
+    global DIRETORIO_PERFIL, memoria_inicial, perfil_processo
+    base = os.path.splitext(path_log)[0]
+    DIRETORIO_PERFIL = f"{base}_perfil_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    os.makedirs(DIRETORIO_PERFIL, exist_ok=True)
+    tracemalloc.start(FRAMES_TRACEMALLOC)
+    memoria_inicial = _fotografar_memoria()
+    if PERFIL_DO_PROCESSO:
+        perfil_processo = _ligar_cprofile()
+    return DIRETORIO_PERFIL
+
+def _fotografar_memoria():
+    import cProfile
+    import pstats
+
+    # Snapshot sem as alocações do próprio perfil (cProfile/pstats/tracemalloc) e de imports
+    return tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, cProfile.__file__),
+        tracemalloc.Filter(False, pstats.__file__),
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    ])
+
+def _nome_arquivo(host):
+    return re.sub(r'[^\w.\-]', '_', str(host))
+
+def _rotulo(funcao):
+    arquivo, linha, nome = funcao
+    if arquivo == '~':
+        return nome  # função embutida, ex: <method 'recv' of ...>
+    return f"{nome} ({os.path.basename(arquivo)}:{linha})"
+
+def pilhas_colapsadas(estatisticas):
+    """
+    Converte as estatísticas do cProfile (arestas chamador -> chamado) em pilhas colapsadas
+    ("a;b;c peso"). O cProfile não guarda pilhas completas: o tempo de cada função é
+    dividido entre os caminhos na proporção do tempo de cada aresta (aproximação usual)
+    """
+    filhos = {}
+    for funcao, (_, _, _, _, chamadores) in estatisticas.items():
+        for chamador, (_, _, _, tempo_aresta) in chamadores.items():
+            filhos.setdefault(chamador, []).append((funcao, tempo_aresta))
+
+    pilhas = Counter()
+
+    def visitar(funcao, pilha, fracao):
+        _, _, tempo_proprio, tempo_acumulado, _ = estatisticas[funcao]
+        pilha = pilha + (_rotulo(funcao),)
+        if tempo_proprio * fracao > 0:
+            pilhas[';'.join(pilha)] += tempo_proprio * fracao
+        if len(pilha) >= PROFUNDIDADE_MAXIMA:
+            return
+        for filho, tempo_aresta in filhos.get(funcao, ()):
+            acumulado_filho = estatisticas[filho][3]
+            peso = tempo_aresta * fracao
+            if peso < PESO_MINIMO or acumulado_filho <= 0 or _rotulo(filho) in pilha:
+                continue
+            visitar(filho, pilha, min(1.0, peso / acumulado_filho))
+
+    for funcao, (_, _, _, _, chamadores) in estatisticas.items():
+        # Raízes: funções sem chamador (o disable do próprio cProfile fica de fora)
+        if not chamadores and '_lsprof.Profiler' not in funcao[2]:
+            visitar(funcao, (), 1.0)
+    return pilhas
+
+def _escrever_pilhas(path, pilhas):
+    # Peso em microssegundos (inteiro), como esperado pelo flamegraph.pl / speedscope
+    with open(path, "w", encoding="utf-8") as arquivo:
+        for pilha, segundos in sorted(pilhas.items()):
+            microssegundos = int(segundos * 1_000_000)
+            if microssegundos:
+                arquivo.write(f"{pilha} {microssegundos}\n")
+
+def _escrever_memoria(path, depois, antes, titulo):
+    with open(path, "w", encoding="utf-8") as arquivo:
+        atual, pico = tracemalloc.get_traced_memory()
+        arquivo.write(f"{titulo}\n")
+        arquivo.write(f"Memória rastreada do processo: atual {atual / 1024 / 1024:.1f} MiB, pico {pico / 1024 / 1024:.1f} MiB\n\n")
+        for diferenca in depois.compare_to(antes, "lineno")[:TOP_MEMORIA]:
+            arquivo.write(f"{diferenca}\n")
+
+def perfilar_olt(funcao, host, *args, **kwargs):
+    """
+    Executa funcao(host, ...) (ex: processar_olt) com perfil, se ativo, e grava
+    <host>_memoria.txt e, até o Python 3.11 (cProfile por thread), <host>.pstats e <host>.folded
+    """
+    if DIRETORIO_PERFIL is None:
+        return funcao(host, *args, **kwargs)
+
+    memoria_antes = _fotografar_memoria()
+    perfil = None if PERFIL_DO_PROCESSO else _ligar_cprofile()
+    inicio_parede = time.perf_counter()
+    inicio_cpu = time.thread_time()
+    try:
+        return funcao(host, *args, **kwargs)
+    finally:
+        if perfil is not None:
+            perfil.disable()
+        parede = time.perf_counter() - inicio_parede
+        cpu = time.thread_time() - inicio_cpu
+        _registrar_olt(host, perfil, parede, cpu, memoria_antes)
+
+def _ligar_cprofile():
+    """
+    cProfile ligado (na thread atual até o 3.11, no processo a partir do 3.12), ou None se
+    outro perfilador já está ativo (ex: depurador ou cobertura): segue sem cProfile em vez de falhar
+    """
+    import cProfile
+
+    perfil = cProfile.Profile()
+    try:
+        perfil.enable()
+    except ValueError:
+        return None
+    return perfil
+
+def _registrar_olt(host, perfil, parede, cpu, memoria_antes):
+    import pstats
+
+    base = os.path.join(DIRETORIO_PERFIL, _nome_arquivo(host))
+    estatisticas = None
+    pilhas = Counter()
+    if perfil is not None:
+        estatisticas = pstats.Stats(perfil)
+        estatisticas.dump_stats(f"{base}.pstats")
+        pilhas = pilhas_colapsadas(estatisticas.stats)
+        _escrever_pilhas(f"{base}.folded", pilhas)
+
+    # O tracemalloc é do processo: a diferença inclui as OLTs processadas em paralelo
+    memoria_depois = _fotografar_memoria()
+    _escrever_memoria(f"{base}_memoria.txt", memoria_depois, memoria_antes,
+                      f"OLT {host}: alocações durante o processamento (inclui threads simultâneas)")
+    alocado = sum(estatistica.size_diff for estatistica in memoria_depois.compare_to(memoria_antes, "filename"))
+
+    global perfil_total
+    with perfil_lock:
+        if estatisticas is not None and perfil_total is None:
+            perfil_total = estatisticas
+        elif estatisticas is not None:
+            perfil_total.add(estatisticas)
+        pilhas_total.update(pilhas)
+        resumo_olts.append((host, parede, cpu, alocado, perfil is not None))
+
+def escrever_perfil_agregado():
+    """
+    Grava o agregado da execução: total.pstats, total.folded, total.txt (funções mais
+    custosas), resumo.csv (parede/CPU/memória por OLT) e memoria_total.txt
+    """
+    if DIRETORIO_PERFIL is None:
+        return None
+
+    global perfil_total
+    if perfil_processo is not None:
+        import pstats
+
+        perfil_processo.disable()
+        with perfil_lock:
+            perfil_total = pstats.Stats(perfil_processo)
+            pilhas_total.update(pilhas_colapsadas(perfil_total.stats))
+
+    with perfil_lock:
+        if perfil_total is not None:
+            perfil_total.dump_stats(os.path.join(DIRETORIO_PERFIL, "total.pstats"))
+            with open(os.path.join(DIRETORIO_PERFIL, "total.txt"), "w", encoding="utf-8") as arquivo:
+                perfil_total.stream = arquivo
+                perfil_total.sort_stats("cumulative").print_stats(40)
+                perfil_total.sort_stats("tottime").print_stats(40)
+        _escrever_pilhas(os.path.join(DIRETORIO_PERFIL, "total.folded"), pilhas_total)
+
+        with open(os.path.join(DIRETORIO_PERFIL, "resumo.csv"), "w", encoding="utf-8") as arquivo:
+            arquivo.write("host;parede_s;cpu_s;cpu_sobre_parede;memoria_alocada_kib;cprofile\n")
+            for host, parede, cpu, alocado, com_cprofile in sorted(resumo_olts, key=lambda olt: -olt[1]):
+                razao = cpu / parede if parede else 0
+                arquivo.write(f"{host};{parede:.2f};{cpu:.2f};{razao:.3f};{alocado / 1024:.0f};{int(com_cprofile)}\n")
+
+    _escrever_memoria(os.path.join(DIRETORIO_PERFIL, "memoria_total.txt"), _fotografar_memoria(),
+                      memoria_inicial, "Execução completa: alocações desde o início do perfil")
+    tracemalloc.stop()
+    return DIRETORIO_PERFIL
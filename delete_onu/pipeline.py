@@ -0,0 +1,135 @@
+import time
+
+from sessao_cli import limpar_saida, termina_em_prompt
+from tempos_resposta import orcamento, registrar_tempo
+from metricas import contar_consultas
+
+# Quantidade padrão de comandos enviados de uma vez (janela do pipeline)
+JANELA_PADRAO = 8
+
+# Comandos aceitos pelo pipeline: somente leitura
+PREFIXOS_LEITURA = ("show ", "display ")
+
+def separar_saidas(texto, comandos, padrao_prompt):
+    """
+    Separa a saída combinada de vários comandos enviados em sequência.
+    Cada saída começa após a linha com o eco do comando e termina no início da
+    linha do próximo eco (prompt + comando) ou no prompt final.
+    Retorna (lista de saídas na ordem dos comandos, quantas das primeiras saídas terminaram):
+    a saída terminou quando o eco do comando seguinte (ou o prompt final) já chegou
+    """
+    texto = limpar_saida(texto)
+    saidas = []
+    posicao = 0
+    inicios = []
+
+    # Localiza o eco de cada comando em ordem
+    for comando in comandos:
+        indice = texto.find(comando, posicao)
+        if indice < 0:
+            break
+        fim_linha = texto.find('\n', indice)
+        if fim_linha < 0:
+            break
+        inicio_linha = texto.rfind('\n', 0, indice) + 1
+        inicios.append((inicio_linha, fim_linha + 1))
+        posicao = fim_linha + 1
+
+    for i, (_, inicio_saida) in enumerate(inicios):
+        if i + 1 < len(inicios):
+            fim_saida = inicios[i + 1][0]
+        else:
+            # Última: termina na linha do prompt final (se já chegou)
+            resto = texto[inicio_saida:]
+            if termina_em_prompt(resto, padrao_prompt):
+                fim_saida = inicio_saida + resto.rstrip().rfind('\n') + 1
+            else:
+                fim_saida = len(texto)
+        saidas.append(texto[inicio_saida:fim_saida])
+
+    if len(inicios) == len(comandos) and termina_em_prompt(texto[posicao:], padrao_prompt):
+        concluidas = len(comandos)
+    else:
+        concluidas = max(len(inicios) - 1, 0)
+
+    # Comandos sem eco (timeout) ficam com saída vazia
+    saidas.extend([''] * (len(comandos) - len(saidas)))
+    return saidas, concluidas
+
+def _primeira_concluida(texto, comandos):
+    # A saída do primeiro comando terminou quando o eco do segundo aparece depois dele
+    indice = texto.find(comandos[0])
+    return indice >= 0 and texto.find(comandos[1], indice + len(comandos[0])) >= 0
+
+def _executar_janela(shell, comandos, terminador, timeout):
+    """
+    Envia a janela e lê até todas as saídas chegarem. Retorna (saídas, quantas terminaram, segundos
+    até a resposta do primeiro comando ou None), esta última independe da profundidade
+    da janela e é a amostra de latência do ritmo da OLT
+    """
+    # Descarta restos de comandos anteriores para não confundir a separação
+    while shell.recv_ready():
+        shell.recv(65535)
+
+    inicio = time.monotonic()
+    shell.send("".join(f"{comando}{terminador}" for comando in comandos))
+
+    padrao_prompt = shell.perfil.padrao_prompt
+    texto = ""
+    primeira = None
+    limite = inicio + timeout
+    while time.monotonic() < limite:
+        if shell.recv_ready():
+            texto += shell.recv(65535).decode("utf-8", errors="ignore")
+            saidas, concluidas = separar_saidas(texto, comandos, padrao_prompt)
+            completo = concluidas == len(comandos)
+            if primeira is None and (completo or len(comandos) > 1 and _primeira_concluida(limpar_saida(texto), comandos)):
+                primeira = time.monotonic() - inicio
+            if completo:
+                return saidas, concluidas, primeira
+        else:
+            time.sleep(0.05)
+
+    return (*separar_saidas(texto, comandos, padrao_prompt), primeira)
+
+def executar_pipeline(shell, comandos, contexto, janela=JANELA_PADRAO, timeout_por_comando=5, terminador="\n", nome=None,
+                      concluidas=None):
+    """
+    Executa comandos somente leitura em janelas de K comandos enviados de uma vez,
+    na mesma sessão, e devolve a saída de cada comando na ordem enviada.
+    Pressupõe que a CLI ecoa cada comando quando começa a processá-lo (como
+    Huawei, ZTE e Fiberhome fazem), precedido do prompt.
+    Com nome (ex: 'display ont info'), o timeout por comando vem do histórico de
+    tempos de resposta do equipamento e cada janela completa alimenta o histórico.
+    Em sessões CLI, janela é o valor inicial: o ritmo da OLT ajusta a profundidade
+    a cada janela pela latência observada.
+    concluidas (lista): recebe, por comando, se a saída terminou (False: truncada pelo
+    timeout da janela ou sem eco)
+    """
+    for comando in comandos:
+        if not comando.startswith(PREFIXOS_LEITURA):
+            raise ValueError(f"Comando não permitido no pipeline (somente leitura): {comando}")
+
+    shell.garantir_contexto(contexto)
+
+    if nome:
+        timeout_por_comando = orcamento(shell, nome, timeout_por_comando)
+
+    ritmo = getattr(shell, "ritmo", None)
+    resultados = []
+    inicio = 0
+    while inicio < len(comandos):
+        profundidade = ritmo.profundidade(janela) if ritmo is not None else janela
+        lote = comandos[inicio:inicio + profundidade]
+        inicio += len(lote)
+        comeco = time.monotonic()
+        saidas, terminadas, primeira = _executar_janela(shell, lote, terminador, timeout_por_comando * len(lote))
+        if concluidas is not None:
+            concluidas.extend(indice < terminadas for indice in range(len(lote)))
+        if nome and terminadas == len(lote):
+            registrar_tempo(shell, nome, (time.monotonic() - comeco) / len(lote))
+        if ritmo is not None and primeira is not None:
+            ritmo.observar(nome or lote[0].split()[0], primeira)
+        contar_consultas(nome or lote[0].split()[0], len(lote))
+        resultados.extend(saidas)
+    return resultados
@@ -0,0 +1,181 @@
+import json
+import os
+from array import array
+from datetime import date
+
+from registro_onu import SEM_VALOR
+
+# Política de retenção: a decisão de quais ONUs offline vão para a deleção sai dos laços de
+# I/O. A descoberta só coleta as ONUs offline com a data da última queda (CandidatosONU) e a
+# política avalia as colunas de uma vez: dias offline, limite da OLT, seriais mantidos e
+# ONUs sem data de queda. Com numpy instalado a conta é vetorizada sobre o próprio buffer dos
+# arrays (frombuffer, sem cópia), inclusive a seleção das candidatas; sem numpy, uma passada
+# em Python pelos arrays. numpy não é dependência e só é importado na primeira avaliação.
+# python bench_politica.py compara os dois caminhos com o tempo de leitura das ONUs na OLT.
+# politica_<fabricante>.json (opcional):
+#   {"qtd_dias": 45, "por_olt": {"10.0.0.1": 60}, "seriais_mantidos": ["ZTEG12345678"],
+#    "nunca_online": "manter"}
+# nunca_online vale para as ONUs sem data de queda (nunca subiram ou a OLT não informa):
+# "manter" (padrão, comportamento anterior) ou "deletar"
+
+MANTER = "manter"
+DELETAR = "deletar"
+
+# numpy (None = ainda não procurado, False = não instalado)
+_modulo_numpy = None
+
+class Politica:
+    """
+    Limite de dias (padrão e por OLT), seriais que nunca são deletados e o tratamento das
+    ONUs sem data de queda
+    """
+
+    def __init__(self, qtd_dias, por_olt=None, seriais_mantidos=(), nunca_online=MANTER):
+        if nunca_online not in (MANTER, DELETAR):
+            raise ValueError(f"nunca_online deve ser '{MANTER}' ou '{DELETAR}': {nunca_online!r}")
+        self.qtd_dias = int(qtd_dias)
+        self.por_olt = {host: int(dias) for host, dias in (por_olt or {}).items()}
+        self.seriais_mantidos = frozenset(seriais_mantidos)
+        self.nunca_online = nunca_online
+
+    def limite(self, host):
+        return self.por_olt.get(host, self.qtd_dias)
+
+    def __repr__(self):
+        return (f"Politica({self.qtd_dias} dias, {len(self.por_olt)} OLTs com limite próprio, "
+                f"{len(self.seriais_mantidos)} seriais mantidos, nunca online: {self.nunca_online})")
+
+def carregar_politica(path, qtd_dias):
+    """
+    Lê a política do arquivo; sem arquivo, só o limite padrão (qtd_dias do script)
+    """
+    if not os.path.exists(path):
+        return Politica(qtd_dias)
+    with open(path, "r", encoding="utf-8") as arquivo:
+        dados = json.load(arquivo)
+    return Politica(dados.get("qtd_dias", qtd_dias), dados.get("por_olt"),
+                    dados.get("seriais_mantidos", ()), dados.get("nunca_online", MANTER))
+
+class Avaliacao:
+    """
+    Resultado da política para uma lista de ONUs offline: candidatas (com dias_offline),
+    data em que a próxima ONU atinge o limite (agenda) e contagens para o log e o resultado da OLT
+    """
+    __slots__ = ("candidatas", "proxima_delecao", "aguardando", "mantidas", "sem_queda", "avaliadas")
+
+    def __init__(self, candidatas, proxima_delecao, aguardando, mantidas, sem_queda, avaliadas=0):
+        self.candidatas = candidatas
+        self.proxima_delecao = proxima_delecao
+        self.aguardando = aguardando
+        self.mantidas = mantidas
+        self.sem_queda = sem_queda
+        self.avaliadas = avaliadas
+
+def _numpy():
+    global _modulo_numpy
+    if _modulo_numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _modulo_numpy = numpy
+    return _modulo_numpy or None
+
+def avaliar(offline, data_referencia, politica):
+    """
+    Aplica a política às ONUs offline de uma OLT (CandidatosONU com ultima_queda; dias_offline
+    é recalculado). data_referencia é a data atual da OLT. Retorna uma Avaliacao
+    """
+    hoje = data_referencia.toordinal()
+    limite = politica.limite(offline.host)
+    deletar_sem_queda = politica.nunca_online == DELETAR
+
+    numpy = _numpy()
+    if numpy is not None:
+        indices, dias, mais_antiga_aguardando, aguardando, mantidas, sem_queda = _avaliar_numpy(
+            numpy, offline, hoje, limite, politica.seriais_mantidos, deletar_sem_queda)
+        candidatas = offline.selecionar(indices, numpy)
+    else:
+        indices, dias, mais_antiga_aguardando, aguardando, mantidas, sem_queda = _avaliar_colunas(
+            offline, hoje, limite, politica.seriais_mantidos, deletar_sem_queda)
+        candidatas = offline.selecionar(indices)
+    candidatas.dias_offline = dias
+    # A próxima ONU a vencer é a queda mais antiga entre as que ainda não atingiram o limite
+    proxima_delecao = None
+    if mais_antiga_aguardando:
+        proxima_delecao = date.fromordinal(mais_antiga_aguardando + limite)
+    return Avaliacao(candidatas, proxima_delecao, aguardando, mantidas, sem_queda, len(offline))
+
+def _avaliar_colunas(offline, hoje, limite, seriais_mantidos, deletar_sem_queda):
+    # Sem numpy: uma passada pelas colunas (arrays), sem montar RegistroONU
+    corte = hoje - limite  # queda até esta data (ordinal) = limite atingido
+    quedas = offline.ultima_queda
+    if seriais_mantidos:
+        mantida = list(map(seriais_mantidos.__contains__, offline.serial))
+        mantidas = mantida.count(True)
+    else:
+        mantida = None
+        mantidas = 0
+
+    indices = []
+    dias = array("l")
+    mais_antiga_aguardando = 0
+    aguardando = sem_queda = 0
+    for i, queda in enumerate(quedas):
+        if mantida is not None and mantida[i]:
+            continue
+        if not queda:
+            sem_queda += 1
+            if deletar_sem_queda:
+                indices.append(i)
+                dias.append(SEM_VALOR)
+        elif queda <= corte:
+            indices.append(i)
+            dias.append(hoje - queda)
+        else:
+            aguardando += 1
+            if not mais_antiga_aguardando or queda < mais_antiga_aguardando:
+                mais_antiga_aguardando = queda
+    return indices, dias, mais_antiga_aguardando, aguardando, mantidas, sem_queda
+
+def _avaliar_numpy(numpy, offline, hoje, limite, seriais_mantidos, deletar_sem_queda):
+    # Mesmo resultado do _avaliar_colunas, com máscaras sobre as colunas
+    # Os arrays usam os tipos C de mesmo código no numpy ("l", "H")
+    quedas = numpy.frombuffer(offline.ultima_queda, dtype=offline.ultima_queda.typecode)
+    if seriais_mantidos:
+        # Consulta ao frozenset feita em C (map); numpy.isin sobre strings ordena as duas
+        # listas e mede várias vezes mais lento
+        mantida = numpy.fromiter(map(seriais_mantidos.__contains__, offline.serial), dtype=bool, count=len(quedas))
+    else:
+        mantida = numpy.zeros(len(quedas), dtype=bool)
+    livre = ~mantida
+    com_queda = quedas > 0
+    vencida = livre & com_queda & (quedas <= hoje - limite)
+    aguardando = livre & com_queda & ~vencida
+    sem_queda = livre & ~com_queda
+
+    selecionada = vencida | sem_queda if deletar_sem_queda else vencida
+    indices = numpy.flatnonzero(selecionada)
+    dias = array("l")
+    dias.frombytes(numpy.where(com_queda[indices], hoje - quedas[indices], SEM_VALOR).astype(quedas.dtype).tobytes())
+    mais_antiga_aguardando = int(quedas[aguardando].min()) if aguardando.any() else 0
+    return (indices, dias, mais_antiga_aguardando,
+            int(aguardando.sum()), int(mantida.sum()), int(sem_queda.sum()))
+
+def resumo(host, avaliacoes, politica):
+    """
+    Linha do log com a soma das avaliações de uma OLT (uma por PON no fluxo --por-pon)
+    """
+    candidatas = sum(len(avaliacao.candidatas) for avaliacao in avaliacoes)
+    aguardando = sum(avaliacao.aguardando for avaliacao in avaliacoes)
+    mantidas = sum(avaliacao.mantidas for avaliacao in avaliacoes)
+    sem_queda = sum(avaliacao.sem_queda for avaliacao in avaliacoes)
+    return (f"OLT {host} - Política ({politica.limite(host)} dias): {candidatas} a deletar, {aguardando} abaixo do limite, "
+            f"{mantidas} mantidas por serial, {sem_queda} sem data de queda ({politica.nunca_online})")
+
+def proxima_delecao(avaliacoes):
+    """
+    Data mais próxima em que alguma ONU atinge o limite, entre várias avaliações (ou None)
+    """
+    datas = [avaliacao.proxima_delecao for avaliacao in avaliacoes if avaliacao.proxima_delecao]
+    return min(datas) if datas else None
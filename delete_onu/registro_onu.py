@@ -0,0 +1,126 @@
+import sys
+from array import array
+from datetime import date
+from operator import itemgetter
+
+# Registro compacto de ONU e contêiner colunar de candidatos, comum aos três fabricantes.
+# Posições (chassi/slot/pon/onu), service-port, dias e data de queda ficam em arrays de
+# inteiros; fabricante, host, modelo e status são strings internadas (poucos valores)
+
+SEM_VALOR = -1
+
+def _internar(texto):
+    return sys.intern(texto) if texto else texto
+
+class RegistroONU:
+    """
+    Uma ONU (candidata ou encontrada na descoberta). Fiberhome não tem chassi (0)
+    """
+    __slots__ = ("fabricante", "host", "chassi", "slot", "pon", "onu", "serial",
+                 "service_port", "dias_offline", "ultima_queda", "modelo", "status")
+
+    def __init__(self, fabricante, host, chassi, slot, pon, onu, serial=None, service_port=None,
+                 dias_offline=None, ultima_queda=None, modelo=None, status=None):
+        self.fabricante = _internar(fabricante)
+        self.host = _internar(host)
+        self.chassi = int(chassi)
+        self.slot = int(slot)
+        self.pon = int(pon)
+        self.onu = int(onu)
+        self.serial = serial
+        self.service_port = service_port
+        self.dias_offline = dias_offline
+        self.ultima_queda = ultima_queda
+        self.modelo = _internar(modelo)
+        self.status = _internar(status)
+
+    def __repr__(self):
+        return (f"RegistroONU({self.fabricante} {self.host} {self.chassi}/{self.slot}/{self.pon}:{self.onu} "
+                f"serial={self.serial} dias={self.dias_offline})")
+
+class CandidatosONU:
+    """
+    Lista de ONUs de uma OLT em colunas. Iterar (ou indexar) devolve RegistroONU
+    montados sob demanda; o armazenamento continua colunar
+    """
+    __slots__ = ("fabricante", "host", "chassi", "slot", "pon", "onu", "service_port",
+                 "dias_offline", "ultima_queda", "serial", "modelo", "status")
+
+    def __init__(self, fabricante, host):
+        self.fabricante = _internar(fabricante)
+        self.host = _internar(host)
+        self.chassi = array("H")
+        self.slot = array("H")
+        self.pon = array("H")
+        self.onu = array("H")
+        self.service_port = array("l")
+        self.dias_offline = array("l")
+        self.ultima_queda = array("l")  # ordinal da data (0 = sem data)
+        self.serial = []
+        self.modelo = []
+        self.status = []
+
+    def adicionar(self, chassi, slot, pon, onu, serial=None, service_port=None,
+                  dias_offline=None, ultima_queda=None, modelo=None, status=None):
+        self.chassi.append(int(chassi))
+        self.slot.append(int(slot))
+        self.pon.append(int(pon))
+        self.onu.append(int(onu))
+        self.service_port.append(SEM_VALOR if service_port is None else int(service_port))
+        self.dias_offline.append(SEM_VALOR if dias_offline is None else int(dias_offline))
+        self.ultima_queda.append(ultima_queda.toordinal() if ultima_queda else 0)
+        self.serial.append(serial)
+        self.modelo.append(_internar(modelo))
+        self.status.append(_internar(status))
+
+    def anexar(self, registro):
+        self.adicionar(registro.chassi, registro.slot, registro.pon, registro.onu, registro.serial,
+                       registro.service_port, registro.dias_offline, registro.ultima_queda,
+                       registro.modelo, registro.status)
+
+    def selecionar(self, indices, numpy=None):
+        """
+        Novo CandidatosONU só com as posições indicadas (na ordem dada), coluna a coluna.
+        Com numpy, indices é um array numpy e as colunas numéricas são copiadas por take
+        """
+        novo = CandidatosONU(self.fabricante, self.host)
+        if numpy is not None:
+            for nome in ("chassi", "slot", "pon", "onu", "service_port", "dias_offline", "ultima_queda"):
+                coluna = getattr(self, nome)
+                getattr(novo, nome).frombytes(numpy.frombuffer(coluna, dtype=coluna.typecode)[indices].tobytes())
+            indices = indices.tolist()
+        if not indices:
+            return novo
+        # itemgetter com todas as posições: a cópia de cada coluna é feita em C
+        pegar = itemgetter(*indices) if len(indices) > 1 else lambda coluna: (coluna[indices[0]],)
+        if numpy is None:
+            for nome in ("chassi", "slot", "pon", "onu", "service_port", "dias_offline", "ultima_queda"):
+                getattr(novo, nome).extend(pegar(getattr(self, nome)))
+        novo.serial = list(pegar(self.serial))
+        novo.modelo = list(pegar(self.modelo))
+        novo.status = list(pegar(self.status))
+        return novo
+
+    def __len__(self):
+        return len(self.onu)
+
+    def __getitem__(self, i):
+        service_port = self.service_port[i]
+        dias = self.dias_offline[i]
+        queda = self.ultima_queda[i]
+        return RegistroONU(
+            self.fabricante, self.host, self.chassi[i], self.slot[i], self.pon[i], self.onu[i],
+            self.serial[i],
+            None if service_port == SEM_VALOR else service_port,
+            None if dias == SEM_VALOR else dias,
+            date.fromordinal(queda) if queda else None,
+            self.modelo[i],
+            self.status[i],
+        )
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __repr__(self):
+        return f"CandidatosONU({self.fabricante} {self.host}: {len(self)} ONUs)"
@@ -0,0 +1,53 @@
+import argparse
+import importlib
+import os
+import time
+
+from gravador import Transcricao, ShellReproducao, RelogioVirtual
+from sessao_cli import SessaoCLI, HUAWEI, ZTE, FIBERHOME
+
+# Reproduz uma transcrição gravada com --gravar pela lógica do fabricante, sem rede e sem
+# esperas (relógio virtual). Serve para regressão dos parsers e para medir o processamento.
+# Uso: python reproduzir.py transcricao.trx.gz --fabricante huawei [--modo census] [--repetir N]
+
+FABRICANTES = {
+    "huawei": ("delete_onu_offline_bigger_45_days_olt_huawei_v3", HUAWEI),
+    "zte": ("delete_onu_offline_bigger_45_days_olt_zte_v3", ZTE),
+    "fiberhome": ("delete_onu_offline_bigger_45_days_olt_fiberhome_v4", FIBERHOME),
+}
+
+def reproduzir(path, fabricante, modo="delete", saida="reproducao"):
+    """
+    Executa processar_sessao sobre a transcrição. Logs e census do script vão para o
+    diretório saida. Retorna (shell de reprodução, segundos de processamento, segundos virtuais)
+    """
+    nome_modulo, perfil = FABRICANTES[fabricante]
+    modulo = importlib.import_module(nome_modulo)
+    os.makedirs(saida, exist_ok=True)
+    modulo.path_02 = os.path.join(saida, os.path.basename(modulo.path_02))
+    modulo.path_census = os.path.join(saida, os.path.basename(modulo.path_census))
+
+    with Transcricao(path) as transcricao:
+        host = transcricao.metadados.get("host", "reproducao")
+        canal = ShellReproducao(transcricao)
+        inicio = time.perf_counter()
+        with RelogioVirtual() as relogio:
+            modulo.processar_sessao(SessaoCLI(canal, perfil, modulo.ritmo_da_olt()), host, 1, modo)
+        return canal, time.perf_counter() - inicio, relogio.avanco
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reprodução offline de uma sessão gravada")
+    parser.add_argument("transcricao", help="arquivo .trx.gz (ou .trx já descomprimido)")
+    parser.add_argument("--fabricante", required=True, choices=sorted(FABRICANTES))
+    parser.add_argument("--modo", default="delete", choices=["delete", "census"])
+    parser.add_argument("--repetir", type=int, default=1, metavar="N", help="repetições (medição de desempenho)")
+    parser.add_argument("--saida", default="reproducao", metavar="DIRETORIO", help="logs e census da reprodução")
+    args = parser.parse_args()
+
+    for rodada in range(1, args.repetir + 1):
+        canal, duracao, virtual = reproduzir(args.transcricao, args.fabricante, args.modo, args.saida)
+        print(f"[INFO] Rodada {rodada}: {canal.enviados} envios, {len(canal.divergencias)} divergências, "
+              f"{duracao:.3f}s de processamento ({virtual:.1f}s de esperas evitadas)")
+
+    for ordem, enviado, gravado in canal.divergencias[:10]:
+        print(f"[AVISO] Envio {ordem}: enviado {enviado!r}, gravado {gravado!r}")
@@ -0,0 +1,194 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# Resultado estruturado por OLT: processar_olt devolve um ResultadoOLT (status, tempos,
+# contadores e erros) no lugar da mensagem de texto. Os contadores são da OLT e só a thread
+# que a processa escreve neles (sem lock); a thread principal soma cada resultado ao receber
+# o future e grava o relatório da execução (relatorio_<fabricante>.json):
+#   {"fabricante": "zte", "modo": "delete", "inicio": "...", "fim": "...", "segundos": 812.4,
+#    "totais": {"olts": 120, "sucesso": 118, "erro": 2, ...},
+#    "olts": [{"host": "10.0.0.1", "status": "sucesso", "consultadas": 40, "deletadas": 12,
+#              "ignoradas": 28, "sem_queda": 3, "salvo": true, "erros": [], ...}]}
+
+SUCESSO = "sucesso"
+ERRO = "erro"
+ADIADA = "adiada"  # fora do prazo da janela (--prazo), não iniciada
+STATUS = (SUCESSO, ERRO, ADIADA)
+
+# Contadores por OLT
+CONSULTADAS = "consultadas"  # ONUs offline avaliadas pela política
+DELETADAS = "deletadas"      # deleções confirmadas na verificação
+IGNORADAS = "ignoradas"      # avaliadas e não deletadas (abaixo do limite, mantidas, sem data de queda)
+SEM_QUEDA = "sem_queda"      # nunca online / sem data de queda (contador de cada fabricante)
+CONTADORES = (CONSULTADAS, DELETADAS, IGNORADAS, SEM_QUEDA)
+
+# Rótulo da linha do log com o resultado da OLT, pelo status
+ROTULOS = {SUCESSO: "[SUCCESS]", ERRO: "[ERRO]", ADIADA: "[WARN]"}
+
+# Resultado da OLT processada pela thread atual (para contar sem passar o resultado adiante)
+_thread_atual = threading.local()
+
+class ResultadoOLT:
+    """
+    Status, tempos, contadores e erros do processamento de uma OLT. Escrito só pela thread
+    que processa a OLT; lido pela thread principal depois do future
+    """
+    __slots__ = ("host", "thread_id", "modo", "status", "inicio", "segundos",
+                 "consultadas", "deletadas", "ignoradas", "sem_queda", "salvo", "erros", "mensagem", "fases")
+
+    def __init__(self, host, thread_id=None, modo="delete"):
+        self.host = host
+        self.thread_id = thread_id
+        self.modo = modo
+        self.status = SUCESSO
+        self.inicio = None
+        self.segundos = 0.0
+        self.consultadas = 0
+        self.deletadas = 0
+        self.ignoradas = 0
+        self.sem_queda = 0
+        self.salvo = None  # None: sem save; True/False: configuração salva ou não
+        self.erros = []
+        self.mensagem = ""
+        self.fases = []  # fases marcadas (fase_atual) na tentativa atual, em ordem
+
+    @contextmanager
+    def executando(self):
+        """
+        Torna este o resultado da thread atual (contadores e erros) e mede a duração
+        """
+        anterior = getattr(_thread_atual, "resultado", None)
+        _thread_atual.resultado = self
+        self.inicio = datetime.now()
+        relogio = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.segundos = round(time.perf_counter() - relogio, 3)
+            _thread_atual.resultado = anterior
+
+    def zerar_contadores(self):
+        # Nova tentativa da OLT: a descoberta é refeita e contada de novo
+        for campo in CONTADORES:
+            setattr(self, campo, 0)
+
+    def falhar(self, mensagem):
+        self.erros.append(mensagem)
+        self.status = ERRO
+
+    def adiar(self, mensagem):
+        self.status = ADIADA
+        self.mensagem = mensagem
+
+    @property
+    def sucesso(self):
+        return self.status == SUCESSO
+
+    def linha_log(self):
+        """
+        Linha do log com o resultado, rotulada pelo status ([SUCCESS], [ERRO] ou [WARN])
+        """
+        return f"{ROTULOS[self.status]} {self}"
+
+    def como_dict(self):
+        return {
+            "host": self.host, "thread_id": self.thread_id, "modo": self.modo, "status": self.status,
+            "inicio": self.inicio.isoformat(timespec="seconds") if self.inicio else None,
+            "segundos": self.segundos,
+            CONSULTADAS: self.consultadas, DELETADAS: self.deletadas,
+            IGNORADAS: self.ignoradas, SEM_QUEDA: self.sem_queda,
+            "salvo": self.salvo, "erros": list(self.erros), "mensagem": str(self),
+        }
+
+    @classmethod
+    def de_dict(cls, dados):
+        """
+        Reconstrói o resultado gravado por como_dict (fila, arquivos das partições)
+        """
+        resultado = cls(dados["host"], dados.get("thread_id"), dados.get("modo", "delete"))
+        resultado.status = dados.get("status", ERRO)
+        if dados.get("inicio"):
+            resultado.inicio = datetime.fromisoformat(dados["inicio"])
+        resultado.segundos = dados.get("segundos", 0.0)
+        for campo in CONTADORES:
+            setattr(resultado, campo, dados.get(campo, 0))
+        resultado.salvo = dados.get("salvo")
+        resultado.erros = list(dados.get("erros", ()))
+        resultado.mensagem = dados.get("mensagem", "")
+        return resultado
+
+    def __str__(self):
+        if self.mensagem:
+            return self.mensagem
+        prefixo = f"Thread-{self.thread_id}: " if self.thread_id is not None else ""
+        if self.status == ERRO:
+            extras = f" (+{len(self.erros) - 1} erro(s))" if len(self.erros) > 1 else ""
+            return f"{prefixo}Erro ao processar OLT {self.host}: {self.erros[-1] if self.erros else 'sem detalhe'}{extras}"
+        return f"{prefixo}OLT {self.host} processada com sucesso ({self.deletadas} ONUs deletadas em {self.segundos:.0f}s)"
+
+def resultado_atual():
+    return getattr(_thread_atual, "resultado", None)
+
+def contar(campo, quantidade):
+    """
+    Soma ao contador (CONSULTADAS, DELETADAS, ...) da OLT da thread atual, se houver
+    """
+    resultado = resultado_atual()
+    if resultado is not None:
+        setattr(resultado, campo, getattr(resultado, campo) + quantidade)
+
+def contar_avaliacoes(avaliacoes):
+    """
+    ONUs avaliadas pela política na OLT da thread atual: consultadas e não deletadas
+    """
+    for avaliacao in avaliacoes:
+        contar(CONSULTADAS, avaliacao.avaliadas)
+        contar(IGNORADAS, avaliacao.avaliadas - len(avaliacao.candidatas))
+
+def registrar_erro(mensagem):
+    """
+    Erro durante o processamento da OLT da thread atual (chamado nos pontos de falha, junto
+    com a linha [ERRO] do log): a OLT deixa de constar como sucesso
+    """
+    resultado = resultado_atual()
+    if resultado is not None:
+        resultado.falhar(mensagem)
+
+def registrar_save(salvo):
+    resultado = resultado_atual()
+    if resultado is not None:
+        resultado.salvo = salvo
+
+def totais(resultados):
+    """
+    Somas da execução: OLTs por status, contadores e saves que falharam
+    """
+    soma = {"olts": len(resultados)}
+    for status in STATUS:
+        soma[status] = sum(resultado.status == status for resultado in resultados)
+    for campo in CONTADORES:
+        soma[campo] = sum(getattr(resultado, campo) for resultado in resultados)
+    soma["save_falhou"] = sum(resultado.salvo is False for resultado in resultados)
+    return soma
+
+def escrever_relatorio(path, fabricante, modo, resultados, inicio, fim=None):
+    """
+    Grava o relatório da execução (totais e um registro por OLT, em ordem de host). Retorna os totais
+    """
+    fim = fim or datetime.now()
+    soma = totais(resultados)
+    relatorio = {
+        "fabricante": fabricante,
+        "modo": modo,
+        "inicio": inicio.isoformat(timespec="seconds"),
+        "fim": fim.isoformat(timespec="seconds"),
+        "segundos": round((fim - inicio).total_seconds(), 1),
+        "totais": soma,
+        "olts": [resultado.como_dict() for resultado in sorted(resultados, key=lambda resultado: resultado.host)],
+    }
+    with open(path, "w", encoding="utf-8") as arquivo:
+        json.dump(relatorio, arquivo, ensure_ascii=False, indent=1)
+    return soma
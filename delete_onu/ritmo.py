@@ -0,0 +1,87 @@
+# Ritmo por OLT: o plano de controle da OLT é o limite real (placas antigas da Fiberhome e
+# ZTE sobem a CPU e atrasam todas as respostas quando os comandos chegam rápido demais).
+# Cada sessão CLI tem o seu Ritmo, alimentado pelos tempos de resposta já medidos
+# (registrar_tempo): por comando, a menor latência vista na sessão é a referência da OLT
+# sem carga e a média móvel é a latência atual. Acima de LIMIAR_CARGA x referência, o
+# intervalo entre comandos de deleção dobra e a janela do pipeline cai pela metade; abaixo
+# de LIMIAR_FOLGA, o intervalo diminui PASSO_INTERVALO e a janela cresce 1 (AIMD, como no
+# controle de congestionamento por atraso). Os valores iniciais e os limites do ajuste vêm
+# do script do fabricante (INTERVALO_MINIMO..JANELA_MAXIMA); sem intervalo mínimo, o piso é
+# o próprio intervalo inicial: o ritmo nunca deleta mais rápido que a espera do fabricante
+
+INTERVALO_MAXIMO = 5.0   # segundos entre comandos de deleção
+JANELA_MINIMA = 1        # comandos por janela do pipeline
+JANELA_MAXIMA = 32
+LIMIAR_CARGA = 2.0       # latência atual / referência a partir da qual a OLT está sobrecarregada
+LIMIAR_FOLGA = 1.3       # latência atual / referência até a qual ainda há folga
+FATOR_RECUO = 2.0
+PASSO_INTERVALO = 0.05
+SUAVIZACAO = 0.3         # peso da amostra nova na média móvel
+AMOSTRAS_APOS_RECUO = 3  # amostras ignoradas depois de um recuo (efeito do ritmo novo)
+PISO_LATENCIA = 0.05     # segundos; abaixo disso a razão seria só ruído
+
+class Ritmo:
+    """
+    Intervalo entre comandos de deleção e profundidade do pipeline de uma sessão (OLT),
+    ajustados pela latência observada. Uma sessão é usada por uma thread por vez
+    """
+
+    def __init__(self, intervalo_minimo=None, intervalo_maximo=INTERVALO_MAXIMO,
+                 janela_minima=JANELA_MINIMA, janela_maxima=JANELA_MAXIMA):
+        self.intervalo_minimo = intervalo_minimo  # None: o intervalo inicial
+        self.intervalo_maximo = intervalo_maximo
+        self.janela_minima = janela_minima
+        self.janela_maxima = max(janela_maxima, janela_minima)
+        self.intervalo = None
+        self.janela = None
+        self.referencia = {}
+        self.media = {}
+        self.ignorar = 0
+        self.recuos = 0
+
+    def intervalo_atual(self, padrao):
+        if self.intervalo is None:
+            if self.intervalo_minimo is None:
+                self.intervalo_minimo = padrao
+            self.intervalo_maximo = max(self.intervalo_maximo, self.intervalo_minimo)
+            self.intervalo = min(self.intervalo_maximo, max(self.intervalo_minimo, padrao))
+        return self.intervalo
+
+    def profundidade(self, padrao):
+        if self.janela is None:
+            self.janela = min(self.janela_maxima, max(self.janela_minima, padrao))
+        return self.janela
+
+    def observar(self, comando, segundos):
+        segundos = max(segundos, PISO_LATENCIA)
+        referencia = self.referencia[comando] = min(self.referencia.get(comando, segundos), segundos)
+        media = self.media.get(comando)
+        media = self.media[comando] = segundos if media is None else SUAVIZACAO * segundos + (1 - SUAVIZACAO) * media
+        if self.ignorar:
+            self.ignorar -= 1
+            return
+
+        razao = media / referencia
+        if razao >= LIMIAR_CARGA:
+            self._recuar()
+        elif razao <= LIMIAR_FOLGA:
+            self._avancar()
+
+    def _recuar(self):
+        if self.intervalo is not None:
+            self.intervalo = min(self.intervalo_maximo, self.intervalo * FATOR_RECUO)
+        if self.janela is not None:
+            self.janela = max(self.janela_minima, self.janela // 2)
+        self.ignorar = AMOSTRAS_APOS_RECUO
+        self.recuos += 1
+
+    def _avancar(self):
+        if self.intervalo is not None:
+            self.intervalo = max(self.intervalo_minimo, self.intervalo - PASSO_INTERVALO)
+        if self.janela is not None:
+            self.janela = min(self.janela_maxima, self.janela + 1)
+
+    def __str__(self):
+        intervalo = f"{self.intervalo:.2f}s" if self.intervalo is not None else "-"
+        janela = self.janela if self.janela is not None else "-"
+        return f"intervalo {intervalo} entre deleções, janela {janela} no pipeline, {self.recuos} recuo(s) por carga"
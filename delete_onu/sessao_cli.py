@@ -0,0 +1,194 @@
+import re
+import time
+
+from ritmo import Ritmo
+
+# Contextos são tuplas com os comandos de entrada a partir da raiz da CLI, por exemplo
+# Huawei ('enable', 'config', 'interface gpon 0/1') ou Fiberhome ('cd onu',).
+# A transição entre dois contextos sai até o prefixo comum e entra no restante.
+
+class PerfilCLI:
+    """
+    Descreve a CLI de um fabricante: comando de saída de um nível, leitura do prompt
+    e regex que reconhece um prompt no início de uma linha
+    """
+
+    def __init__(self, fabricante, comando_saida, contexto_do_prompt, padrao_prompt, espera=0.5):
+        self.fabricante = fabricante
+        self.comando_saida = comando_saida
+        self.contexto_do_prompt = contexto_do_prompt
+        self.padrao_prompt = re.compile(padrao_prompt)
+        self.espera = espera
+
+def _contexto_huawei(prompt):
+    # MA5800>  /  MA5800#  /  MA5800(config)#  /  MA5800(config-if-gpon-0/1)#
+    match = re.match(r'^[\w.\-]+(?:\((config[^)]*)\))?([>#])$', prompt)
+    if not match:
+        return None
+    modo, sinal = match.groups()
+    if sinal == '>':
+        return ()
+    if not modo:
+        return ('enable',)
+    if modo == 'config':
+        return ('enable', 'config')
+    interface = re.match(r'config-if-gpon-(\d+/\d+)$', modo)
+    if interface:
+        return ('enable', 'config', f'interface gpon {interface.group(1)}')
+    return ('enable', 'config', modo)
+
+def _contexto_zte(prompt):
+    # ZXAN#  /  ZXAN(config)#  /  ZXAN(config-if-gpon_olt-1/1/1)#
+    match = re.match(r'^[\w.\-]+(?:\((config[^)]*)\))?#$', prompt)
+    if not match:
+        return None
+    modo = match.group(1)
+    if not modo:
+        return ()
+    if modo == 'config':
+        return ('configure terminal',)
+    interface = re.match(r'config-if-(gpon_olt-\d+/\d+/\d+)$', modo)
+    if interface:
+        return ('configure terminal', f'interface {interface.group(1)}')
+    # Prompt sem o nome da interface (ex: config-if): não dá para saber qual é
+    return None
+
+def _contexto_fiberhome(prompt):
+    # Admin#  /  Admin\onu#  /  Admin\service#
+    match = re.match(r'^[\w.\-]+((?:\\[\w\-]+)*)#$', prompt)
+    if not match:
+        return None
+    return tuple(f'cd {diretorio}' for diretorio in match.group(1).split('\\') if diretorio)
+
+HUAWEI = PerfilCLI("huawei", "quit", _contexto_huawei, r'[\w.\-]+(?:\([^)]*\))?[>#]')
+ZTE = PerfilCLI("zte", "exit", _contexto_zte, r'[\w.\-]+(?:\([^)]*\))?#')
+FIBERHOME = PerfilCLI("fiberhome", "cd ..", _contexto_fiberhome, r'[\w.\-]+(?:\\[\w\-]+)*#')
+
+# Contextos usados pelos scripts
+HUAWEI_PRIVILEGIADO = ('enable',)
+HUAWEI_CONFIG = ('enable', 'config')
+ZTE_RAIZ = ()
+ZTE_CONFIG = ('configure terminal',)
+FIBERHOME_RAIZ = ()
+FIBERHOME_ONU = ('cd onu',)
+FIBERHOME_SERVICE = ('cd service',)
+
+def limpar_saida(texto):
+    # Remove sequências de escape ANSI e normaliza quebras de linha
+    return re.sub(r'\x1b\[[0-9;]*[A-Za-z]', '', texto).replace('\r\n', '\n').replace('\r', '\n')
+
+def termina_em_prompt(texto, padrao_prompt):
+    """
+    True se a última linha (já limpa) do texto é só o prompt da CLI
+    """
+    ultima_linha = texto.rstrip().rsplit('\n', 1)[-1].strip()
+    return bool(ultima_linha) and padrao_prompt.fullmatch(ultima_linha) is not None
+
+def huawei_interface(chassi_id, slot_id):
+    return HUAWEI_CONFIG + (f'interface gpon {chassi_id}/{slot_id}',)
+
+def zte_interface(chassi_id, slot_id, pon_id):
+    return ZTE_CONFIG + (f'interface gpon_olt-{chassi_id}/{slot_id}/{pon_id}',)
+
+class SessaoCLI:
+    """
+    Envolve o shell do paramiko rastreando o contexto atual da CLI, para enviar
+    apenas as mudanças de modo necessárias. Mantém a interface do shell
+    (send, recv, recv_ready), então as funções existentes continuam funcionando
+    """
+
+    def __init__(self, shell, perfil, ritmo=None):
+        self.shell = shell
+        self.perfil = perfil
+        self.contexto = None  # desconhecido até ler um prompt
+        self.configurados = set()
+        self.equipamento = None  # modelo/versão (ou host) usado no histórico de tempos de resposta
+        self.ritmo = ritmo or Ritmo()  # intervalo entre deleções e janela do pipeline desta OLT
+        self._cauda = ""
+
+    def __getattr__(self, nome):
+        # Demais atributos (closed, settimeout, ...) vêm do shell original
+        return getattr(self.shell, nome)
+
+    def send(self, data):
+        return self.shell.send(data)
+
+    def recv_ready(self):
+        return self.shell.recv_ready()
+
+    def recv(self, nbytes):
+        data = self.shell.recv(nbytes)
+        self._observar(data.decode("utf-8", errors="ignore"))
+        return data
+
+    def _observar(self, texto):
+        # O prompt só é usado para descobrir o contexto inicial (ou após perder o rastreio):
+        # depois disso vale o que foi enviado, já que a saída lida pode estar atrasada
+        self._cauda = (self._cauda + texto)[-512:]
+        if self.contexto is not None:
+            return
+        ultima_linha = re.sub(r'\x1b\[[0-9;]*[A-Za-z]', '', self._cauda).rstrip().rsplit('\n', 1)[-1].strip()
+        contexto = self.perfil.contexto_do_prompt(ultima_linha)
+        if contexto is not None:
+            self.contexto = contexto
+
+    def _enviar(self, comando):
+        self.shell.send(f'{comando}\n')
+        time.sleep(self.perfil.espera)
+
+    def sincronizar(self, tentativas=3):
+        """
+        Descobre o contexto atual pelo prompt (pede um prompt novo com ENTER se preciso)
+        """
+        while self.contexto is None and tentativas:
+            tentativas -= 1
+            self.shell.send('\n')
+            time.sleep(1)
+            while self.recv_ready():
+                self.recv(65535)
+        return self.contexto
+
+    def garantir_contexto(self, alvo):
+        """
+        Leva a CLI até o contexto alvo enviando só as transições necessárias.
+        Com contexto desconhecido envia todos os comandos de entrada, como antes
+        """
+        alvo = tuple(alvo)
+        atual = self.sincronizar()
+
+        if atual is None:
+            comandos = list(alvo)
+        else:
+            comum = 0
+            while comum < min(len(atual), len(alvo)) and atual[comum] == alvo[comum]:
+                comum += 1
+            comandos = [self.perfil.comando_saida] * (len(atual) - comum) + list(alvo[comum:])
+
+        for comando in comandos:
+            self._enviar(comando)
+        self.contexto = alvo
+        return len(comandos)
+
+    def configurar_uma_vez(self, comando, contexto):
+        """
+        Envia um comando de configuração da sessão (ex: terminal length 0) só na primeira vez
+        """
+        if comando in self.configurados:
+            return False
+        self.garantir_contexto(contexto)
+        self._enviar(comando)
+        self.configurados.add(comando)
+        return True
+
+    def executar(self, comando, contexto):
+        """
+        Envia um comando (já com as quebras de linha) que exige o contexto informado
+        """
+        self.garantir_contexto(contexto)
+        self.shell.send(comando)
+
+    def contexto_perdido(self):
+        """
+        Marca o contexto como desconhecido (ex: após erro), forçando nova leitura do prompt
+        """
+        self.contexto = None
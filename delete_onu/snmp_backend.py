@@ -0,0 +1,275 @@
+import os
+import re
+import struct
+from datetime import date
+
+from dotenv import load_dotenv
+
+from politica import avaliar
+from registro_onu import CandidatosONU
+
+load_dotenv()
+
+# pysnmp é opcional e pesado: só é importado no primeiro walk (--backend snmp). Usa a API
+# síncrona (bulkCmd) do pysnmp 4.x-6.x, removida no 7.0: pip install "pysnmp<7"
+hlapi = None
+
+SNMP_COMMUNITY = os.getenv("SNMP_COMMUNITY", "public")
+# Para testes com simulador local (ex: snmpsim em 127.0.0.1:1161) use SNMP_PORT/SNMP_HOST
+SNMP_PORT = int(os.getenv("SNMP_PORT", "161"))
+SNMP_HOST = os.getenv("SNMP_HOST")
+SNMP_TIMEOUT = 5
+SNMP_RETRIES = 2
+MAX_REPETITIONS = 50
+
+# Colunas dos MIBs proprietários usadas na descoberta. Os OIDs e os valores de estado
+# seguem os MIBs de cada fabricante e devem ser conferidos na versão de firmware da OLT
+OIDS = {
+    "huawei": {
+        # HUAWEI-XPON-MIB, índice: ifIndex do PON . ont id
+        "estado": "1.3.6.1.4.1.2011.6.128.1.1.2.46.1.15",   # hwGponDeviceOntControlRunStatus
+        "serial": "1.3.6.1.4.1.2011.6.128.1.1.2.43.1.3",    # hwGponDeviceOntSn
+        "ultima_queda": "1.3.6.1.4.1.2011.6.128.1.1.2.46.1.23",  # hwGponDeviceOntControlLastDownTime
+    },
+    "zte": {
+        # ZTE-AN-GPON-MIB, índice: ifIndex do gpon_olt . onu id
+        "admin": "1.3.6.1.4.1.3902.1012.3.28.2.1.1",        # zxAnGponOntAdminState
+        "estado": "1.3.6.1.4.1.3902.1012.3.28.2.1.4",       # zxAnGponOntPhaseState
+        "serial": "1.3.6.1.4.1.3902.1012.3.28.1.1.5",       # zxAnGponOntSn
+        "ultima_queda": "1.3.6.1.4.1.3902.1012.3.28.2.1.6",  # zxAnGponOntLastOfflineTime
+    },
+    "fiberhome": {
+        # GEPON-OLT-COMMON-MIB, índice: onuIndex (slot/pon/onu codificados)
+        "estado": "1.3.6.1.4.1.5875.800.3.10.1.1.11",       # onuStatus
+        "serial": "1.3.6.1.4.1.5875.800.3.10.1.1.10",       # onuPhysicalAddress
+        "ultima_queda": "1.3.6.1.4.1.5875.800.3.10.1.1.13",  # onuLastOffTime
+    },
+}
+
+# Valores da coluna de estado que indicam ONU offline
+ESTADOS_OFFLINE = {
+    "huawei": {2},                 # offline
+    "zte": {1, 2, 3, 5, 6, 7},     # logging, los, syncMib, dyingGasp, authFailed, offline (4 = working)
+    "fiberhome": {0, 2},           # down
+}
+
+# Valores da coluna admin (quando o fabricante tem) das ONUs consideradas: como na CLI da
+# ZTE, que só lista para deleção as ONUs com Admin State enable
+ADMIN_ATIVO = {
+    "zte": {1},                    # enable (2 = disable)
+}
+
+# Data e hora da OLT (HOST-RESOURCES-MIB hrSystemDate, escalar .0): referência dos dias
+# offline, como a data lida na CLI (show clock / display time). OLT sem esse objeto: vale a
+# data do servidor que coleta, que pode diferir da OLT no fuso ou num relógio errado
+OID_DATA_OLT = "1.3.6.1.2.1.25.1.2"
+
+def _carregar_pysnmp():
+    global hlapi
+    if hlapi is None:
+        try:
+            from pysnmp import hlapi as modulo
+        except ImportError:
+            raise RuntimeError('Backend SNMP requer o pacote pysnmp (pip install "pysnmp<7")')
+        if not hasattr(modulo, "bulkCmd"):
+            raise RuntimeError('Backend SNMP requer pysnmp < 7 (API síncrona bulkCmd): pip install "pysnmp<7"')
+        hlapi = modulo
+    return hlapi
+
+def walk(host, oid):
+    """
+    Percorre uma coluna com GETBULK e retorna {sufixo do índice (tupla de ints): valor}
+    """
+    snmp = _carregar_pysnmp()
+
+    resultado = {}
+    prefixo = tuple(int(x) for x in oid.split('.'))
+    for erro, status, indice_erro, binds in snmp.bulkCmd(
+        snmp.SnmpEngine(),
+        snmp.CommunityData(SNMP_COMMUNITY),
+        snmp.UdpTransportTarget((SNMP_HOST or host, SNMP_PORT), timeout=SNMP_TIMEOUT, retries=SNMP_RETRIES),
+        snmp.ContextData(),
+        0, MAX_REPETITIONS,
+        snmp.ObjectType(snmp.ObjectIdentity(oid)),
+        lexicographicMode=False,
+    ):
+        if erro:
+            raise RuntimeError(f"Erro SNMP em {host}: {erro}")
+        if status:
+            raise RuntimeError(f"Erro SNMP em {host}: {status.prettyPrint()}")
+        for nome, valor in binds:
+            indice = tuple(nome)[len(prefixo):]
+            resultado[indice] = valor
+    return resultado
+
+def decodificar_data(valor):
+    """
+    Converte DateAndTime (octet string de 8/11 bytes) ou texto 'YYYY-MM-DD ...' em date.
+    Retorna None para valores vazios ou zerados (ONU sem horário de queda)
+    """
+    bruto = bytes(valor.asOctets()) if hasattr(valor, "asOctets") else valor
+    if isinstance(bruto, (bytes, bytearray)) and len(bruto) in (8, 11):
+        ano, mes, dia = struct.unpack(">HBB", bruto[:4])
+        if ano == 0 or mes == 0 or dia == 0:
+            return None
+        return date(ano, mes, dia)
+
+    texto = bruto.decode("utf-8", errors="ignore") if isinstance(bruto, (bytes, bytearray)) else str(bruto)
+    match = re.search(r'(\d{4})-(\d{2})-(\d{2})', texto)
+    if not match or match.group(1) == "0000":
+        return None
+    return date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+
+def decodificar_serial(valor):
+    """
+    Serial como texto: Huawei/ZTE retornam 8 bytes (4 de vendor id + 4 em hexa)
+    """
+    bruto = bytes(valor.asOctets()) if hasattr(valor, "asOctets") else valor
+    if isinstance(bruto, (bytes, bytearray)):
+        if len(bruto) == 8 and bruto[:4].isalpha():
+            return bruto[:4].decode() + bruto[4:].hex().upper()
+        if all(32 <= b < 127 for b in bruto):
+            return bruto.decode()
+        return bruto.hex().upper()
+    return str(bruto)
+
+def pon_huawei(if_index):
+    # ifIndex GPON Huawei: 0xFA000000 + slot * 8192 + pon * 256 (frame 0)
+    deslocamento = if_index - 0xFA000000
+    return 0, deslocamento // 8192, (deslocamento % 8192) // 256
+
+def pon_zte(if_index):
+    # ifIndex gpon_olt ZTE: tipo(4 bits) | shelf-1 (4) | slot (8) | pon (8) | 0 (8)
+    return ((if_index >> 24) & 0x0F) + 1, (if_index >> 16) & 0xFF, (if_index >> 8) & 0xFF
+
+def onu_fiberhome(onu_index):
+    # onuIndex Fiberhome: slot * 2^25 + pon * 2^19 + onu * 2^8
+    return onu_index >> 25, (onu_index >> 19) & 0x3F, (onu_index >> 8) & 0x7FF
+
+def walk_data_olt(host):
+    """
+    Walk do hrSystemDate da OLT; vazio se a OLT não tem o objeto
+    """
+    try:
+        return walk(host, OID_DATA_OLT)
+    except RuntimeError:
+        return {}
+
+def coletar_colunas(host, fabricante):
+    """
+    Coleta as colunas de estado, serial e última queda (e admin, se houver) de uma OLT,
+    mais a data da OLT em "data"
+    """
+    oids = OIDS[fabricante]
+    colunas = {coluna: walk(host, oid) for coluna, oid in oids.items()}
+    colunas["data"] = walk_data_olt(host)
+    return colunas
+
+def data_da_olt(colunas):
+    """
+    Data da OLT coletada (hrSystemDate) ou None
+    """
+    valor = colunas.get("data", {}).get((0,))
+    return decodificar_data(valor) if valor is not None else None
+
+def onus_offline(colunas, fabricante, data_referencia):
+    """
+    Cruza as colunas pelo índice e retorna [(indice, serial, data_queda, dias_offline)]
+    das ONUs offline. data_queda/dias_offline são None quando a OLT não informa a queda.
+    ONUs sem serial (não há como deletar pela whitelist nem identificar no log) e, com a
+    coluna admin, as desativadas ficam de fora
+    """
+    offline = []
+    estados_offline = ESTADOS_OFFLINE[fabricante]
+    admin = colunas.get("admin")
+    admin_ativo = ADMIN_ATIVO.get(fabricante)
+    for indice, estado in colunas["estado"].items():
+        if int(estado) not in estados_offline:
+            continue
+        if admin is not None and admin_ativo and int(admin.get(indice, 0)) not in admin_ativo:
+            continue
+        serial = colunas["serial"].get(indice)
+        serial = decodificar_serial(serial) if serial is not None else ""
+        if not serial.strip():
+            continue
+        queda = colunas["ultima_queda"].get(indice)
+        data_queda = decodificar_data(queda) if queda is not None else None
+        dias = (data_referencia - data_queda).days if data_queda else None
+        offline.append((indice, serial, data_queda, dias))
+    return offline
+
+def candidatos(colunas, fabricante, politica, data_referencia=None, host=""):
+    """
+    Monta as ONUs offline (CandidatosONU) como na descoberta via CLI do fabricante e aplica
+    a política de retenção. Huawei vem sem service-port (removidos por ONT na deleção);
+    Fiberhome sem chassi. data_referencia: data da OLT; sem ela, a coletada (hrSystemDate)
+    ou a do servidor. Retorna a Avaliacao da política
+    """
+    data_referencia = data_referencia or data_da_olt(colunas) or date.today()
+    offline = CandidatosONU(fabricante, host)
+
+    for indice, serial, data_queda, _ in onus_offline(colunas, fabricante, data_referencia):
+        if fabricante == "huawei":
+            chassi_id, slot_id, pon_id = pon_huawei(indice[0])
+            offline.adicionar(chassi_id, slot_id, pon_id, indice[1], serial, ultima_queda=data_queda)
+        elif fabricante == "zte":
+            chassi_id, slot_id, pon_id = pon_zte(indice[0])
+            offline.adicionar(chassi_id, slot_id, pon_id, indice[1], serial, ultima_queda=data_queda)
+        else:
+            slot, pon, onu = onu_fiberhome(indice[0])
+            offline.adicionar(0, slot, pon, onu, serial, ultima_queda=data_queda, status='normal')
+
+    return avaliar(offline, data_referencia, politica)
+
+def coletar_candidatos(host, fabricante, politica):
+    """
+    Descoberta via SNMP (GETBULK) de uma OLT, sem sessão SSH
+    """
+    return candidatos(coletar_colunas(host, fabricante), fabricante, politica, host=host)
+
+def gravar_snmprec(host, fabricante, path):
+    """
+    Grava as colunas usadas na descoberta no formato .snmprec do snmpsim, para
+    reproduzir a OLT num simulador local (OID|tipo|valor, octet strings em hexa)
+    """
+    linhas = []
+    colunas = [(oid, walk(host, oid)) for oid in OIDS[fabricante].values()]
+    colunas.append((OID_DATA_OLT, walk_data_olt(host)))
+    for oid, valores in colunas:
+        for indice, valor in valores.items():
+            oid_completo = ".".join([oid] + [str(x) for x in indice])
+            if hasattr(valor, "asOctets"):
+                linhas.append((oid_completo, f"{oid_completo}|4x|{bytes(valor.asOctets()).hex()}"))
+            else:
+                linhas.append((oid_completo, f"{oid_completo}|2|{int(valor)}"))
+
+    linhas.sort(key=lambda item: tuple(int(x) for x in item[0].split('.')))
+    with open(path, "w", encoding="utf-8") as arquivo:
+        arquivo.write("\n".join(linha for _, linha in linhas) + "\n")
+    return len(linhas)
+
+def ler_snmprec(path, fabricante):
+    """
+    Lê uma gravação .snmprec (gravar_snmprec) nas mesmas colunas de coletar_colunas,
+    para rodar candidatos() sobre a OLT gravada sem simulador
+    """
+    prefixos = [(coluna, tuple(int(x) for x in oid.split('.'))) for coluna, oid in OIDS[fabricante].items()]
+    prefixos.append(("data", tuple(int(x) for x in OID_DATA_OLT.split('.'))))
+    colunas = {coluna: {} for coluna, _ in prefixos}
+    with open(path, "r", encoding="utf-8") as arquivo:
+        for linha in arquivo:
+            if not linha.strip():
+                continue
+            oid, tipo, valor = linha.rstrip("\n").split("|", 2)
+            numeros = tuple(int(x) for x in oid.split('.'))
+            if tipo == "4x":
+                valor = bytes.fromhex(valor)
+            elif tipo == "4":
+                valor = valor.encode("utf-8")
+            else:
+                valor = int(valor)
+            for coluna, prefixo in prefixos:
+                if numeros[:len(prefixo)] == prefixo:
+                    colunas[coluna][numeros[len(prefixo):]] = valor
+                    break
+    return colunas
@@ -0,0 +1,138 @@
+import re
+import sys
+from bisect import bisect_left
+from operator import itemgetter
+
+# Leitura de tabelas da CLI. Com cabeçalho + linha tracejada, as colunas são fatiadas
+# pelos offsets calculados uma única vez; sem cabeçalho (ex: saída filtrada com include),
+# cada layout usa um único regex pré-compilado aplicado ao texto inteiro
+
+# Linha tracejada (---- --- --- ou contínua); o cabeçalho é a linha anterior a ela
+_SEPARADOR = re.compile(r'[ \t]*-{2,}(?:[ \t]+-{2,})*[ \t\r]*$')
+_GRUPOS = re.compile(r'-{2,}')
+# Colunas do cabeçalho: palavras separadas por um único espaço pertencem à mesma coluna
+_COLUNAS_CABECALHO = re.compile(r'\S+(?: \S+)*')
+
+class TabelaFixa:
+    """
+    Tabela de largura fixa: inicios são os offsets de cada coluna (a última vai até o fim da linha)
+    """
+
+    def __init__(self, inicios, nomes=None):
+        self.inicios = list(inicios)
+        self.nomes = nomes or []
+
+    @classmethod
+    def detectar(cls, texto):
+        """
+        Procura o cabeçalho seguido de linha tracejada. Os offsets vêm dos grupos de
+        traços (---- --- ---) ou, com uma linha contínua, das colunas do cabeçalho.
+        Retorna (tabela, posição do texto onde começam as linhas) ou (None, 0)
+        """
+        posicao = texto.find('--')
+        while posicao != -1:
+            inicio_linha = texto.rfind('\n', 0, posicao) + 1
+            fim_linha = texto.find('\n', posicao)
+            fim_linha = len(texto) if fim_linha == -1 else fim_linha
+            separador = texto[inicio_linha:fim_linha]
+            cabecalho = texto[texto.rfind('\n', 0, max(inicio_linha - 1, 0)) + 1:max(inicio_linha - 1, 0)].rstrip('\r')
+            if inicio_linha == 0 or not _SEPARADOR.match(separador) or not cabecalho.strip() or _SEPARADOR.match(cabecalho):
+                posicao = texto.find('--', fim_linha)
+                continue
+            grupos = [m.start() for m in _GRUPOS.finditer(separador)]
+            if len(grupos) < 2:
+                grupos = [m.start() for m in _COLUNAS_CABECALHO.finditer(cabecalho)]
+            if len(grupos) >= 2:
+                fins = grupos[1:] + [None]
+                nomes = [cabecalho[a:b].strip() for a, b in zip(grupos, fins)]
+                return cls(grupos, nomes), fim_linha + 1
+            # Cabeçalho de uma coluna só (banner, bloco de erro): segue para o próximo tracejado
+            posicao = texto.find('--', fim_linha)
+        return None, 0
+
+    def registros(self, texto, colunas=None, inicio=0, contem=None, sem=None):
+        """
+        Tuplas (geradas sob demanda, sem montar a lista) com os valores (sem espaços) das colunas
+        pedidas (índices), a partir de inicio.
+        contem/sem: texto que a linha precisa ter / não pode ter (filtro antes de ler as colunas).
+        Linhas em que cada coluna preenchida é uma palavra saem do split(); as demais (célula
+        vazia, valor com espaço) são fatiadas pelos offsets. Separadores e linhas que não chegam
+        à primeira coluna pedida são ignorados
+        """
+        colunas = list(range(len(self.inicios))) if colunas is None else list(colunas)
+        fins = self.inicios[1:] + [None]
+        fatiar = itemgetter(*[slice(self.inicios[c], fins[c]) for c in colunas])
+        pegar = itemgetter(*colunas)
+        if len(colunas) == 1:
+            fatiar_um, pegar_um = fatiar, pegar
+            fatiar = lambda linha: (fatiar_um(linha),)
+            pegar = lambda partes: (pegar_um(partes),)
+        inicios = self.inicios
+        maior = max(colunas)
+        total = len(inicios)
+        # Linha com n palavras que termina dentro da coluna n: uma palavra por coluna preenchida
+        limites = inicios[1:] + [sys.maxsize]
+        strip = str.strip
+
+        for linha in _linhas(texto[inicio:], contem, sem):
+            partes = linha.split()
+            n = len(partes)
+            if maior < n <= total and inicios[n - 1] < len(linha) <= limites[n - 1] and partes[0][:2] != '--':
+                yield pegar(partes)
+            elif not partes or partes[0].startswith('--') or len(linha) <= inicios[colunas[0]]:
+                continue
+            elif n > maior and n == bisect_left(inicios, len(linha.rstrip())):
+                # Espaços no fim da linha
+                yield pegar(partes)
+            else:
+                yield tuple(map(strip, fatiar(linha)))
+
+class TabelaRegex:
+    """
+    Layout sem cabeçalho: um regex (MULTILINE) por linha de dados, cada grupo é uma coluna
+    """
+
+    def __init__(self, padrao):
+        self.regex = re.compile(padrao, re.MULTILINE)
+
+    def registros(self, texto, contem=None, sem=None):
+        if contem is None and sem is None:
+            return [match.groups() for match in self.regex.finditer(texto)]
+
+        # Com filtro: só as linhas selecionadas passam pelo regex
+        casamentos = map(self.regex.match, _linhas(texto, contem, sem))
+        return [match.groups() for match in casamentos if match]
+
+def _linhas(texto, contem, sem):
+    """
+    Linhas que contêm contem e não contêm sem. Só com contem, as linhas são localizadas
+    com str.find no texto inteiro (sem quebrar as demais linhas)
+    """
+    if contem is not None and sem is None:
+        linhas = []
+        find, rfind = texto.find, texto.rfind
+        posicao = find(contem)
+        while posicao != -1:
+            fim = find('\n', posicao)
+            fim = len(texto) if fim == -1 else fim
+            linhas.append(texto[rfind('\n', 0, posicao) + 1:fim].rstrip('\r'))
+            posicao = find(contem, fim)
+        return linhas
+
+    linhas = texto.splitlines()
+    if contem is not None:
+        return [linha for linha in linhas if sem not in linha and contem in linha]
+    if sem is not None:
+        return [linha for linha in linhas if sem not in linha]
+    return linhas
+
+def registros(texto, colunas, alternativa, contem=None, sem=None):
+    """
+    Registros de uma tabela: colunas (índices) por offset quando houver cabeçalho e
+    linha tracejada; senão o layout regex alternativo, com os grupos na mesma ordem.
+    contem/sem filtram as linhas antes da leitura das colunas
+    """
+    tabela, inicio = TabelaFixa.detectar(texto)
+    if tabela is None:
+        return alternativa.registros(texto, contem, sem)
+    return tabela.registros(texto, colunas, inicio, contem, sem)
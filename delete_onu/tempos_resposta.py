@@ -0,0 +1,132 @@
+import json
+import os
+import time
+
+from sessao_cli import limpar_saida, termina_em_prompt
+from metricas import observar_latencia
+from ociosidade import LockMedido
+
+# Histórico de tempos de resposta por (fabricante, equipamento, comando). O timeout de
+# cada comando passa a ser um percentil alto do histórico, no lugar das esperas fixas
+PERCENTIL = 95
+MARGEM = 1.5            # folga sobre o percentil
+MINIMO_AMOSTRAS = 5     # abaixo disso vale a espera padrão do comando
+MAXIMO_AMOSTRAS = 50    # amostras mais recentes mantidas por chave
+PISO = 1.0              # segundos
+SILENCIO = 0.5          # sem dados por este tempo após o orçamento: saída considerada completa
+FATOR_TETO = 4          # limite absoluto: FATOR_TETO x espera padrão
+ESPERA_CONFIGURACAO = 2  # segundos, espera padrão pela resposta de um comando de deleção
+
+# "fabricante|equipamento|comando" -> [segundos]
+historico = {}
+
+# Lock para o histórico (thread-safe)
+tempos_lock = LockMedido()
+
+def _chave(shell, comando):
+    return f"{shell.perfil.fabricante}|{shell.equipamento or 'desconhecido'}|{comando}"
+
+def carregar_tempos(path):
+    """
+    Lê o histórico salvo (mescla no histórico em memória)
+    """
+    if not os.path.exists(path):
+        return
+    try:
+        with open(path, "r", encoding="utf-8") as arquivo:
+            salvo = json.load(arquivo)
+    except (OSError, ValueError):
+        return
+    with tempos_lock:
+        for chave, amostras in salvo.items():
+            historico[chave] = (amostras + historico.get(chave, []))[-MAXIMO_AMOSTRAS:]
+
+def salvar_tempos(path):
+    """
+    Grava o histórico de forma atômica (arquivo temporário + rename)
+    """
+    with tempos_lock:
+        copia = {chave: list(amostras) for chave, amostras in historico.items()}
+    path_tmp = f"{path}.tmp"
+    with open(path_tmp, "w", encoding="utf-8") as arquivo:
+        json.dump(copia, arquivo, indent=2, sort_keys=True)
+    os.replace(path_tmp, path)
+
+def registrar_tempo(shell, comando, segundos):
+    with tempos_lock:
+        amostras = historico.setdefault(_chave(shell, comando), [])
+        amostras.append(round(segundos, 3))
+        del amostras[:-MAXIMO_AMOSTRAS]
+    observar_latencia(comando, segundos)
+
+def percentil(amostras, p=PERCENTIL):
+    ordenadas = sorted(amostras)
+    indice = min(len(ordenadas) - 1, max(0, int(round(p / 100 * len(ordenadas))) - 1))
+    return ordenadas[indice]
+
+def orcamento(shell, comando, padrao):
+    """
+    Timeout do comando: percentil do histórico com margem, ou a espera padrão sem histórico suficiente
+    """
+    with tempos_lock:
+        amostras = list(historico.get(_chave(shell, comando), []))
+    if len(amostras) < MINIMO_AMOSTRAS:
+        return padrao
+    return max(PISO, percentil(amostras) * MARGEM)
+
+def ler_ate_prompt(shell, comando, padrao, buffer_size=65535, nome=None):
+    """
+    Lê a saída de um comando já enviado até o prompt voltar, registrando o tempo observado.
+    comando é o início do comando enviado (reconhece o eco e identifica o histórico; com
+    nome, o histórico fica em nome, ex: comandos com o índice da ONU).
+    Esgotado o orçamento, continua lendo enquanto ainda chegam dados (até o teto), para
+    não truncar a saída de equipamentos mais lentos que o histórico
+    """
+    nome = nome or comando
+    limite = orcamento(shell, nome, padrao)
+    teto = max(limite, padrao * FATOR_TETO)
+    padrao_prompt = shell.perfil.padrao_prompt
+
+    inicio = time.monotonic()
+    ultimo_dado = inicio
+    output = ""
+    eco = False
+    while time.monotonic() - inicio < teto:
+        if shell.recv_ready():
+            output += shell.recv(buffer_size).decode("utf-8", errors="ignore")
+            ultimo_dado = time.monotonic()
+            # Só vale o prompt depois do eco do comando (ignora restos de comandos anteriores)
+            eco = eco or comando in limpar_saida(output)
+            if eco and termina_em_prompt(limpar_saida(output[-512:]), padrao_prompt):
+                break
+        elif time.monotonic() - inicio >= limite and time.monotonic() - ultimo_dado >= SILENCIO:
+            break
+        else:
+            time.sleep(0.05)
+
+    if output:
+        registrar_tempo(shell, nome, ultimo_dado - inicio)
+        # Sessões CLI ajustam o próprio ritmo pela latência (canais crus não têm ritmo)
+        ritmo = getattr(shell, "ritmo", None)
+        if ritmo is not None:
+            ritmo.observar(nome, ultimo_dado - inicio)
+
+    # Restos logo após o prompt (ex: prompt extra de um ENTER adicional)
+    time.sleep(0.2)
+    while shell.recv_ready():
+        output += shell.recv(buffer_size).decode("utf-8", errors="ignore")
+    return output
+
+def aguardar_comando(shell, comando, nome, pausa):
+    """
+    No lugar da pausa fixa depois de um comando de deleção: lê a resposta até o prompt
+    (tempo observado vai para o histórico e para o ritmo da OLT, em nome) e completa o
+    intervalo atual entre comandos da sessão. pausa é o intervalo inicial do fabricante
+    """
+    inicio = time.monotonic()
+    ler_ate_prompt(shell, comando, ESPERA_CONFIGURACAO, nome=nome)
+    ritmo = getattr(shell, "ritmo", None)
+    intervalo = ritmo.intervalo_atual(pausa) if ritmo is not None else pausa
+    restante = intervalo - (time.monotonic() - inicio)
+    if restante > 0:
+        time.sleep(restante)
@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+
+from fila import FilaOLTs, PENDENTE, EM_ANDAMENTO, CONCLUIDA, FALHA, MAX_TENTATIVAS
+from resultado_olt import SUCESSO, ERRO
+
+# Leases da fila de trabalho (modos queue e worker). Lease negativo = já vencido na próxima
+# operação. Uso: python -m unittest test_fila (no diretório delete_onu)
+
+class TestFilaOLTs(unittest.TestCase):
+
+    def setUp(self):
+        diretorio = tempfile.TemporaryDirectory()
+        self.addCleanup(diretorio.cleanup)
+        self.fila = FilaOLTs(os.path.join(diretorio.name, "fila_teste.db"))
+        self.fila.enfileirar(["10.0.0.1", "10.0.0.2"])
+
+    def estado(self, host):
+        return {linha[0]: linha[1] for linha in self.fila.resultados()}[host]
+
+    def test_pegar_na_ordem_da_fila(self):
+        self.assertEqual(self.fila.pegar("w1"), ("10.0.0.1", "delete"))
+        self.assertEqual(self.fila.pegar("w2"), ("10.0.0.2", "delete"))
+        self.assertIsNone(self.fila.pegar("w3"))
+        contagem, workers = self.fila.contagem()
+        self.assertEqual(contagem[EM_ANDAMENTO], 2)
+        self.assertEqual(workers, 2)
+
+    def test_lease_vencido_volta_para_pendente(self):
+        self.fila.pegar("w1", lease=-1)
+        self.assertEqual(self.fila.devolver_expirados(), 1)
+        self.assertEqual(self.estado("10.0.0.1"), PENDENTE)
+        # Outro worker pega a OLT de volta
+        self.assertEqual(self.fila.pegar("w2"), ("10.0.0.1", "delete"))
+
+    def test_falha_depois_de_max_tentativas(self):
+        for tentativa in range(1, MAX_TENTATIVAS + 1):
+            self.assertEqual(self.fila.pegar("w1", lease=-1)[0], "10.0.0.1")
+            self.fila.devolver_expirados()
+            if tentativa < MAX_TENTATIVAS:
+                self.assertEqual(self.estado("10.0.0.1"), PENDENTE)
+        self.assertEqual(self.estado("10.0.0.1"), FALHA)
+        registro = {linha[0]: linha[2] for linha in self.fila.resultados()}["10.0.0.1"]
+        self.assertEqual(registro["status"], ERRO)
+        self.assertIn(f"{MAX_TENTATIVAS} vezes", registro["mensagem"])
+        # A OLT que falhou não volta para a fila
+        self.assertEqual(self.fila.pegar("w1")[0], "10.0.0.2")
+
+    def test_renovar_retorna_leases_perdidos(self):
+        self.fila.pegar("w1")
+        self.fila.pegar("w2")
+        self.assertEqual(self.fila.renovar("w1", ["10.0.0.1", "10.0.0.2"]), ["10.0.0.2"])
+
+    def test_renovar_estende_o_lease(self):
+        self.fila.pegar("w1", lease=-1)
+        self.assertEqual(self.fila.renovar("w1", ["10.0.0.1"]), [])
+        self.assertEqual(self.fila.devolver_expirados(), 0)
+        self.assertEqual(self.estado("10.0.0.1"), EM_ANDAMENTO)
+
+    def test_concluir(self):
+        self.fila.pegar("w1")
+        self.fila.pegar("w1")
+        self.assertTrue(self.fila.concluir("10.0.0.1", "w1", {"status": SUCESSO, "deletadas": 3}))
+        self.assertTrue(self.fila.concluir("10.0.0.2", "w1", {"status": ERRO, "mensagem": "timeout"}))
+        self.assertEqual(self.estado("10.0.0.1"), CONCLUIDA)
+        self.assertEqual(self.estado("10.0.0.2"), FALHA)
+        self.assertTrue(self.fila.terminada())
+
+    def test_concluir_com_lease_perdido(self):
+        # w1 travou, o lease venceu e w2 pegou a OLT: o ack atrasado de w1 é recusado
+        self.fila.pegar("w1", lease=-1)
+        self.fila.devolver_expirados()
+        self.fila.pegar("w2")
+        self.assertFalse(self.fila.concluir("10.0.0.1", "w1", {"status": SUCESSO, "deletadas": 3}))
+        self.assertEqual(self.estado("10.0.0.1"), EM_ANDAMENTO)
+        self.assertTrue(self.fila.concluir("10.0.0.1", "w2", {"status": SUCESSO, "deletadas": 1}))
+        registro = {linha[0]: linha[2] for linha in self.fila.resultados()}["10.0.0.1"]
+        self.assertEqual(registro["deletadas"], 1)
+
+    def test_enfileirar_descarta_a_fila_anterior(self):
+        self.fila.pegar("w1")
+        self.fila.enfileirar(["10.0.0.3"], modo="dry-run")
+        self.assertEqual(self.fila.pegar("w1"), ("10.0.0.3", "dry-run"))
+        self.assertEqual([linha[0] for linha in self.fila.resultados()], ["10.0.0.3"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import os
+import tempfile
+import unittest
+
+from particao import particao_do_host, hosts_da_particao, caminho_resultados, escrever_resultados, mesclar_resultados
+from resultado_olt import ResultadoOLT, DELETADAS, SEM_QUEDA, ERRO, ADIADA
+
+# Divisão da frota (--shard i/N) e modo merge. Uso: python -m unittest test_particao
+# (no diretório delete_onu)
+
+HOSTS = [f"10.{i // 250}.{i % 250}.1" for i in range(2000)]
+
+def resultado(host, deletadas=0, sem_queda=0, erro=None, adiada=None):
+    resultado = ResultadoOLT(host, 1)
+    resultado.deletadas = deletadas
+    resultado.sem_queda = sem_queda
+    if erro:
+        resultado.falhar(erro)
+    if adiada:
+        resultado.adiar(adiada)
+    return resultado
+
+class TestParticaoDoHost(unittest.TestCase):
+
+    def test_cada_host_em_uma_particao(self):
+        total = 4
+        particoes = [hosts_da_particao(HOSTS, indice, total) for indice in range(1, total + 1)]
+        self.assertEqual(sorted(host for particao in particoes for host in particao), sorted(HOSTS))
+        for particao in particoes:
+            # Divisão equilibrada: cada partição perto de 1/N da frota
+            self.assertAlmostEqual(len(particao) / len(HOSTS), 1 / total, delta=0.05)
+
+    def test_nova_particao_move_so_1_de_n(self):
+        for total in (1, 2, 4, 7):
+            with self.subTest(total=total):
+                movidos = [host for host in HOSTS if particao_do_host(host, total) != particao_do_host(host, total + 1)]
+                # Só saem OLTs para a partição nova, cerca de 1/(N+1) da frota
+                self.assertEqual({particao_do_host(host, total + 1) for host in movidos}, {total + 1})
+                self.assertAlmostEqual(len(movidos) / len(HOSTS), 1 / (total + 1), delta=0.05)
+
+    def test_mesma_divisao_em_qualquer_ordem(self):
+        self.assertEqual(sorted(hosts_da_particao(list(reversed(HOSTS)), 2, 3)), sorted(hosts_da_particao(HOSTS, 2, 3)))
+
+class TestMesclarResultados(unittest.TestCase):
+
+    def setUp(self):
+        diretorio = tempfile.TemporaryDirectory()
+        self.addCleanup(diretorio.cleanup)
+        self.base = os.path.join(diretorio.name, "resultado_zte")
+
+    def gravar(self, indice, total, resultados, fabricante="zte", path=None):
+        path = path or caminho_resultados(self.base, indice, total)
+        escrever_resultados(path, fabricante, indice, total, resultados)
+        return path
+
+    def test_soma_das_particoes(self):
+        paths = [
+            self.gravar(1, 2, [resultado("10.0.0.1", 3, 1), resultado("10.0.0.2", erro="timeout")]),
+            self.gravar(2, 2, [resultado("10.0.0.3", 5, 2), resultado("10.0.0.4", adiada="fora da janela")]),
+        ]
+        olts, totais, avisos = mesclar_resultados(paths, "zte")
+        self.assertEqual(sorted(olts), ["10.0.0.1", "10.0.0.2", "10.0.0.3", "10.0.0.4"])
+        self.assertEqual(totais, {DELETADAS: 8, SEM_QUEDA: 3, ERRO: 1, ADIADA: 1})
+        self.assertEqual(len(avisos), 2)
+        self.assertTrue(avisos[0].startswith("OLT 10.0.0.2 com erro na partição 1/2"))
+        self.assertEqual(avisos[1], "OLT 10.0.0.4 adiada na partição 2/2: fora da janela")
+
+    def test_particao_faltando(self):
+        paths = [self.gravar(1, 3, [resultado("10.0.0.1", 1)]), self.gravar(3, 3, [resultado("10.0.0.3", 1)])]
+        _, totais, avisos = mesclar_resultados(paths, "zte")
+        self.assertEqual(totais[DELETADAS], 2)
+        self.assertEqual(avisos, ["Partições sem resultado: 2/3"])
+
+    def test_particao_repetida(self):
+        copia = self.gravar(1, 2, [resultado("10.0.0.1", 4)], path=f"{self.base}_copia_1de2.jsonl")
+        paths = [self.gravar(1, 2, [resultado("10.0.0.1", 4)]), copia, self.gravar(2, 2, [resultado("10.0.0.2", 1)])]
+        olts, totais, avisos = mesclar_resultados(paths, "zte")
+        # A OLT repetida conta uma vez só
+        self.assertEqual(totais[DELETADAS], 5)
+        self.assertEqual(len(olts), 2)
+        self.assertTrue(any(aviso.startswith("OLT 10.0.0.1 nas partições 1/2 e 1/2") for aviso in avisos))
+        self.assertTrue(any(aviso.startswith("Partição 1/2 em mais de um arquivo") for aviso in avisos))
+
+    def test_divisoes_diferentes_e_outro_fabricante(self):
+        paths = [self.gravar(1, 1, [resultado("10.0.0.1", 1)]), self.gravar(1, 2, [resultado("10.0.0.2", 1)]),
+                 self.gravar(2, 2, [resultado("10.0.0.3", 1)], fabricante="huawei")]
+        olts, totais, avisos = mesclar_resultados(paths, "zte")
+        self.assertEqual(sorted(olts), ["10.0.0.1", "10.0.0.2"])
+        self.assertEqual(totais[DELETADAS], 2)
+        self.assertTrue(any("resultado de huawei, ignorado" in aviso for aviso in avisos))
+        self.assertIn("Arquivos de divisões diferentes da frota (N = 1, 2)", avisos)
+        self.assertIn("Partições sem resultado: 2/2", avisos)
+
+    def test_sem_arquivos(self):
+        self.assertEqual(mesclar_resultados([], "zte")[2], ["Nenhum arquivo de resultado de partição"])
+
+if __name__ == "__main__":
+    unittest.main()
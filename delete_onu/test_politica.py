@@ -0,0 +1,95 @@
+import unittest
+from datetime import date, timedelta
+
+import politica
+from politica import Politica, avaliar, carregar_politica, DELETAR
+from registro_onu import CandidatosONU
+
+# Política de retenção, nos dois caminhos de avaliar(): com numpy (se instalado) e sem numpy.
+# Uso: python -m unittest test_politica (no diretório delete_onu)
+
+HOJE = date(2025, 10, 19)
+
+def offline(host, *onus):
+    """
+    CandidatosONU com (serial, dias desde a queda ou None = sem data de queda) por ONU
+    """
+    candidatos = CandidatosONU("zte", host)
+    for i, (serial, dias) in enumerate(onus, 1):
+        candidatos.adicionar(1, 1, 1, i, serial=serial, ultima_queda=None if dias is None else HOJE - timedelta(days=dias))
+    return candidatos
+
+class TestAvaliar(unittest.TestCase):
+
+    # numpy usado por avaliar() em cada teste (False = caminho sem numpy)
+    NUMPY = False
+
+    def setUp(self):
+        anterior = politica._modulo_numpy
+        self.addCleanup(setattr, politica, "_modulo_numpy", anterior)
+        politica._modulo_numpy = self.NUMPY
+
+    def test_limite_padrao(self):
+        avaliacao = avaliar(offline("10.0.0.1", ("A", 50), ("B", 45), ("C", 44), ("D", 10)), HOJE, Politica(45))
+        self.assertEqual([onu.serial for onu in avaliacao.candidatas], ["A", "B"])
+        self.assertEqual(list(avaliacao.candidatas.dias_offline), [50, 45])
+        self.assertEqual(avaliacao.aguardando, 2)
+        self.assertEqual(avaliacao.avaliadas, 4)
+        # A próxima a vencer é a queda mais antiga abaixo do limite (C, daqui a 1 dia)
+        self.assertEqual(avaliacao.proxima_delecao, HOJE + timedelta(days=1))
+
+    def test_limite_por_olt(self):
+        regra = Politica(45, por_olt={"10.0.0.2": 60})
+        onus = (("A", 50), ("B", 70))
+        self.assertEqual([onu.serial for onu in avaliar(offline("10.0.0.1", *onus), HOJE, regra).candidatas], ["A", "B"])
+        avaliacao = avaliar(offline("10.0.0.2", *onus), HOJE, regra)
+        self.assertEqual([onu.serial for onu in avaliacao.candidatas], ["B"])
+        self.assertEqual(avaliacao.proxima_delecao, HOJE + timedelta(days=10))
+
+    def test_seriais_mantidos(self):
+        regra = Politica(45, seriais_mantidos=["A", "C"])
+        avaliacao = avaliar(offline("10.0.0.1", ("A", 90), ("B", 90), ("C", None), ("D", 5)), HOJE, regra)
+        self.assertEqual([onu.serial for onu in avaliacao.candidatas], ["B"])
+        self.assertEqual(avaliacao.mantidas, 2)
+        # ONU mantida não conta como sem data de queda nem como aguardando
+        self.assertEqual(avaliacao.sem_queda, 0)
+        self.assertEqual(avaliacao.aguardando, 1)
+
+    def test_nunca_online_manter(self):
+        avaliacao = avaliar(offline("10.0.0.1", ("A", None), ("B", 60)), HOJE, Politica(45))
+        self.assertEqual([onu.serial for onu in avaliacao.candidatas], ["B"])
+        self.assertEqual(avaliacao.sem_queda, 1)
+
+    def test_nunca_online_deletar(self):
+        avaliacao = avaliar(offline("10.0.0.1", ("A", None), ("B", 60), ("C", 1)), HOJE, Politica(45, nunca_online=DELETAR))
+        self.assertEqual([onu.serial for onu in avaliacao.candidatas], ["A", "B"])
+        self.assertEqual([onu.dias_offline for onu in avaliacao.candidatas], [None, 60])
+        self.assertEqual(avaliacao.sem_queda, 1)
+        self.assertIsNone(avaliacao.candidatas[0].ultima_queda)
+
+    def test_sem_onus(self):
+        avaliacao = avaliar(offline("10.0.0.1"), HOJE, Politica(45))
+        self.assertEqual(len(avaliacao.candidatas), 0)
+        self.assertIsNone(avaliacao.proxima_delecao)
+
+    def test_nunca_online_invalido(self):
+        with self.assertRaises(ValueError):
+            Politica(45, nunca_online="apagar")
+
+class TestAvaliarNumpy(TestAvaliar):
+
+    NUMPY = politica._numpy()
+
+    def setUp(self):
+        if not self.NUMPY:
+            self.skipTest("numpy não instalado")
+        super().setUp()
+
+class TestCarregarPolitica(unittest.TestCase):
+
+    def test_sem_arquivo(self):
+        regra = carregar_politica("/nao/existe/politica_zte.json", 45)
+        self.assertEqual((regra.qtd_dias, regra.por_olt, regra.seriais_mantidos), (45, {}, frozenset()))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import os
+import unittest
+from datetime import date
+
+try:
+    from snmp_backend import candidatos, ler_snmprec
+except ImportError as erro:  # dependências dos scripts (python-dotenv) ausentes
+    raise unittest.SkipTest(f"snmp_backend indisponível: {erro}")
+from politica import Politica
+
+# candidatos() sobre OLTs gravadas com gravar_snmprec (snmprec/*.snmprec), sem pysnmp nem
+# simulador. Uso: python -m unittest test_snmp_backend (no diretório delete_onu)
+
+GRAVACOES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "snmprec")
+
+def gravacao(fabricante):
+    return ler_snmprec(os.path.join(GRAVACOES, f"{fabricante}_olt.snmprec"), fabricante)
+
+class TestCandidatosZTE(unittest.TestCase):
+    # gpon_olt-1/2/3: 1 vencida, 2 desativada, 3 working, 4 sem serial, 5 sem data de queda,
+    # 6 caiu há 18 dias. hrSystemDate da OLT: 2025-10-19
+
+    def test_data_da_olt_e_filtros(self):
+        avaliacao = candidatos(gravacao("zte"), "zte", Politica(45), host="olt")
+        self.assertEqual([(onu.chassi, onu.slot, onu.pon, onu.onu, onu.serial) for onu in avaliacao.candidatas],
+                         [(1, 2, 3, 1, "ZTEG00000001")])
+        self.assertEqual(avaliacao.candidatas[0].dias_offline, (date(2025, 10, 19) - date(2024, 1, 10)).days)
+        self.assertEqual(avaliacao.avaliadas, 3)
+        self.assertEqual(avaliacao.sem_queda, 1)
+        self.assertEqual(avaliacao.aguardando, 1)
+        self.assertEqual(avaliacao.proxima_delecao, date(2025, 11, 15))
+
+    def test_nunca_online_deletar(self):
+        avaliacao = candidatos(gravacao("zte"), "zte", Politica(45, nunca_online="deletar"), host="olt")
+        self.assertEqual(sorted(onu.onu for onu in avaliacao.candidatas), [1, 5])
+
+class TestCandidatosFiberhome(unittest.TestCase):
+    # Sem hrSystemDate na gravação: a data de referência vem de quem chama
+
+    def test_sem_serial_fica_de_fora(self):
+        avaliacao = candidatos(gravacao("fiberhome"), "fiberhome", Politica(45), date(2025, 10, 19), host="olt")
+        self.assertEqual([(onu.slot, onu.pon, onu.onu, onu.serial) for onu in avaliacao.candidatas],
+                         [(1, 1, 1, "FHTT00000001")])
+        self.assertEqual(avaliacao.sem_queda, 1)
+        self.assertTrue(all(onu.serial for onu in avaliacao.candidatas))
+
+if __name__ == "__main__":
+    unittest.main()
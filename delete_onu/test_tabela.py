@@ -0,0 +1,73 @@
+import threading
+import unittest
+
+from tabela import TabelaFixa, TabelaRegex, registros
+
+# Regressões do leitor de tabelas. Uso: python -m unittest test_tabela (no diretório delete_onu)
+
+LAYOUT_INDICE = TabelaRegex(r'^\s*(\d+/\d+/\d+:\d+)\s')
+
+def detectar_com_prazo(texto, segundos=5):
+    """
+    TabelaFixa.detectar numa thread: falha o teste em vez de travar se o laço não terminar
+    """
+    resultado = []
+    thread = threading.Thread(target=lambda: resultado.append(TabelaFixa.detectar(texto)), daemon=True)
+    thread.start()
+    thread.join(segundos)
+    if thread.is_alive():
+        raise AssertionError(f"TabelaFixa.detectar não terminou em {segundos}s")
+    return resultado[0]
+
+class TestDetectar(unittest.TestCase):
+
+    def test_cabecalho_de_uma_coluna(self):
+        texto = "ONU list\n--------------------\n1/1/1:1 enable enable working\n"
+        self.assertEqual(detectar_com_prazo(texto), (None, 0))
+        self.assertEqual(registros(texto, (0,), LAYOUT_INDICE), [("1/1/1:1",)])
+
+    def test_tracejado_sem_cabecalho(self):
+        self.assertEqual(detectar_com_prazo("--------------------\n1/1/1:1 enable\n"), (None, 0))
+        self.assertEqual(detectar_com_prazo("\n\n---- ---\n1 2\n"), (None, 0))
+
+    def test_banner_antes_da_tabela(self):
+        texto = ("ONU list\n--------------------\n"
+                 "OnuIndex     Admin State\n"
+                 "------------ -----------\n"
+                 "1/1/1:1      enable\n")
+        tabela, inicio = detectar_com_prazo(texto)
+        self.assertEqual(tabela.nomes, ["OnuIndex", "Admin State"])
+        self.assertEqual(list(tabela.registros(texto, (0, 1), inicio)), [("1/1/1:1", "enable")])
+
+    def test_linha_continua_usa_colunas_do_cabecalho(self):
+        texto = ("OnuIndex     Admin State  Phase State\n"
+                 "-------------------------------------\n"
+                 "1/1/1:1      enable       LOS\n")
+        tabela, inicio = detectar_com_prazo(texto)
+        self.assertEqual(tabela.nomes, ["OnuIndex", "Admin State", "Phase State"])
+        self.assertEqual(list(tabela.registros(texto, (0, 2), inicio)), [("1/1/1:1", "LOS")])
+
+class TestRegistros(unittest.TestCase):
+
+    TEXTO = ("Slot Pon Onu OnuType        ST Lic OST PhyId        PhyPwd\n"
+             "---- --- --- -------------- -- --- --- ------------ ----------\n")
+
+    def test_split_e_offsets_na_mesma_tabela(self):
+        texto = (self.TEXTO +
+                 "1    1   1   HG260          A  1   dn  FHTT00000001\n"   # split
+                 "1    1   2   HG260          A  1   up  FHTT00000002   \n"  # espaços no fim
+                 "1    1   3   HG260             1   dn  FHTT00000003\n"   # ST vazio
+                 "1    1   5   HG 260         A  1   dn  FHTT00000005\n"   # tipo com espaço
+                 "---- --- --- -------------- -- --- --- ------------ ----------\n"
+                 "1    1   4   HG260          A  1   dn\n")                # sem PhyId
+        tabela, inicio = TabelaFixa.detectar(texto)
+        self.assertEqual(list(tabela.registros(texto, (0, 1, 2, 3, 6, 7), inicio)), [
+            ("1", "1", "1", "HG260", "dn", "FHTT00000001"),
+            ("1", "1", "2", "HG260", "up", "FHTT00000002"),
+            ("1", "1", "3", "HG260", "dn", "FHTT00000003"),
+            ("1", "1", "5", "HG 260", "dn", "FHTT00000005"),
+            ("1", "1", "4", "HG260", "dn", ""),
+        ])
+
+if __name__ == "__main__":
+    unittest.main()
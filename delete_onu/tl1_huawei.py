@@ -0,0 +1,251 @@
+import os
+import re
+import socket
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Servidor TL1 (NBI do U2000/NCE) que atende as OLTs Huawei
+TL1_HOST = os.getenv("TL1_HOST", "127.0.0.1")
+TL1_PORT = int(os.getenv("TL1_PORT", "9819"))
+TL1_LOGIN = os.getenv("TL1_LOGIN", os.getenv("LOGIN"))
+TL1_PASSWORD = os.getenv("TL1_PASSWORD", os.getenv("PASSWORD"))
+TL1_TIMEOUT = 60
+
+# Comandos TL1 usados (conferir na versão do NBI)
+CMD_LISTAR_ONTS = "LST-ONT"
+CMD_LISTAR_SERVICE_PORTS = "LST-SERVICEPORT"
+CMD_REMOVER_SERVICE_PORT = "DEL-SERVICEPORT"
+CMD_REMOVER_ONT = "DEL-ONT"
+CMD_SALVAR = "SAVE-DEV"
+
+# Colunas da tabela do LST-ONT
+COLUNA_ESTADO = "RUNSTAT"
+COLUNA_SERIAL = "SERIALNUM"
+COLUNA_ULTIMA_QUEDA = "LASTDOWNTIME"
+ESTADO_OFFLINE = "offline"
+
+# Comandos enviados de uma vez em cada lote de deleção
+TAMANHO_LOTE = 50
+
+class ErroTL1(Exception):
+    pass
+
+class RespostaTL1:
+    """
+    Resposta completa de um comando TL1 (todas as mensagens do mesmo CTAG)
+    """
+
+    def __init__(self, ctag, codigo, en, endesc, linhas, data):
+        self.ctag = ctag
+        self.codigo = codigo      # COMPLD, DENY, PRTL, ...
+        self.en = en              # código de erro (0 = sucesso)
+        self.endesc = endesc
+        self.linhas = linhas
+        self.data = data          # data do servidor no cabeçalho da resposta
+
+    @property
+    def sucesso(self):
+        return self.codigo == "COMPLD" and self.en in ("0", None)
+
+    def tabela(self):
+        """
+        Linhas das tabelas da resposta como dicts (cabeçalho e colunas separados por TAB,
+        entre linhas tracejadas). Respostas em vários blocos são concatenadas
+        """
+        registros = []
+        cabecalho = None
+        tracejados = 0
+        for linha in self.linhas:
+            if re.match(r'^-{5,}$', linha.strip()):
+                tracejados += 1
+                # Cada bloco: ---- cabeçalho ---- linhas ----
+                if tracejados % 3 == 0:
+                    cabecalho = None
+                continue
+            if tracejados % 3 == 1 and cabecalho is None and linha.strip():
+                cabecalho = linha.strip().split('\t')
+            elif tracejados % 3 == 2 and cabecalho and linha.strip():
+                valores = linha.strip().split('\t')
+                registros.append(dict(zip(cabecalho, valores)))
+        return registros
+
+def _parametros(parametros):
+    return ",".join(f"{chave}={valor}" for chave, valor in parametros.items())
+
+class ClienteTL1:
+    """
+    Cliente TL1 sobre TCP: cada comando leva um CTAG único e a resposta é
+    identificada pelo CTAG e pelo código de conclusão, sem esperas fixas
+    """
+
+    def __init__(self, host=TL1_HOST, porta=TL1_PORT, usuario=TL1_LOGIN, senha=TL1_PASSWORD, timeout=TL1_TIMEOUT):
+        self.host = host
+        self.porta = porta
+        self.usuario = usuario
+        self.senha = senha
+        self.timeout = timeout
+        self.sock = None
+        self._buffer = ""
+        self._ctag = 0
+        self._pendentes = {}
+
+    def __enter__(self):
+        self.conectar()
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def conectar(self):
+        self.sock = socket.create_connection((self.host, self.porta), timeout=self.timeout)
+        resposta = self.executar("LOGIN", {}, {"UN": self.usuario, "PWD": self.senha})
+        if not resposta.sucesso:
+            self.sock.close()
+            raise ErroTL1(f"Login TL1 recusado: {resposta.endesc}")
+
+    def fechar(self):
+        if self.sock is None:
+            return
+        try:
+            self.executar("LOGOUT", {})
+        except (OSError, ErroTL1):
+            pass
+        self.sock.close()
+        self.sock = None
+
+    def _enviar(self, verbo, alvo, parametros=None):
+        self._ctag += 1
+        ctag = str(self._ctag)
+        comando = f"{verbo}::{_parametros(alvo)}:{ctag}::{_parametros(parametros or {})};"
+        self.sock.sendall(comando.encode())
+        self._pendentes[ctag] = []
+        return ctag
+
+    def _ler_mensagem(self):
+        # Mensagens terminam em ';' (final) ou '>' (continua em outra mensagem)
+        while True:
+            match = re.search(r'\n\s*([;>])', self._buffer)
+            if match:
+                mensagem = self._buffer[:match.end()]
+                self._buffer = self._buffer[match.end():]
+                return mensagem, match.group(1) == ';'
+            dados = self.sock.recv(65535)
+            if not dados:
+                raise ErroTL1("Conexão TL1 encerrada pelo servidor")
+            self._buffer += dados.decode("utf-8", errors="ignore").replace('\r', '')
+
+    def _receber(self, ctags):
+        respostas = {}
+        while any(ctag not in respostas for ctag in ctags):
+            mensagem, final = self._ler_mensagem()
+            cabecalho = re.search(r'^M\s+(\S+)\s+(\w+)', mensagem, re.MULTILINE)
+            if not cabecalho:
+                # Mensagens autônomas (alarmes) e ecos são ignorados
+                continue
+            ctag, codigo = cabecalho.groups()
+            if ctag not in self._pendentes:
+                continue
+            self._pendentes[ctag].append(mensagem)
+            if not final:
+                continue
+
+            texto = "".join(self._pendentes.pop(ctag))
+            en = re.search(r'EN=(\S+)', texto)
+            endesc = re.search(r'ENDESC=(.*)', texto)
+            data = re.search(r'^\s*\S+\s+(\d{4}-\d{2}-\d{2})\s+\d{2}:\d{2}:\d{2}', texto, re.MULTILINE)
+            respostas[ctag] = RespostaTL1(
+                ctag,
+                codigo,
+                en.group(1) if en else None,
+                endesc.group(1).strip() if endesc else "",
+                texto.splitlines(),
+                datetime.strptime(data.group(1), "%Y-%m-%d").date() if data else None,
+            )
+        return [respostas[ctag] for ctag in ctags]
+
+    def executar(self, verbo, alvo, parametros=None):
+        """
+        Envia um comando e aguarda a resposta completa
+        """
+        ctag = self._enviar(verbo, alvo, parametros)
+        return self._receber([ctag])[0]
+
+    def executar_lote(self, comandos):
+        """
+        Envia vários comandos (verbo, alvo) de uma vez e retorna as respostas na mesma ordem,
+        cada uma com o próprio código de conclusão
+        """
+        ctags = [self._enviar(verbo, alvo) for verbo, alvo in comandos]
+        return self._receber(ctags)
+
+def listar_onts(cliente, dev):
+    """
+    Tabela de ONTs da OLT inteira numa única resposta (inclui estado e last down time)
+    """
+    resposta = cliente.executar(CMD_LISTAR_ONTS, {"DEV": dev})
+    if not resposta.sucesso:
+        raise ErroTL1(f"{CMD_LISTAR_ONTS} falhou na OLT {dev}: {resposta.endesc}")
+    return resposta.tabela(), resposta.data
+
+def onts_offline(tabela):
+    """
+    Retorna [(fn, sn, pn, ontid, serial, data_queda)] das ONTs offline da tabela do LST-ONT.
+    data_queda é None quando a OLT não informa a queda ('-')
+    """
+    offline = []
+    for linha in tabela:
+        if linha.get(COLUNA_ESTADO, "").strip().lower() != ESTADO_OFFLINE:
+            continue
+        queda = re.match(r'(\d{4}-\d{2}-\d{2})', linha.get(COLUNA_ULTIMA_QUEDA, "").strip())
+        offline.append((
+            int(linha["FN"]), int(linha["SN"]), int(linha["PN"]), int(linha["ONTID"]),
+            linha.get(COLUNA_SERIAL),
+            datetime.strptime(queda.group(1), "%Y-%m-%d").date() if queda else None,
+        ))
+    return offline
+
+def listar_service_ports(cliente, dev):
+    """
+    Retorna {(fn, sn, pn, ontid): [service-port ids]} da OLT
+    """
+    resposta = cliente.executar(CMD_LISTAR_SERVICE_PORTS, {"DEV": dev})
+    if not resposta.sucesso:
+        raise ErroTL1(f"{CMD_LISTAR_SERVICE_PORTS} falhou na OLT {dev}: {resposta.endesc}")
+
+    por_ont = {}
+    for linha in resposta.tabela():
+        chave = (int(linha["FN"]), int(linha["SN"]), int(linha["PN"]), int(linha["ONTID"]))
+        por_ont.setdefault(chave, []).append(linha["SERVICEPORTID"])
+    return por_ont
+
+def remover_onts(cliente, dev, onts, service_ports, tamanho_lote=TAMANHO_LOTE):
+    """
+    Remove service-ports e ONTs em lotes. onts: [(fn, sn, pn, ontid)]
+    Retorna [(ont, resposta do DEL-ONT ou da primeira falha)] na mesma ordem
+    """
+    resultados = []
+    for inicio in range(0, len(onts), tamanho_lote):
+        lote = onts[inicio:inicio + tamanho_lote]
+        comandos = []
+        posicoes = []
+        for fn, sn, pn, ontid in lote:
+            inicio_ont = len(comandos)
+            for service_port_id in service_ports.get((fn, sn, pn, ontid), []):
+                comandos.append((CMD_REMOVER_SERVICE_PORT, {"DEV": dev, "SERVICEPORTID": service_port_id}))
+            comandos.append((CMD_REMOVER_ONT, {"DEV": dev, "FN": fn, "SN": sn, "PN": pn, "ONTID": ontid}))
+            posicoes.append((inicio_ont, len(comandos)))
+
+        respostas = cliente.executar_lote(comandos)
+        for ont, (de, ate) in zip(lote, posicoes):
+            falha = next((r for r in respostas[de:ate] if not r.sucesso), None)
+            resultados.append((ont, falha or respostas[ate - 1]))
+    return resultados
+
+def salvar(cliente, dev):
+    """
+    Salva a configuração da OLT; o resultado vem no código de conclusão
+    """
+    return cliente.executar(CMD_SALVAR, {"DEV": dev})
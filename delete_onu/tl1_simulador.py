@@ -0,0 +1,176 @@
+import argparse
+import random
+import socketserver
+import threading
+import time
+from datetime import datetime, timedelta
+
+from tl1_huawei import (
+    CMD_LISTAR_ONTS, CMD_LISTAR_SERVICE_PORTS, CMD_REMOVER_SERVICE_PORT, CMD_REMOVER_ONT, CMD_SALVAR,
+    COLUNA_ESTADO, COLUNA_SERIAL, COLUNA_ULTIMA_QUEDA,
+)
+
+# Servidor TL1 local que imita o NBI do U2000 para testes e benchmarks do backend TL1.
+# Mantém as ONTs e service-ports de uma ou mais OLTs em memória e responde com o mesmo
+# enquadramento (CTAG, código de conclusão, EN/ENDESC, tabelas em blocos)
+
+LINHAS_POR_BLOCO = 500
+
+def gerar_olt(qtd_onts, proporcao_offline=0.2, dias_max=120, data_atual=None, seed=0):
+    """
+    Gera ONTs e service-ports aleatórios (reprodutíveis pela seed) para uma OLT simulada.
+    Retorna (onts {(fn, sn, pn, ontid): dict}, service_ports {id: (fn, sn, pn, ontid)})
+    """
+    aleatorio = random.Random(seed)
+    data_atual = data_atual or datetime.now().date()
+    onts = {}
+    service_ports = {}
+    for i in range(qtd_onts):
+        chave = ("0", str(1 + (i // 2048) % 16), str((i // 128) % 16), str(i % 128))
+        offline = aleatorio.random() < proporcao_offline
+        if offline and aleatorio.random() < 0.05:
+            queda = "-"
+        else:
+            queda = (data_atual - timedelta(days=aleatorio.randint(0, dias_max))).isoformat() + " 10:00:00"
+        onts[chave] = {
+            COLUNA_SERIAL: f"48575443{i:08X}",
+            COLUNA_ESTADO: "Offline" if offline else "Online",
+            COLUNA_ULTIMA_QUEDA: queda,
+        }
+        for _ in range(aleatorio.randint(1, 2)):
+            service_ports[str(len(service_ports))] = chave
+    return onts, service_ports
+
+class SimuladorTL1(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, endereco, olts, latencia=0.0, data_atual=None):
+        """
+        olts: {dev: (onts, service_ports)} no formato de gerar_olt
+        latencia: atraso em segundos antes de cada resposta
+        """
+        super().__init__(endereco, ManipuladorTL1)
+        self.olts = olts
+        self.latencia = latencia
+        self.data_atual = data_atual
+        self.lock = threading.Lock()
+        self.comandos_recebidos = 0
+        self.saves = 0
+
+    def iniciar(self):
+        """
+        Atende em background e retorna a porta (use porta 0 no endereço para uma livre)
+        """
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self.server_address[1]
+
+class ManipuladorTL1(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        buffer = b""
+        while True:
+            dados = self.request.recv(65535)
+            if not dados:
+                return
+            buffer += dados
+            while b";" in buffer:
+                comando, buffer = buffer.split(b";", 1)
+                self._responder(comando.decode("utf-8", errors="ignore").strip())
+
+    def _cabecalho(self):
+        agora = datetime.now()
+        if self.server.data_atual:
+            agora = datetime.combine(self.server.data_atual, agora.time())
+        return f"\r\n\n   SIM-TL1 {agora.strftime('%Y-%m-%d %H:%M:%S')}\r\n"
+
+    def _enviar(self, ctag, en=0, endesc="Succeeded.", titulo=None, colunas=None, linhas=None):
+        if self.server.latencia:
+            time.sleep(self.server.latencia)
+
+        codigo = "COMPLD" if en == 0 else "DENY"
+        if colunas is None:
+            mensagem = f"{self._cabecalho()}M  {ctag} {codigo}\r\n   EN={en}   ENDESC={endesc}\r\n;"
+            self.request.sendall(mensagem.encode())
+            return
+
+        separador = "   " + "-" * 60 + "\r\n"
+        blocos = [linhas[i:i + LINHAS_POR_BLOCO] for i in range(0, len(linhas), LINHAS_POR_BLOCO)] or [[]]
+        for numero, bloco in enumerate(blocos, 1):
+            corpo = "".join("   " + "\t".join(linha) + "\r\n" for linha in bloco)
+            terminador = ";" if numero == len(blocos) else ">"
+            mensagem = (
+                f"{self._cabecalho()}M  {ctag} {codigo}\r\n   EN={en}   ENDESC={endesc}\r\n"
+                f"   blocktag={numero}\r\n   blockcount={len(blocos)}\r\n\r\n   title={titulo}\r\n"
+                f"{separador}   {chr(9).join(colunas)}\r\n{separador}{corpo}{separador}{terminador}"
+            )
+            self.request.sendall(mensagem.encode())
+
+    def _responder(self, comando):
+        campos = (comando.split(":", 5) + [""] * 6)[:6]
+        verbo, _, alvo, ctag, _, extras = campos
+        parametros = dict(
+            item.split("=", 1) for item in f"{alvo},{extras}".split(",") if "=" in item
+        )
+
+        with self.server.lock:
+            self.server.comandos_recebidos += 1
+
+        if verbo in ("LOGIN", "LOGOUT"):
+            return self._enviar(ctag)
+
+        olt = self.server.olts.get(parametros.get("DEV"))
+        if olt is None:
+            return self._enviar(ctag, 1614, "Device does not exist.")
+        onts, service_ports = olt
+
+        with self.server.lock:
+            if verbo == CMD_LISTAR_ONTS:
+                colunas = ["DEV", "FN", "SN", "PN", "ONTID", COLUNA_SERIAL, COLUNA_ESTADO, COLUNA_ULTIMA_QUEDA]
+                linhas = [
+                    [parametros["DEV"], *chave, ont[COLUNA_SERIAL], ont[COLUNA_ESTADO], ont[COLUNA_ULTIMA_QUEDA]]
+                    for chave, ont in onts.items()
+                ]
+                return self._enviar(ctag, titulo="ONT List", colunas=colunas, linhas=linhas)
+
+            if verbo == CMD_LISTAR_SERVICE_PORTS:
+                colunas = ["DEV", "SERVICEPORTID", "FN", "SN", "PN", "ONTID"]
+                linhas = [[parametros["DEV"], sp_id, *chave] for sp_id, chave in service_ports.items()]
+                return self._enviar(ctag, titulo="Service Port List", colunas=colunas, linhas=linhas)
+
+            if verbo == CMD_REMOVER_SERVICE_PORT:
+                if service_ports.pop(parametros.get("SERVICEPORTID"), None) is None:
+                    return self._enviar(ctag, 1617, "Service port does not exist.")
+                return self._enviar(ctag)
+
+            if verbo == CMD_REMOVER_ONT:
+                chave = (parametros.get("FN"), parametros.get("SN"), parametros.get("PN"), parametros.get("ONTID"))
+                if chave not in onts:
+                    return self._enviar(ctag, 1613, "ONT does not exist.")
+                if chave in service_ports.values():
+                    return self._enviar(ctag, 1615, "ONT has service ports configured.")
+                del onts[chave]
+                return self._enviar(ctag)
+
+            if verbo == CMD_SALVAR:
+                self.server.saves += 1
+                return self._enviar(ctag)
+
+        return self._enviar(ctag, 1601, "Command not supported.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulador TL1 (NBI Huawei) para testes do backend TL1")
+    parser.add_argument("--porta", type=int, default=9819)
+    parser.add_argument("--olts", nargs="+", default=["127.0.0.1"], metavar="DEV", help="identificadores (DEV) das OLTs simuladas")
+    parser.add_argument("--onts", type=int, default=2000, help="ONTs por OLT")
+    parser.add_argument("--offline", type=float, default=0.2, help="proporção de ONTs offline")
+    parser.add_argument("--latencia", type=float, default=0.0, metavar="SEGUNDOS", help="atraso antes de cada resposta")
+    args = parser.parse_args()
+
+    olts = {dev: gerar_olt(args.onts, args.offline, seed=i) for i, dev in enumerate(args.olts)}
+    servidor = SimuladorTL1(("127.0.0.1", args.porta), olts, args.latencia)
+    print(f"[INFO] Simulador TL1 em 127.0.0.1:{args.porta} com {len(olts)} OLT(s) de {args.onts} ONTs")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        servidor.shutdown()
@@ -0,0 +1,57 @@
+from pipeline import executar_pipeline, JANELA_PADRAO
+from registro_onu import CandidatosONU
+
+# Verificação das deleções antes do save: os comandos de deleção não têm a resposta lida,
+# então cada PON afetado é relido uma única vez (pipeline, uma leitura por PON e não por
+# ONU) e comparado com as ONUs enviadas. ONU ausente da leitura = deletada; presente =
+# falha. Só conta como deletada a ONU de um PON cuja leitura terminou e trouxe a tabela (ou a
+# mensagem de PON vazio) reconhecida; PON sem resposta (timeout, sessão caída), saída
+# truncada, erro da CLI ou layout desconhecido = não verificada
+
+def pons_afetados(enviadas):
+    """
+    ONUs enviadas agrupadas por PON: {(chassi, slot, pon): [RegistroONU]}, na ordem de envio
+    """
+    pons = {}
+    for onu in enviadas:
+        pons.setdefault((onu.chassi, onu.slot, onu.pon), []).append(onu)
+    return pons
+
+def verificar_delecoes(shell, enviadas, comando_pon, onus_presentes, contexto, janela=JANELA_PADRAO,
+                       timeout_por_comando=5, terminador="\n", nome=None):
+    """
+    comando_pon(chassi, slot, pon): comando de leitura do PON; onus_presentes(saida, chassi, slot, pon):
+    conjunto dos ids de ONU ainda presentes na saída, ou None se a saída não traz a tabela do PON.
+    Retorna (deletadas, falhas, nao_verificadas), cada uma um CandidatosONU
+    """
+    deletadas = CandidatosONU(enviadas.fabricante, enviadas.host)
+    falhas = CandidatosONU(enviadas.fabricante, enviadas.host)
+    nao_verificadas = CandidatosONU(enviadas.fabricante, enviadas.host)
+    if not enviadas:
+        return deletadas, falhas, nao_verificadas
+
+    pons = pons_afetados(enviadas)
+    concluidas = []
+    try:
+        comandos = [comando_pon(*pon) for pon in pons]
+        saidas = executar_pipeline(shell, comandos, contexto, janela, timeout_por_comando, terminador, nome, concluidas)
+    except Exception:
+        # Sem leitura nenhuma: nada pode ser confirmado
+        saidas = [''] * len(pons)
+        concluidas = [False] * len(pons)
+
+    for (pon, onus_pon), saida, concluida in zip(pons.items(), saidas, concluidas):
+        presentes = None
+        if concluida and saida.strip():
+            try:
+                presentes = onus_presentes(saida, *pon)
+            except (ValueError, IndexError):
+                # Linha da tabela fora do layout esperado
+                presentes = None
+        if presentes is None:
+            for onu in onus_pon:
+                nao_verificadas.anexar(onu)
+            continue
+        for onu in onus_pon:
+            (falhas if onu.onu in presentes else deletadas).anexar(onu)
+    return deletadas, falhas, nao_verificadas